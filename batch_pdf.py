@@ -0,0 +1,150 @@
+"""
+Batch complaint/FIR PDF generation
+Streams records from JSONL or CSV and renders them in parallel across CPU cores.
+
+Usage:
+    python batch_pdf.py complaints.jsonl --output drafts/
+    python batch_pdf.py firs.csv --kind fir --output drafts.zip
+    python batch_pdf.py complaints.jsonl --output - > drafts.zip
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pdf_generator import render_complaint_pdf, render_fir_pdf
+
+RENDERERS = {
+    'complaint': render_complaint_pdf,
+    'fir': render_fir_pdf,
+}
+
+
+def read_records(path):
+    """Yield (line number, record or error) from a .jsonl or .csv file without loading it all"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, {key: value for key, value in row.items() if key and value}
+        return
+
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            # Bad lines are reported, not raised, so one typo doesn't end the batch
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+
+
+def pdf_filename(kind, index, record):
+    """Stable, filesystem-safe name like complaint_000042_ravi_kumar.pdf"""
+    name = re.sub(r'[^a-z0-9]+', '_', str(record.get('name', '')).lower()).strip('_')[:40]
+    return f"{kind}_{index:06d}{'_' + name if name else ''}.pdf"
+
+
+class DirectoryWriter:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, filename, data):
+        with open(os.path.join(self.path, filename), 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class ZipWriter:
+    """Writes into a ZIP file, or streams one to stdout when path is '-'"""
+
+    def __init__(self, path):
+        target = sys.stdout.buffer if path == '-' else path
+        # PDFs are already compressed, so storing avoids burning CPU for nothing
+        self.zip = zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_STORED)
+
+    def write(self, filename, data):
+        self.zip.writestr(filename, data)
+
+    def close(self):
+        self.zip.close()
+
+
+def run_batch(input_path, output, kind='complaint', workers=None, log=sys.stderr):
+    """Render every record; returns (rendered count, error count, elapsed seconds)"""
+    render = RENDERERS[kind]
+    workers = workers or os.cpu_count() or 1
+    writer = ZipWriter(output) if output == '-' or output.lower().endswith('.zip') else DirectoryWriter(output)
+
+    rendered = 0
+    errors = 0
+    in_flight = {}  # future -> (line number, filename)
+    max_in_flight = workers * 4  # Bounded window keeps memory flat for huge inputs
+    start = time.perf_counter()
+
+    def collect(done):
+        nonlocal rendered, errors
+        for future in done:
+            line_no, filename = in_flight.pop(future)
+            try:
+                writer.write(filename, future.result())
+                rendered += 1
+            except Exception as e:
+                errors += 1
+                print(f"❌ Line {line_no}: {e}", file=log)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            index = 0
+            for line_no, record in read_records(input_path):
+                if isinstance(record, Exception):
+                    errors += 1
+                    print(f"❌ Line {line_no}: unreadable record ({record})", file=log)
+                    continue
+                if not isinstance(record, dict):
+                    errors += 1
+                    print(f"❌ Line {line_no}: expected an object, got {type(record).__name__}", file=log)
+                    continue
+
+                index += 1
+                future = executor.submit(render, record)
+                in_flight[future] = (line_no, pdf_filename(kind, index, record))
+
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+            collect(wait(in_flight)[0])
+    finally:
+        writer.close()
+
+    return rendered, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render complaint/FIR PDF drafts from JSONL or CSV records")
+    parser.add_argument('input', help="Path to a .jsonl or .csv file (one record per line/row)")
+    parser.add_argument('--kind', choices=sorted(RENDERERS), default='complaint', help="Document type")
+    parser.add_argument('--output', required=True, help="Output directory, .zip file, or '-' for a ZIP on stdout")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    rendered, errors, elapsed = run_batch(args.input, args.output, args.kind, args.workers)
+
+    rate = rendered / elapsed if elapsed else 0.0
+    print(f"✅ Rendered {rendered} {args.kind} PDFs in {elapsed:.1f}s ({rate:.1f} PDFs/s), {errors} errors",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
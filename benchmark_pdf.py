@@ -0,0 +1,115 @@
+"""
+Benchmark for complaint/FIR PDF rendering
+Compares a fresh ComplaintPDFGenerator per PDF (old helper behaviour)
+with the shared, pre-built generator.
+
+Usage: python benchmark_pdf.py [iterations]
+"""
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from pdf_generator import ComplaintPDFGenerator, get_pdf_generator
+
+SAMPLE_COMPLAINT = {
+    'name': 'Ravi Kumar',
+    'father_name': 'Suresh Kumar',
+    'age': '34',
+    'phone': '9876543210',
+    'email': 'ravi@example.com',
+    'address': 'Door No 12-34, Main Road, Kakinada, Kakinada Urban Mandal, East Godavari District',
+    'complaint_type': 'Theft',
+    'incident_date': '12 October 2025, 7:30 PM',
+    'incident_location': 'Near Bhanugudi Junction, Kakinada',
+    'description': 'My mobile phone was stolen from my bag while travelling in an auto. ' * 8,
+    'applicable_laws': 'IPC 378 - Theft, IPC 379 - Punishment for theft',
+    'police_station': 'Kakinada Two Town Police Station',
+    'police_details': 'Kakinada Two Town Police Station\nAddress: Sarpavaram Junction\nPhone: 0884-2371111'
+}
+
+SAMPLE_FIR = {
+    'name': 'Ravi Kumar',
+    'father_name': 'Suresh Kumar',
+    'age': '34',
+    'occupation': 'Teacher',
+    'phone': '9876543210',
+    'address': 'Door No 12-34, Main Road, Kakinada',
+    'crime_type': 'Theft',
+    'incident_datetime': '12 October 2025, 7:30 PM',
+    'incident_location': 'Near Bhanugudi Junction, Kakinada',
+    'description': 'Mobile phone stolen while travelling in an auto. ' * 8,
+    'applicable_laws': 'IPC 378 - Theft, IPC 379 - Punishment for theft',
+    'police_station': 'Kakinada Two Town Police Station'
+}
+
+
+def render_fresh(kind):
+    """Old behaviour: build styles and table styles for every PDF"""
+    generator = ComplaintPDFGenerator()
+    buffer = BytesIO()
+    if kind == 'complaint':
+        generator.generate_complaint_pdf(SAMPLE_COMPLAINT, buffer)
+    else:
+        generator.generate_fir_pdf(SAMPLE_FIR, buffer)
+    return buffer.getvalue()
+
+
+def render_shared(kind):
+    """New behaviour: reuse the process-wide generator"""
+    buffer = BytesIO()
+    if kind == 'complaint':
+        get_pdf_generator().generate_complaint_pdf(SAMPLE_COMPLAINT, buffer)
+    else:
+        get_pdf_generator().generate_fir_pdf(SAMPLE_FIR, buffer)
+    return buffer.getvalue()
+
+
+def measure(render, kind, iterations):
+    """Return (per-PDF times in ms, mean peak KiB during a render, mean new blocks left by a render)"""
+    render(kind)  # Warm up imports and font caches
+
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render(kind)
+        times.append((time.perf_counter() - start) * 1000)
+
+    # Allocation profile is taken separately so tracing overhead does not skew timings
+    ignore_tracemalloc = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    for _ in range(min(iterations, 20)):
+        gc.collect()  # Garbage from the previous render must not be freed inside this one
+        before = tracemalloc.take_snapshot().filter_traces(ignore_tracemalloc)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        render(kind)
+        peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+        # Blocks this render allocated and hasn't freed yet, not everything already alive in the process
+        after = tracemalloc.take_snapshot().filter_traces(ignore_tracemalloc)
+        blocks.append(sum(stat.count_diff for stat in after.compare_to(before, 'filename')))
+        del before, after
+    tracemalloc.stop()
+
+    return times, statistics.mean(peaks), statistics.mean(blocks)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"PDF render benchmark ({iterations} iterations each)\n")
+    print(f"{'document':<10} {'mode':<8} {'mean ms':>9} {'median ms':>10} {'p95 ms':>8} {'peak KiB':>9} {'new blocks':>11}")
+    for kind in ('complaint', 'fir'):
+        for mode, render in (('fresh', render_fresh), ('shared', render_shared)):
+            times, peak_kib, new_blocks = measure(render, kind, iterations)
+            p95 = sorted(times)[int(len(times) * 0.95) - 1]
+            print(f"{kind:<10} {mode:<8} {statistics.mean(times):>9.2f} {statistics.median(times):>10.2f} "
+                  f"{p95:>8.2f} {peak_kib:>9.0f} {new_blocks:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
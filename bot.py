@@ -2,7 +2,8 @@
 Kakinada Legal Assistant Telegram Bot
 Main bot file with Gemini AI integration
 """
-import os
+import time
+import asyncio
 import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove
@@ -11,7 +12,25 @@ from google import genai
 from google.genai import types
 from io import BytesIO
 import config
-from pdf_generator import create_complaint_pdf
+from chat_memory import ChatMemory
+from cache import AnswerCache, GeoCache, JurisdictionCache, ResponseCache, SingleFlight, make_cache_key, normalize_question
+from pdf_pool import PDFRenderPool, PDFPoolBusy
+from streaming import StreamingReply
+from telegram_format import render_html, render_messages
+from geo import StationIndex, geohash_encode, rank_by_distance
+from keyword_matcher import LawMatcher
+from complaint_classifier import ComplaintClassifier
+from jurisdiction import JurisdictionResolver, jurisdiction_key
+from session_tasks import SessionTasks
+from maps_client import AsyncMapsClient
+from persistence import SQLitePersistence
+from webhook import PerChatUpdateProcessor, run_webhook
+from rate_limiter import OutboundRateLimiter
+from metrics import (
+    REGISTRY, CONVERSATION_STATES, GEMINI_ERRORS, GEMINI_IN_FLIGHT, GEMINI_LATENCY,
+    ConversationTracker, instrument, start_metrics_server
+)
+from scheduler import GeminiScheduler, SchedulerOverloaded, PRIORITY_BACKGROUND, PRIORITY_CHAT, PRIORITY_COMPLAINT
 
 # Configure logging
 logging.basicConfig(
@@ -20,20 +39,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configure Gemini AI with new SDK
-client = genai.Client(api_key=config.GEMINI_API_KEY)
-
 # Conversation states for complaint filling
 COMPLAINT_NAME, COMPLAINT_FATHER_NAME, COMPLAINT_AGE, COMPLAINT_PHONE, COMPLAINT_EMAIL, COMPLAINT_ADDRESS = range(6)
 COMPLAINT_INITIAL_DESC, COMPLAINT_TYPE, COMPLAINT_DATE, COMPLAINT_LOCATION, COMPLAINT_DESCRIPTION = range(6, 11)
 
+# Users per complaint step, for the metrics endpoint
+complaint_tracker = ConversationTracker('complaint', {
+    COMPLAINT_NAME: 'name', COMPLAINT_FATHER_NAME: 'father_name', COMPLAINT_AGE: 'age',
+    COMPLAINT_PHONE: 'phone', COMPLAINT_EMAIL: 'email', COMPLAINT_ADDRESS: 'address',
+    COMPLAINT_INITIAL_DESC: 'initial_description', COMPLAINT_DATE: 'date', COMPLAINT_LOCATION: 'location',
+    COMPLAINT_TYPE: 'type', COMPLAINT_DESCRIPTION: 'description'
+})
+
+# Fixed prompts - identical for every user, so their answers are cached
+SCHEMES_PROMPT = """Search Google for the TOP 5 CURRENT government schemes each for:
+1. Central Government (India) - 2024
+2. Andhra Pradesh State Government - 2024
+
+For each scheme provide:
+- Scheme Name
+- Brief Purpose (one line)
+- Who can apply (one line)
+
+Keep response under 2000 characters. Use ONLY verified, active schemes from official sources."""
+
+LAWS_PROMPT = """Provide a clean, structured overview of Fundamental Rights in India:
+
+List the 6 main categories of Fundamental Rights (Articles 12-35) with:
+- Article numbers
+- Brief description (one line each)
+
+Also mention 3 important legal rights every citizen should know.
+
+Keep under 2000 characters. Use official Constitution sources."""
+
+GOV_SCHEMES_BUTTON_PROMPT = "Tell me about major government schemes in India and Andhra Pradesh (brief overview)"
+LEGAL_INFO_BUTTON_PROMPT = "Give me an overview of common legal rights in India (brief)"
+
+CACHED_PROMPTS = [SCHEMES_PROMPT, LAWS_PROMPT, GOV_SCHEMES_BUTTON_PROMPT, LEGAL_INFO_BUTTON_PROMPT]
+
+# Tappable suggested questions - they stand alone, so their answers are cached even mid-conversation
+SUGGESTED_QUESTIONS = {
+    "general": [
+        "What are my tenant rights?",
+        "How to file consumer complaint?",
+        "What is Right to Information Act?",
+        "Tell me about government schemes"
+    ],
+    "law": [
+        "What is Section 498A IPC?",
+        "Explain dowry prohibition law",
+        "What is POCSO Act?",
+        "Tell me about bail procedures"
+    ],
+    "schemes": [
+        "PM Kisan Yojana details",
+        "Ayushman Bharat scheme",
+        "Pension schemes in India",
+        "Housing schemes in AP"
+    ]
+}
+
+MENU_SUGGESTED_QUESTIONS = [
+    "What are my tenant rights?",
+    "How to file consumer complaint?",
+    "What is POCSO Act?",
+    "Tell me about PM Kisan Yojana",
+    "What is Section 498A IPC?",
+    "How to get police protection?"
+]
+
+STANDALONE_QUESTIONS = {
+    normalize_question(question)
+    for question in MENU_SUGGESTED_QUESTIONS + [q for questions in SUGGESTED_QUESTIONS.values() for q in questions]
+}
+
 
 class KakinadaLegalBot:
     """Main bot class"""
     
     def __init__(self):
         # Initialize with new Google GenAI SDK that supports Google Search
-        self.client = client
+        self.client = genai.Client(api_key=config.GEMINI_API_KEY)
         self.model_name = config.GEMINI_MODEL
         
         # Configure Google Search tool
@@ -53,29 +140,232 @@ class KakinadaLegalBot:
         
         logger.info("✅ Gemini model with Google Search initialized successfully")
         
-        # Start chat session
-        self.chat_sessions = {}
+        # Lean config (no search tool) for summarizing old conversation turns
+        self.summary_config = types.GenerateContentConfig(
+            temperature=0.2,
+            max_output_tokens=400
+        )
+        
+        # Per-user conversation history, bounded in users, tokens and idle time
+        self.chat_sessions = ChatMemory(
+            max_users=config.CHAT_MEMORY_MAX_USERS,
+            idle_ttl=config.CHAT_MEMORY_IDLE_TTL,
+            token_budget=config.CHAT_MEMORY_TOKEN_BUDGET,
+            recent_turns=config.CHAT_MEMORY_RECENT_TURNS,
+            summary_tokens=config.CHAT_MEMORY_SUMMARY_TOKENS,
+            summarize=self.summarize_history
+        )
         self.system_prompt = config.LEGAL_ASSISTANT_PROMPT
+        
+        # Spatial index over the known station registry - answers most location requests offline
+        self.station_index = StationIndex(config.KAKINADA_POLICE_STATIONS)
+        
+        # Keyword automata for applicable sections and complaint type, built once
+        self.law_matcher = LawMatcher(config.COMMON_IPC_SECTIONS, config.IPC_KEYWORD_SYNONYMS)
+        self.complaint_classifier = ComplaintClassifier(
+            config.COMPLAINT_TYPE_KEYWORDS,
+            min_weight=config.COMPLAINT_CLASSIFIER_MIN_WEIGHT
+        )
+        
+        # One pooled async Maps client shared by every location request
+        self.maps_client = AsyncMapsClient(
+            config.GOOGLE_MAPS_API_KEY,
+            timeout=config.MAPS_REQUEST_TIMEOUT,
+            max_connections=config.MAPS_MAX_CONNECTIONS
+        )
+        
+        # Nearby-station lists cached per geohash cell - neighbours reuse each other's lookups
+        self.places_cache = GeoCache(config.PLACES_CACHE_DB, ttl=config.PLACES_CACHE_TTL)
+        
+        # Grounded police-station answers cached per normalized location and complaint type
+        self.jurisdiction_resolver = JurisdictionResolver(
+            JurisdictionCache(config.JURISDICTION_CACHE_DB, ttl=config.JURISDICTION_CACHE_TTL),
+            self.lookup_police_station
+        )
+        
+        # Speculative per-user lookups started early in the complaint flow (not persisted)
+        self.session_tasks = SessionTasks()
+        
+        # ReportLab rendering runs in a bounded worker pool, never on the event loop
+        self.pdf_pool = PDFRenderPool(
+            workers=config.PDF_POOL_WORKERS,
+            kind=config.PDF_POOL_KIND,
+            max_pending=config.PDF_POOL_MAX_PENDING,
+            wait_timeout=config.PDF_POOL_WAIT_TIMEOUT
+        )
+        
+        # Cap parallel Gemini calls so a burst of users cannot exhaust sockets/quota
+        self.gemini_semaphore = asyncio.Semaphore(config.GEMINI_MAX_CONCURRENCY)
+        
+        # Token-bucket admission so we use the full quota without 429 cascades
+        self.scheduler = GeminiScheduler(
+            requests_per_minute=config.GEMINI_REQUESTS_PER_MINUTE,
+            burst=config.GEMINI_BURST,
+            max_queue_size=config.GEMINI_MAX_QUEUE_SIZE,
+            deadlines={
+                PRIORITY_COMPLAINT: config.GEMINI_QUEUE_DEADLINES['complaint'],
+                PRIORITY_CHAT: config.GEMINI_QUEUE_DEADLINES['chat'],
+                PRIORITY_BACKGROUND: config.GEMINI_QUEUE_DEADLINES['background'],
+            }
+        )
+        
+        # Identical prompts in flight at the same time share one Gemini call
+        self.single_flight = SingleFlight()
+        
+        # Stale-while-revalidate cache for fixed prompts (/schemes, /laws, info buttons)
+        self.response_cache = ResponseCache(ttl=config.RESPONSE_CACHE_TTL)
+        
+        # Two-tier (memory LRU + SQLite) cache for repeated free-text questions
+        self.answer_cache = AnswerCache(
+            config.ANSWER_CACHE_DB,
+            max_memory_items=config.ANSWER_CACHE_MEMORY_SIZE,
+            topic_ttls=config.ANSWER_CACHE_TOPIC_TTLS
+        )
     
-    def send_message(self, user_id, message):
-        """Send message to Gemini with Google Search"""
-        contents = [
+    def build_contents(self, user_id, message, use_history=False):
+        """Build Gemini contents, optionally prefixed with the user's conversation history"""
+        turns = []
+        if use_history and user_id is not None:
+            summary, history = self.chat_sessions.get(user_id)
+            if summary:
+                turns.append(("user", f"[Summary of our earlier conversation: {summary}]"))
+                turns.append(("model", "Noted."))
+            turns.extend(history)
+        turns.append(("user", message))
+        
+        return [
             types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=message)]
+                role=role,
+                parts=[types.Part.from_text(text=text)]
             )
+            for role, text in turns
         ]
+    
+    async def send_message(self, user_id, message, priority=PRIORITY_CHAT, use_history=False):
+        """Send message to Gemini with Google Search (non-blocking)"""
+        contents = self.build_contents(user_id, message, use_history)
+        key = make_cache_key(self.model_name, "\x00".join(c.parts[0].text for c in contents), self.generation_config)
+        return await self.single_flight.do(key, lambda: self._generate(contents, priority))
+    
+    async def _generate(self, contents, priority, generation_config=None):
+        """Make one scheduled Gemini call"""
+        # Wait for a quota token (raises SchedulerOverloaded if shed)
+        await self.scheduler.acquire(priority)
         
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=contents,
-                config=self.generation_config
-            )
-            return response.text
-        except Exception as e:
-            logger.error(f"Error generating content: {e}")
-            raise
+        async with self.gemini_semaphore:
+            with GEMINI_IN_FLIGHT.track_inprogress(), GEMINI_LATENCY.time(call='generate'):
+                try:
+                    # Async client keeps the event loop free for other users
+                    response = await self.client.aio.models.generate_content(
+                        model=self.model_name,
+                        contents=contents,
+                        config=generation_config or self.generation_config
+                    )
+                    return response.text
+                except Exception as e:
+                    GEMINI_ERRORS.inc(call='generate', code=getattr(e, 'code', None) or type(e).__name__)
+                    if getattr(e, 'code', None) == 429:
+                        self.scheduler.pause(config.GEMINI_RATE_LIMIT_BACKOFF)
+                    logger.error(f"Error generating content: {e}")
+                    raise
+    
+    async def send_message_stream(self, user_id, message, priority=PRIORITY_CHAT, use_history=False):
+        """Stream a Gemini response, yielding text chunks as they arrive"""
+        contents = self.build_contents(user_id, message, use_history)
+        
+        await self.scheduler.acquire(priority)
+        
+        async with self.gemini_semaphore:
+            with GEMINI_IN_FLIGHT.track_inprogress():
+                start = time.perf_counter()
+                consumer_seconds = 0.0  # Time the caller spends with each chunk (Telegram edits, rate limiting)
+                first_chunk = True
+                try:
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.model_name,
+                        contents=contents,
+                        config=self.generation_config
+                    )
+                    async for chunk in stream:
+                        if chunk.text:
+                            if first_chunk:
+                                # Time to first token is what the user actually waits for
+                                GEMINI_LATENCY.observe(time.perf_counter() - start, call='stream_first_chunk')
+                                first_chunk = False
+                            paused_at = time.perf_counter()
+                            try:
+                                yield chunk.text
+                            finally:
+                                consumer_seconds += time.perf_counter() - paused_at
+                except Exception as e:
+                    GEMINI_ERRORS.inc(call='stream', code=getattr(e, 'code', None) or type(e).__name__)
+                    if getattr(e, 'code', None) == 429:
+                        self.scheduler.pause(config.GEMINI_RATE_LIMIT_BACKOFF)
+                    logger.error(f"Error streaming content: {e}")
+                    raise
+                finally:
+                    # Upstream time only - the caller's work between chunks is not Gemini latency
+                    GEMINI_LATENCY.observe(time.perf_counter() - start - consumer_seconds, call='stream')
+    
+    async def summarize_history(self, transcript):
+        """Condense older conversation turns into a short summary"""
+        prompt = f"""Summarize this legal-help conversation in under 80 words.
+Keep the user's situation, key facts, places, and laws discussed. No preamble.
+
+{transcript}"""
+        contents = self.build_contents(None, prompt)
+        return await self._generate(contents, PRIORITY_BACKGROUND, self.summary_config)
+    
+    async def send_cached_message(self, user_id, message):
+        """Send a fixed prompt, serving the cached answer while it refreshes in background"""
+        key = make_cache_key(self.model_name, message, self.generation_config)
+        return await self.response_cache.get_or_fetch(key, lambda: self.send_message(user_id, message))
+    
+    def answer_cache_key(self, question):
+        """Cache key for a free-text question, or None if it should not be cached"""
+        normalized = normalize_question(question)
+        if not normalized or len(normalized) > config.ANSWER_CACHE_MAX_QUESTION_LENGTH:
+            # Long messages are personal narratives, not reusable questions
+            return None
+        return make_cache_key(self.model_name, normalized, self.generation_config)
+    
+    def warm_response_cache(self):
+        """Start background fetches for all fixed prompts"""
+        for prompt in CACHED_PROMPTS:
+            key = make_cache_key(self.model_name, prompt, self.generation_config)
+            self.response_cache.prefetch(key, lambda prompt=prompt: self.send_message(None, prompt, PRIORITY_BACKGROUND))
+    
+    async def fetch_nearby_stations(self, latitude, longitude):
+        """Police stations around a point from Google Maps, enriched with phone numbers"""
+        places_results = await self.maps_client.places_nearby(
+            latitude, longitude,
+            radius=5000,  # Search within 5km radius
+            place_type='police',
+            keyword='police station'
+        )
+        
+        # Rank every result by real distance - the API's order is by relevance, not distance
+        candidates = [
+            dict(station, lat=station['geometry']['location']['lat'], lng=station['geometry']['location']['lng'])
+            for station in places_results
+        ]
+        police_stations = [station for _, station in rank_by_distance(
+            latitude, longitude, candidates, k=config.MAPS_DETAIL_CANDIDATES
+        )]
+        
+        # Phone numbers for all candidates in one concurrent round trip
+        phones = await self.maps_client.place_phones([station.get('place_id') for station in police_stations])
+        
+        return [
+            {
+                'name': station.get('name', 'Unknown Police Station'),
+                'vicinity': station.get('vicinity', 'Address not available'),
+                'phone': phone,
+                'lat': station['lat'],
+                'lng': station['lng']
+            }
+            for station, phone in zip(police_stations, phones)
+        ]
     
     def find_nearest_police_stations(self, complaint_type=None):
         """Find nearest police stations in Kakinada"""
@@ -96,28 +386,34 @@ class KakinadaLegalBot:
         
         return stations[:3]  # Return top 3 stations
     
+    async def lookup_police_station(self, incident_location, complaint_type, address=None):
+        """Ask Gemini (with Google Search) which police station has jurisdiction over the incident"""
+        # Only sent when the incident location alone doesn't identify the area
+        address_line = f"Complainant's Address: {address}\n" if address else ""
+        police_search_prompt = f"""Search Google for police stations with jurisdiction over this complaint:
+
+Incident Location: {incident_location}
+{address_line}Complaint Type: {complaint_type}
+
+Provide ONLY the following in a clean format:
+
+**Police Station Name**
+📍 Address: [Full address with mandal, district, pincode]
+📞 Phone: [Contact number]
+✅ Jurisdiction: [Brief - covers this area for {complaint_type} cases]
+
+If the {complaint_type} case is handled by a special station (e.g. Women, Cyber Crime), list it too.
+
+Keep it SHORT and CLEAN. No explanations. Just facts."""
+
+        return await self.send_message(None, police_search_prompt, PRIORITY_COMPLAINT)
+    
     def get_applicable_laws(self, complaint_type, description=""):
         """Get applicable IPC sections based on complaint type and description"""
-        complaint_lower = complaint_type.lower()
-        description_lower = description.lower()
-        combined_text = complaint_lower + " " + description_lower
-        applicable = []
-        
-        # Check both complaint type and description for keywords
-        for key, laws in config.COMMON_IPC_SECTIONS.items():
-            if key in combined_text:
-                applicable.extend(laws)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_applicable = []
-        for law in applicable:
-            if law not in seen:
-                seen.add(law)
-                unique_applicable.append(law)
-        
-        if unique_applicable:
-            return ", ".join(unique_applicable)
+        applicable = self.law_matcher.match(complaint_type, description)
+
+        if applicable:
+            return ", ".join(applicable)
         else:
             return "IPC 378/379 (Theft) or other relevant sections - Consult with police for exact applicable sections"
     
@@ -172,8 +468,8 @@ class KakinadaLegalBot:
         await query.message.reply_text(message, parse_mode='Markdown')
 
 
-# Initialize bot
-legal_bot = KakinadaLegalBot()
+# Created in main(), not at import: spawned PDF workers re-import this module
+legal_bot = None
 
 
 # Command handlers
@@ -210,8 +506,9 @@ Choose an option below or ask your question! 👇"""
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    # Reset suggestion flag
+    # Reset suggestion flag and start a fresh conversation
     context.user_data['suggestion_shown'] = False
+    legal_bot.chat_sessions.clear(update.message.from_user.id)
     
     await update.message.reply_text(welcome_message, reply_markup=reply_markup, parse_mode='Markdown')
 
@@ -271,20 +568,8 @@ async def schemes_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.chat.send_action("typing")
     
     try:
-        # Ask AI for current schemes with Google Search
-        prompt = """Search Google for the TOP 5 CURRENT government schemes each for:
-1. Central Government (India) - 2024
-2. Andhra Pradesh State Government - 2024
-
-For each scheme provide:
-- Scheme Name
-- Brief Purpose (one line)
-- Who can apply (one line)
-
-Keep response under 2000 characters. Use ONLY verified, active schemes from official sources."""
-
-        response_text = legal_bot.send_message(user_id, prompt)
-        response_text = clean_markdown(response_text)
+        # Ask AI for current schemes with Google Search (cached across users)
+        response_text = await legal_bot.send_cached_message(user_id, SCHEMES_PROMPT)
         
         # Format with header and footer
         formatted_response = f"""🏛️ *Government Schemes - 2024*
@@ -303,14 +588,7 @@ Example: "Tell me about PM Kisan Yojana"
 
 📞 *Helpline:* 1800-XXX-XXXX"""
 
-        if len(formatted_response) > 3800:
-            formatted_response = formatted_response[:3700] + "...\n\n💡 Ask for specific schemes!"
-        
-        try:
-            await update.message.reply_text(formatted_response, parse_mode='Markdown')
-        except Exception as parse_error:
-            logger.error(f"Markdown parse error in schemes: {parse_error}")
-            await update.message.reply_text(formatted_response)
+        await reply_rendered(update.message, formatted_response)
             
     except Exception as e:
         logger.error(f"Error in schemes command: {e}")
@@ -341,19 +619,8 @@ async def laws_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.chat.send_action("typing")
     
     try:
-        # Ask AI for legal rights overview with Google Search
-        prompt = """Provide a clean, structured overview of Fundamental Rights in India:
-
-List the 6 main categories of Fundamental Rights (Articles 12-35) with:
-- Article numbers
-- Brief description (one line each)
-
-Also mention 3 important legal rights every citizen should know.
-
-Keep under 2000 characters. Use official Constitution sources."""
-
-        response_text = legal_bot.send_message(user_id, prompt)
-        response_text = clean_markdown(response_text)
+        # Ask AI for legal rights overview with Google Search (cached across users)
+        response_text = await legal_bot.send_cached_message(user_id, LAWS_PROMPT)
         
         # Format with header and footer
         formatted_response = f"""⚖️ *Legal Rights in India*
@@ -376,14 +643,7 @@ Keep under 2000 characters. Use official Constitution sources."""
 🔍 *Need Legal Advice?*
 Ask me about specific laws or your situation!"""
 
-        if len(formatted_response) > 3800:
-            formatted_response = formatted_response[:3700] + "...\n\n💡 Ask for specific laws!"
-        
-        try:
-            await update.message.reply_text(formatted_response, parse_mode='Markdown')
-        except Exception as parse_error:
-            logger.error(f"Markdown parse error in laws: {parse_error}")
-            await update.message.reply_text(formatted_response)
+        await reply_rendered(update.message, formatted_response)
             
     except Exception as e:
         logger.error(f"Error in laws command: {e}")
@@ -432,22 +692,15 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await legal_bot.send_police_stations_callback(query)
     elif query.data == 'gov_schemes':
         # Create temporary message to send to AI
-        context.user_data['temp_message'] = "Tell me about major government schemes in India and Andhra Pradesh (brief overview)"
+        context.user_data['temp_message'] = GOV_SCHEMES_BUTTON_PROMPT
         # Simulate a message update
         await handle_message_for_callback(query, context)
     elif query.data == 'legal_info':
-        context.user_data['temp_message'] = "Give me an overview of common legal rights in India (brief)"
+        context.user_data['temp_message'] = LEGAL_INFO_BUTTON_PROMPT
         await handle_message_for_callback(query, context)
     elif query.data == 'suggestions':
         # Show suggested questions with keyboard
-        keyboard = [
-            ["What are my tenant rights?"],
-            ["How to file consumer complaint?"],
-            ["What is POCSO Act?"],
-            ["Tell me about PM Kisan Yojana"],
-            ["What is Section 498A IPC?"],
-            ["How to get police protection?"]
-        ]
+        keyboard = [[q] for q in MENU_SUGGESTED_QUESTIONS]
         reply_markup = ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
         await query.message.reply_text(
             "💡 *Here are some questions you can ask:*\n\nTap any question below or type your own!",
@@ -463,17 +716,9 @@ async def handle_message_for_callback(query, context):
         user_id = query.from_user.id
         
         try:
-            response_text = legal_bot.send_message(user_id, user_message)
-            
-            # Truncate if too long
-            if len(response_text) > 4000:
-                response_text = response_text[:3900] + "...\n\n(Response truncated. Ask for specific details!)"
-            
-            try:
-                await query.message.reply_text(response_text, parse_mode='Markdown')
-            except:
-                # Fallback to plain text
-                await query.message.reply_text(response_text)
+            # Button prompts are fixed, so they share the response cache
+            response_text = await legal_bot.send_cached_message(user_id, user_message)
+            await reply_rendered(query.message, response_text)
         except Exception as e:
             await query.message.reply_text(f"I can help you with: {user_message}\n\nPlease ask me directly!")
 
@@ -509,12 +754,33 @@ Your location data is used only to find nearby police stations and is not stored
     )
 
 
+def format_nearby_stations(stations):
+    """Format [{'name', 'address', 'phone', 'distance'}] as the location reply"""
+    response_parts = ["📍 *Nearest Police Stations to Your Location:*\n"]
+    
+    for idx, station in enumerate(stations, 1):
+        station_info = f"""
+{idx}. *{station['name']}*
+📍 Address: {station['address']}
+📞 Phone: {station['phone']}
+🚗 Distance: {station['distance']} km
+"""
+        response_parts.append(station_info)
+    
+    response_parts.append("""
+---
+🚨 *Emergency Numbers:*
+📞 Police: 100 | 🆘 Emergency: 112
+
+💡 *Tip:* Save these numbers for quick access!
+""")
+    
+    return "\n".join(response_parts)
+
+
 async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle location shared by user - Uses Google Maps Places API"""
+    """Handle location shared by user - local station index first, Google Maps Places API as fallback"""
     from telegram import ReplyKeyboardRemove
-    import googlemaps
-    from datetime import datetime
-    import math
     
     location = update.message.location
     
@@ -528,24 +794,43 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
     latitude = location.latitude
     longitude = location.longitude
     
-    await update.message.reply_text(
-        f"📍 Location received!\n🔍 Searching for nearest police stations using Google Maps...",
-        reply_markup=ReplyKeyboardRemove()
+    # Inside the registry's coverage we can answer locally without a paid Maps call
+    nearest = legal_bot.station_index.nearest(
+        latitude, longitude, k=3, max_distance_km=config.LOCAL_STATION_COVERAGE_KM
     )
+    if nearest:
+        stations = [
+            {
+                'name': station['name'],
+                'address': station['address'],
+                'phone': station['phone'],
+                'distance': round(distance, 2)
+            }
+            for distance, station in nearest
+        ]
+        await update.message.reply_text(
+            format_nearby_stations(stations),
+            parse_mode='Markdown',
+            reply_markup=ReplyKeyboardRemove()
+        )
+        return
     
     try:
-        # Initialize Google Maps client
-        gmaps = googlemaps.Client(key=config.GOOGLE_MAPS_API_KEY)
+        # Nearby users share a geohash cell, so most lookups never reach the Maps API
+        cell = geohash_encode(latitude, longitude, config.PLACES_CACHE_PRECISION)
+        nearby = legal_bot.places_cache.get(cell)
         
-        # Search for police stations near the coordinates
-        places_result = gmaps.places_nearby(
-            location=(latitude, longitude),
-            radius=5000,  # Search within 5km radius
-            type='police',
-            keyword='police station'
-        )
+        if nearby is None:
+            await update.message.reply_text(
+                f"📍 Location received!\n🔍 Searching for nearest police stations using Google Maps...",
+                reply_markup=ReplyKeyboardRemove()
+            )
+            nearby = await legal_bot.fetch_nearby_stations(latitude, longitude)
+            # Empty lists and missing phones may be a passing Maps failure - don't keep them for a month
+            degraded = not nearby or any(station['phone'] == "Not available" for station in nearby)
+            legal_bot.places_cache.set(cell, nearby, ttl=config.PLACES_CACHE_DEGRADED_TTL if degraded else None)
         
-        if not places_result.get('results'):
+        if not nearby:
             await update.message.reply_text(
                 "❌ No police stations found near your location.\n\n"
                 "📞 Emergency: 100 | 112\n\n"
@@ -554,66 +839,20 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
         
-        # Get top 3 nearest police stations
-        police_stations = places_result['results'][:3]
-        
-        def calculate_distance(lat1, lon1, lat2, lon2):
-            """Calculate distance between two coordinates using Haversine formula"""
-            R = 6371  # Radius of Earth in kilometers
-            
-            lat1_rad = math.radians(lat1)
-            lat2_rad = math.radians(lat2)
-            delta_lat = math.radians(lat2 - lat1)
-            delta_lon = math.radians(lon2 - lon1)
-            
-            a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-            
-            distance = R * c
-            return round(distance, 2)
-        
-        # Format the response
-        response_parts = ["📍 *Nearest Police Stations to Your Location:*\n"]
-        
-        for idx, station in enumerate(police_stations, 1):
-            name = station.get('name', 'Unknown Police Station')
-            address = station.get('vicinity', 'Address not available')
-            
-            # Get place details for phone number
-            place_id = station.get('place_id')
-            try:
-                place_details = gmaps.place(place_id=place_id, fields=['formatted_phone_number', 'international_phone_number'])
-                phone = place_details.get('result', {}).get('formatted_phone_number') or \
-                        place_details.get('result', {}).get('international_phone_number') or \
-                        "Not available"
-            except:
-                phone = "Not available"
-            
-            # Calculate distance
-            station_lat = station['geometry']['location']['lat']
-            station_lon = station['geometry']['location']['lng']
-            distance = calculate_distance(latitude, longitude, station_lat, station_lon)
-            
-            # Build station info
-            station_info = f"""
-{idx}. *{name}*
-📍 Address: {address}
-📞 Phone: {phone}
-🚗 Distance: {distance} km
-"""
-            response_parts.append(station_info)
-        
-        response_parts.append("""
----
-🚨 *Emergency Numbers:*
-📞 Police: 100 | 🆘 Emergency: 112
-
-💡 *Tip:* Save these numbers for quick access!
-""")
+        # Distances are always computed for this user's exact point
+        stations = [
+            {
+                'name': station['name'],
+                'address': station['vicinity'],
+                'phone': station['phone'],
+                'distance': round(distance, 2)
+            }
+            for distance, station in rank_by_distance(latitude, longitude, nearby, k=3)
+        ]
         
-        response = "\n".join(response_parts)
+        response = format_nearby_stations(stations)
         
-        await update.message.reply_text(response, parse_mode='Markdown')
+        await reply_rendered(update.message, response, reply_markup=ReplyKeyboardRemove())
         
     except Exception as e:
         logger.error(f"Error finding police stations by location: {e}")
@@ -637,6 +876,7 @@ async def complaint_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode='Markdown'
     )
     context.user_data['complaint'] = {}
+    legal_bot.session_tasks.cancel(update.message.from_user.id)  # Drop leftovers from an abandoned complaint
     return COMPLAINT_NAME
 
 
@@ -699,22 +939,47 @@ async def complaint_address(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return COMPLAINT_INITIAL_DESC
 
 
+def start_police_prefetch(user_id, complaint_data, complaint_type):
+    """Start the police-station lookup in the background (no-op if already running for these inputs)"""
+    incident_location = complaint_data['incident_location']
+    legal_bot.session_tasks.start(
+        user_id,
+        'police_station',
+        legal_bot.jurisdiction_resolver.resolve(incident_location, complaint_type, complaint_data.get('address')),
+        tag=jurisdiction_key(incident_location, complaint_type)
+    )
+
+
+async def ask_additional_details(update: Update):
+    await update.message.reply_text(
+        "*Any additional details you want to add?*\n\n"
+        "Include witnesses, evidence, sequence of events, etc.\n"
+        "Or type 'no' to skip",
+        reply_markup=ReplyKeyboardRemove(),  # Clears the complaint-type keyboard if it was shown
+        parse_mode='Markdown'
+    )
+    return COMPLAINT_DESCRIPTION
+
+
 async def complaint_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Get complaint type confirmation or custom input"""
     user_input = update.message.text.strip()
+    complaint_data = context.user_data['complaint']
     
     if user_input.lower() in ['yes', 'correct', 'ok', 'y', 'yeah', 'right']:
         # User confirmed the AI suggestion
-        complaint_type = context.user_data['complaint'].get('suggested_type', user_input)
+        complaint_type = complaint_data.get('suggested_type', user_input)
     elif user_input.lower() == 'skip':
         complaint_type = "General Complaint"
     else:
         # User typed their own complaint type
         complaint_type = user_input
     
-    context.user_data['complaint']['complaint_type'] = complaint_type
-    await update.message.reply_text("*When did the incident occur? (Date and time)*", parse_mode='Markdown')
-    return COMPLAINT_DATE
+    complaint_data['complaint_type'] = complaint_type
+    
+    # Restarts the prefetch only if the confirmed type differs from the suggestion
+    start_police_prefetch(update.message.from_user.id, complaint_data, complaint_type)
+    return await ask_additional_details(update)
 
 
 async def complaint_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -729,73 +994,108 @@ async def complaint_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return COMPLAINT_LOCATION
 
 
-async def complaint_initial_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get initial incident description and auto-detect complaint type"""
-    description = update.message.text
-    context.user_data['complaint']['initial_description'] = description
-    
-    # Show analyzing message
-    await update.message.reply_text("🤔 Analyzing your complaint...", parse_mode='Markdown')
-    
-    try:
-        # Use AI to detect complaint type
-        analysis_prompt = f"""Based on this incident description, identify the most appropriate complaint type.
+async def detect_complaint_type_with_gemini(user_id, description):
+    """Ask Gemini for the complaint type when the local classifier is unsure"""
+    analysis_prompt = f"""Based on this incident description, identify the most appropriate complaint type.
 
 Description: "{description}"
 
 Analyze and respond with ONLY the complaint type in this format:
 Type: [complaint type]
 
-Choose from: Theft, Robbery, Fraud, Cheating, Harassment, Cyber Crime, Domestic Violence, Property Dispute, Assault, Kidnapping, Missing Person, Traffic Violation, Forgery, or suggest appropriate type.
+Choose from: {", ".join(config.COMPLAINT_TYPE_KEYWORDS)}, or suggest appropriate type.
 
 Keep it concise - just the type name."""
 
-        user_id = update.message.from_user.id
-        ai_response = legal_bot.send_message(user_id, analysis_prompt)
-        
-        # Extract complaint type from AI response
-        complaint_type = ai_response.strip()
-        if "Type:" in complaint_type:
-            complaint_type = complaint_type.split("Type:")[1].strip()
-        
-        # Clean up the response
-        complaint_type = complaint_type.split('\n')[0].strip()
-        
-        context.user_data['complaint']['suggested_type'] = complaint_type
-        
-        # Ask for confirmation
-        await update.message.reply_text(
-            f"✅ *I understand this is about:*\n\n"
-            f"📋 **{complaint_type}**\n\n"
-            f"Is this correct?\n"
-            f"• Type *'yes'* to confirm\n"
-            f"• Type the correct complaint type (e.g., 'Theft', 'Fraud')\n"
-            f"• Type *'skip'* if you're not sure",
-            parse_mode='Markdown'
+    ai_response = await legal_bot.send_message(user_id, analysis_prompt, PRIORITY_COMPLAINT)
+    
+    # Extract complaint type from AI response
+    complaint_type = ai_response.strip()
+    if "Type:" in complaint_type:
+        complaint_type = complaint_type.split("Type:")[1].strip()
+    
+    # Clean up the response
+    return complaint_type.split('\n')[0].strip()
+
+
+async def complaint_initial_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Get initial incident description and start complaint type detection"""
+    description = update.message.text
+    complaint_data = context.user_data['complaint']
+    complaint_data['initial_description'] = description
+    
+    # Confident local classification skips the Gemini round trip entirely
+    suggested_type = legal_bot.complaint_classifier.classify(description, config.COMPLAINT_CLASSIFIER_THRESHOLD)
+    if suggested_type is not None:
+        complaint_data['suggested_type'] = suggested_type
+    else:
+        # Gemini works on it while the user answers the date and location questions
+        complaint_data.pop('suggested_type', None)
+        legal_bot.session_tasks.start(
+            update.message.from_user.id,
+            'complaint_type',
+            detect_complaint_type_with_gemini(update.message.from_user.id, description),
+            tag=description
         )
-        
-    except Exception as e:
-        logger.error(f"Error in auto-detecting complaint type: {e}")
+    
+    await update.message.reply_text(
+        "✅ Got it. I'll work out the complaint type while we continue.\n\n"
+        "*When did the incident occur? (Date and time)*",
+        parse_mode='Markdown'
+    )
+    return COMPLAINT_DATE
+
+
+async def complaint_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Get incident location, then confirm the detected complaint type"""
+    user_id = update.message.from_user.id
+    complaint_data = context.user_data['complaint']
+    complaint_data['incident_location'] = update.message.text
+    
+    if 'suggested_type' not in complaint_data:
+        initial_description = complaint_data.get('initial_description', '')
+        # Usually finished while the user was typing; otherwise wait briefly and say so
+        if legal_bot.session_tasks.running(user_id, 'complaint_type'):
+            await update.message.reply_text("🔎 Identifying the complaint type...")
+        suggested_type = await legal_bot.session_tasks.take(
+            user_id,
+            'complaint_type',
+            tag=initial_description,
+            timeout=config.COMPLAINT_TYPE_WAIT_TIMEOUT
+        )
+        if not suggested_type:
+            # Gemini slow or failed - offer the best keyword match; the user confirms it anyway
+            suggested_type, _ = legal_bot.complaint_classifier.predict(initial_description)
+        if suggested_type:
+            complaint_data['suggested_type'] = suggested_type
+    
+    suggested_type = complaint_data.get('suggested_type')
+    if not suggested_type:
+        labels = list(config.COMPLAINT_TYPE_KEYWORDS)
+        keyboard = [labels[i:i + 2] for i in range(0, len(labels), 2)] + [["skip"]]
         await update.message.reply_text(
             "*What type of complaint is this?*\n\n"
-            "Examples: Theft, Fraud, Harassment, Property Dispute\n"
-            "Or type 'skip' if not sure",
+            "Tap one below, type your own, or type 'skip' if not sure",
+            reply_markup=ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True),
             parse_mode='Markdown'
         )
+        return COMPLAINT_TYPE
+    
+    # Most users confirm the suggestion - start the police lookup on it right away
+    start_police_prefetch(user_id, complaint_data, suggested_type)
     
-    return COMPLAINT_TYPE
-
-
-async def complaint_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Get incident location"""
-    context.user_data['complaint']['incident_location'] = update.message.text
     await update.message.reply_text(
-        "*Any additional details you want to add?*\n\n"
-        "Include witnesses, evidence, sequence of events, etc.\n"
-        "Or type 'no' to skip",
-        parse_mode='Markdown'
+        render_html(
+            f"✅ *I understand this is about:*\n\n"
+            f"📋 **{suggested_type}**\n\n"
+            f"Is this correct?\n"
+            f"• Type *'yes'* to confirm\n"
+            f"• Type the correct complaint type (e.g., 'Theft', 'Fraud')\n"
+            f"• Type *'skip'* if you're not sure"
+        ),
+        parse_mode='HTML'
     )
-    return COMPLAINT_DESCRIPTION
+    return COMPLAINT_TYPE
 
 
 async def complaint_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -805,7 +1105,10 @@ async def complaint_description(update: Update, context: ContextTypes.DEFAULT_TY
     # Combine initial description with additional details
     initial_desc = context.user_data['complaint'].get('initial_description', '')
     
-    if additional_details.lower() in ['no', 'skip', 'none']:
+    if additional_details.lower() == 'retry' and 'description' in context.user_data['complaint']:
+        # The PDF pool was busy last time - keep the details already given
+        final_description = context.user_data['complaint']['description']
+    elif additional_details.lower() in ['no', 'skip', 'none']:
         final_description = initial_desc
     else:
         final_description = f"{initial_desc}\n\nAdditional Details: {additional_details}"
@@ -819,7 +1122,6 @@ async def complaint_description(update: Update, context: ContextTypes.DEFAULT_TY
     # Safety check for complaint_type
     complaint_type = complaint_data.get('complaint_type', 'General Complaint')
     description = complaint_data['description']
-    address = complaint_data['address']
     incident_location = complaint_data['incident_location']
     
     # Get applicable laws (now includes description analysis)
@@ -830,34 +1132,18 @@ async def complaint_description(update: Update, context: ContextTypes.DEFAULT_TY
     await update.message.reply_text("🔍 Searching for nearest police stations in your area...")
     
     try:
-        user_id = update.message.from_user.id
-        
-        # Ask AI to search for nearest police stations
-        police_search_prompt = f"""Search Google for police stations with jurisdiction over this complaint:
-
-Incident Location: {incident_location}
-User Address: {address}  
-Complaint Type: {complaint_type}
-
-Provide ONLY the following in a clean format:
-
-**Police Station Name**
-📍 Address: [Full address with mandal, district, pincode]
-📞 Phone: [Contact number]
-✅ Jurisdiction: [Brief - covers this area for {complaint_type} cases]
-
-If there are 2 stations (one for incident, one for residence), list both clearly.
-
-Keep it SHORT and CLEAN. No explanations. Just facts."""
-
-        police_response = legal_bot.send_message(user_id, police_search_prompt)
-        
-        # Extract clean police station name for PDF
-        # Take first line or first station name
-        police_lines = police_response.strip().split('\n')
-        clean_police_name = police_lines[0].replace('**', '').replace('*', '').strip()
-        if clean_police_name.startswith('#'):
-            clean_police_name = police_lines[1].replace('**', '').replace('*', '').strip() if len(police_lines) > 1 else "Police Station"
+        # Usually already prefetched in complaint_location; otherwise resolve now
+        station = await legal_bot.session_tasks.take(
+            update.message.from_user.id,
+            'police_station',
+            tag=jurisdiction_key(incident_location, complaint_type)
+        )
+        if station is None:
+            # Repeat jurisdictions are answered from cache; new ones ask Gemini with Google Search
+            station = await legal_bot.jurisdiction_resolver.resolve(
+                incident_location, complaint_type, complaint_data.get('address')
+            )
+        police_response = station['police_details']
         
         # Clean and format the response
         police_info = f"""
@@ -870,7 +1156,7 @@ Keep it SHORT and CLEAN. No explanations. Just facts."""
 📞 Police: 100 | 🆘 Emergency: 112
 """
         
-        complaint_data['police_station'] = clean_police_name  # Clean name for PDF
+        complaint_data['police_station'] = station['police_station']  # Clean name for PDF
         complaint_data['police_details'] = police_response  # Full details for reference
         
     except Exception as e:
@@ -893,7 +1179,8 @@ To find your nearest police station, search online or dial 100 for police assist
     # Generate PDF
     try:
         filename = f"complaint_{update.message.from_user.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = create_complaint_pdf(complaint_data, filename)
+        # Rendered in memory by the worker pool - nothing touches the shared filesystem
+        pdf_bytes = await legal_bot.pdf_pool.render_complaint(complaint_data)
         
         # Send summary
         summary = f"""
@@ -917,22 +1204,27 @@ To find your nearest police station, search online or dial 100 for police assist
 📄 *Your complaint PDF is ready below* ⬇️
 """
         
-        await update.message.reply_text(summary, parse_mode='Markdown')
+        await reply_rendered(update.message, summary)
         
         # Send PDF
-        with open(pdf_path, 'rb') as pdf_file:
-            await update.message.reply_document(
-                document=pdf_file,
-                filename=filename,
-                caption="📄 Your complaint form is ready!\n\n"
-                        "⚠️ Please review carefully and submit at your LOCAL police station.\n"
-                        "💡 Carry original documents and evidence.\n"
-                        "🚨 For emergency, dial 100 or 112"
-            )
-        
-        # Clean up
-        os.remove(pdf_path)
+        await update.message.reply_document(
+            document=BytesIO(pdf_bytes),
+            filename=filename,
+            caption="📄 Your complaint form is ready!\n\n"
+                    "⚠️ Please review carefully and submit at your LOCAL police station.\n"
+                    "💡 Carry original documents and evidence.\n"
+                    "🚨 For emergency, dial 100 or 112"
+        )
         
+    except PDFPoolBusy as e:
+        logger.warning(f"PDF render pool saturated: {e}")
+        # Keep everything collected so far and let the user retry this last step
+        await update.message.reply_text(
+            "⏱️ Many complaints are being generated right now. Your details are saved.\n\n"
+            "Please type *'retry'* in a minute to generate your complaint PDF.",
+            parse_mode='Markdown'
+        )
+        return COMPLAINT_DESCRIPTION
     except Exception as e:
         logger.error(f"Error generating PDF: {e}")
         await update.message.reply_text("❌ Sorry, there was an error generating the PDF. Please try again.")
@@ -942,6 +1234,7 @@ To find your nearest police station, search online or dial 100 for police assist
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancel current operation"""
+    legal_bot.session_tasks.cancel(update.message.from_user.id)
     await update.message.reply_text(
         "❌ Operation cancelled.\n\nUse /start to begin again.",
         reply_markup=ReplyKeyboardRemove()
@@ -949,49 +1242,27 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
-def clean_markdown(text):
-    """Clean and fix markdown formatting for Telegram"""
-    import re
-    
-    # Remove excessive asterisks and fix bold formatting
-    text = re.sub(r'\*\*\*+', '**', text)  # Triple+ asterisks to double
-    text = re.sub(r'(?<!\*)\*(?!\*)', '', text)  # Remove single asterisks
-    
-    # Fix headings - convert ## to bold
-    text = re.sub(r'###\s+(.+?)$', r'*\1*', text, flags=re.MULTILINE)
-    text = re.sub(r'##\s+(.+?)$', r'*\1*', text, flags=re.MULTILINE)
-    text = re.sub(r'#\s+(.+?)$', r'*\1*', text, flags=re.MULTILINE)
-    
-    # Clean up extra spaces
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    return text.strip()
+def detect_topic(user_message):
+    """Classify a question as law, schemes or general"""
+    message_lower = user_message.lower()
+    if any(word in message_lower for word in ['law', 'ipc', 'section', 'act', 'legal']):
+        return "law"
+    if any(word in message_lower for word in ['scheme', 'yojana', 'benefit', 'pension']):
+        return "schemes"
+    return "general"
+
+
+async def reply_rendered(message, text, **kwargs):
+    """Reply with Markdown text as valid HTML in as few messages as possible (kwargs go on the last)"""
+    html_messages = render_messages(text) or ["…"]
+    for html_text in html_messages[:-1]:
+        await message.reply_text(html_text, parse_mode='HTML')
+    return await message.reply_text(html_messages[-1], parse_mode='HTML', **kwargs)
 
 
 async def send_suggested_questions(update: Update, topic="general"):
     """Send suggested questions to user"""
-    suggestions = {
-        "general": [
-            "What are my tenant rights?",
-            "How to file consumer complaint?",
-            "What is Right to Information Act?",
-            "Tell me about government schemes"
-        ],
-        "law": [
-            "What is Section 498A IPC?",
-            "Explain dowry prohibition law",
-            "What is POCSO Act?",
-            "Tell me about bail procedures"
-        ],
-        "schemes": [
-            "PM Kisan Yojana details",
-            "Ayushman Bharat scheme",
-            "Pension schemes in India",
-            "Housing schemes in AP"
-        ]
-    }
-    
-    questions = suggestions.get(topic, suggestions["general"])
+    questions = SUGGESTED_QUESTIONS.get(topic, SUGGESTED_QUESTIONS["general"])
     keyboard = [[q] for q in questions]
     reply_markup = ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
     
@@ -1011,8 +1282,21 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.chat.send_action("typing")
     
     try:
-        # Add context about Kakinada
-        contextualized_message = f"""{user_message}
+        topic = detect_topic(user_message)
+        
+        # Follow-ups depend on earlier turns; first questions and tapped suggestions stand alone
+        standalone = normalize_question(user_message) in STANDALONE_QUESTIONS
+        use_cache = standalone or not legal_bot.chat_sessions.has_history(user_id)
+        
+        # Repeat questions are answered from cache without touching Gemini
+        cache_key = legal_bot.answer_cache_key(user_message) if use_cache else None
+        response_text = legal_bot.answer_cache.get(cache_key) if cache_key else None
+        
+        streamed = False
+        
+        if response_text is None:
+            # Add context about Kakinada
+            contextualized_message = f"""{user_message}
 
 [Context: User is from Kakinada, Andhra Pradesh, India. 
 Instructions: 
@@ -1020,66 +1304,41 @@ Instructions:
 - Use simple formatting (bold for headings)
 - Be clear and easy to understand
 - End with a helpful suggestion if relevant]"""
-        
-        # Send message to Gemini with Google Search
-        response_text = legal_bot.send_message(user_id, contextualized_message)
-        
-        # Clean markdown
-        response_text = clean_markdown(response_text)
-        
-        # Split message if too long (Telegram limit is 4096 characters)
-        max_length = 3800
-        if len(response_text) > max_length:
-            # Split into chunks at paragraph breaks
-            paragraphs = response_text.split('\n\n')
-            chunks = []
-            current_chunk = ""
             
-            for para in paragraphs:
-                if len(current_chunk) + len(para) + 2 < max_length:
-                    current_chunk += para + "\n\n"
-                else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = para + "\n\n"
+            if config.STREAM_RESPONSES:
+                # Show the answer as it is generated instead of after the full response
+                reply = StreamingReply(update.message, edit_interval=config.STREAM_EDIT_INTERVAL)
+                # A standalone answer is cached for everyone, so it must not depend on this user's history
+                async for text_chunk in legal_bot.send_message_stream(user_id, contextualized_message,
+                                                                      use_history=not standalone):
+                    await reply.append(text_chunk)
+                if not reply.text.strip():
+                    raise ValueError("Empty response from Gemini")
+                await reply.finish(render_html)
+                response_text = reply.text
+                streamed = True
+            else:
+                # Send message to Gemini with Google Search
+                response_text = await legal_bot.send_message(user_id, contextualized_message, use_history=not standalone)
             
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            
-            # Send chunks
-            for i, chunk in enumerate(chunks):
-                try:
-                    await update.message.reply_text(chunk, parse_mode='Markdown')
-                except:
-                    # Fallback to plain text if markdown fails
-                    await update.message.reply_text(chunk)
-                
-                # Add "continued..." for multi-part messages
-                if i < len(chunks) - 1:
-                    await update.message.reply_text("_(continued...)_", parse_mode='Markdown')
-        else:
-            # Send single message
-            try:
-                await update.message.reply_text(response_text, parse_mode='Markdown')
-            except Exception as e:
-                # Fallback to plain text if markdown fails
-                logger.warning(f"Markdown parse failed, sending as plain text: {e}")
-                # Remove all markdown
-                plain_text = response_text.replace('*', '').replace('_', '').replace('`', '')
-                await update.message.reply_text(plain_text)
+            if cache_key:
+                legal_bot.answer_cache.set(cache_key, normalize_question(user_message), response_text, topic)
+        
+        # Remember the exchange so follow-up questions keep their context
+        legal_bot.chat_sessions.add_exchange(user_id, user_message, response_text)
+        
+        if not streamed:
+            # Long answers are packed into the fewest messages Telegram allows
+            await reply_rendered(update.message, response_text)
         
         # Show suggested questions periodically
         if not context.user_data.get('suggestion_shown', False):
-            # Determine topic based on keywords
-            topic = "general"
-            if any(word in user_message.lower() for word in ['law', 'ipc', 'section', 'act', 'legal']):
-                topic = "law"
-            elif any(word in user_message.lower() for word in ['scheme', 'yojana', 'benefit', 'pension']):
-                topic = "schemes"
-            
             await send_suggested_questions(update, topic)
             context.user_data['suggestion_shown'] = True
         
+    except SchedulerOverloaded as e:
+        logger.warning(f"Request shed by Gemini scheduler: {e}")
+        await update.message.reply_text("⏱️ Too many requests right now. Please try again in a moment.")
     except Exception as e:
         logger.error(f"Error processing message: {e}")
         await update.message.reply_text(
@@ -1115,15 +1374,7 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # For now, text-only response (image support needs different implementation in new SDK)
         response_text = f"📋 *Image Received*\n\n{caption}\n\nNote: Full image analysis coming soon with updated SDK."
         
-        # Handle long responses
-        if len(response_text) > 4000:
-            response_text = response_text[:3900] + "...\n\n(Response truncated)"
-        
-        try:
-            await update.message.reply_text(response_text, parse_mode='Markdown')
-        except:
-            # Fallback to plain text
-            await update.message.reply_text(response_text)
+        await reply_rendered(update.message, response_text)
         
     except Exception as e:
         logger.error(f"Error processing image: {e}")
@@ -1153,52 +1404,151 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Sorry, I couldn't process the document. Please try again.")
 
 
+async def post_init(application: Application):
+    """Warm caches and start the metrics endpoint once the event loop is running"""
+    legal_bot.warm_response_cache()
+    register_runtime_metrics(application)
+    legal_bot.metrics_runner = None
+    if config.METRICS_PORT:
+        try:
+            legal_bot.metrics_runner = await start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+        except OSError as e:
+            # Metrics are optional - never keep the bot from starting
+            logger.error(f"Could not start metrics server on {config.METRICS_HOST}:{config.METRICS_PORT}: {e}")
+
+
+async def post_shutdown(application: Application):
+    """Release shared network clients"""
+    if getattr(legal_bot, 'metrics_runner', None):
+        await legal_bot.metrics_runner.cleanup()
+    await legal_bot.maps_client.close()
+    legal_bot.places_cache.close()
+    legal_bot.jurisdiction_resolver.cache.close()
+    legal_bot.pdf_pool.shutdown()
+    if isinstance(application.bot.rate_limiter, OutboundRateLimiter):
+        logger.info(f"Outbound Telegram sends: {application.bot.rate_limiter.stats}")
+
+
+def _hit_ratio(stats, hit_keys=('hits',)):
+    hits = sum(stats[key] for key in hit_keys)
+    total = sum(stats.values())
+    return hits / total if total else 0.0
+
+
+def register_runtime_metrics(application):
+    """Gauges read from the bot's own counters at scrape time"""
+    REGISTRY.gauge("bot_cache_hit_ratio", "Fraction of lookups served from cache", ["cache"]).set_function(lambda: {
+        ('answer',): legal_bot.answer_cache.hit_ratio(),
+        ('response',): _hit_ratio(legal_bot.response_cache.stats, ('hits', 'stale_hits')),
+        ('places',): _hit_ratio(legal_bot.places_cache.stats),
+        ('jurisdiction',): _hit_ratio(legal_bot.jurisdiction_resolver.cache.stats),
+    })
+    REGISTRY.counter("bot_gemini_calls_coalesced_total", "Identical Gemini calls answered by one in-flight request").set_function(
+        lambda: legal_bot.single_flight.stats['coalesced'])
+    REGISTRY.gauge("bot_gemini_queue_depth", "Requests waiting for Gemini admission", ["priority"]).set_function(
+        lambda: {(priority,): depth for priority, depth in legal_bot.scheduler.queue_depths().items()})
+    REGISTRY.counter("bot_gemini_requests_shed_total", "Gemini requests rejected by the scheduler").set_function(
+        lambda: legal_bot.scheduler.stats['shed'])
+    REGISTRY.gauge("bot_pdf_pool_pending", "PDF renders queued or running").set_function(legal_bot.pdf_pool.pending)
+    REGISTRY.gauge("bot_chat_sessions", "Users with chat history in memory").set_function(
+        lambda: len(legal_bot.chat_sessions))
+    REGISTRY.gauge("bot_session_tasks", "Background complaint tasks not yet claimed").set_function(
+        lambda: len(legal_bot.session_tasks))
+    CONVERSATION_STATES.set_function(complaint_tracker.counts)
+
+    rate_limiter = application.bot.rate_limiter
+    if isinstance(rate_limiter, OutboundRateLimiter):
+        REGISTRY.gauge("bot_telegram_send_queue_depth", "Outbound Telegram calls waiting for a token", ["queue"]).set_function(
+            lambda: {(queue,): depth for queue, depth in rate_limiter.queue_depths().items()})
+        REGISTRY.counter("bot_telegram_flood_waits_total", "RetryAfter responses from Telegram").set_function(
+            lambda: rate_limiter.stats['flood_waits'])
+
+
 def main():
     """Start the bot"""
-    # Create application
-    application = Application.builder().token(config.TELEGRAM_BOT_TOKEN).build()
+    global legal_bot
+    legal_bot = KakinadaLegalBot()
+    
+    # Create application - updates from different chats run concurrently, same chat in order
+    builder = (
+        Application.builder()
+        .token(config.TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(PerChatUpdateProcessor(config.CONCURRENT_UPDATES))
+        # Every outgoing call is paced to Telegram's global and per-chat limits
+        .rate_limiter(OutboundRateLimiter(
+            global_rate=config.TELEGRAM_GLOBAL_RATE,
+            per_chat_rate=config.TELEGRAM_PER_CHAT_RATE,
+            per_chat_burst=config.TELEGRAM_PER_CHAT_BURST,
+            max_retries=config.TELEGRAM_MAX_RETRIES
+        ))
+        .persistence(SQLitePersistence(
+            config.PERSISTENCE_DB,
+            flush_interval=config.PERSISTENCE_FLUSH_INTERVAL_MS / 1000,
+            flush_batch_size=config.PERSISTENCE_FLUSH_BATCH_SIZE
+        ))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if config.TELEGRAM_API_BASE_URL:
+        # Point at a local fake Bot API server for load testing
+        builder = builder.base_url(config.TELEGRAM_API_BASE_URL)
+    application = builder.build()
     
     # Add command handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("police", police_stations))
-    application.add_handler(CommandHandler("schemes", schemes_command))
-    application.add_handler(CommandHandler("laws", laws_command))
+    application.add_handler(CommandHandler("start", instrument(start)))
+    application.add_handler(CommandHandler("help", instrument(help_command)))
+    application.add_handler(CommandHandler("police", instrument(police_stations)))
+    application.add_handler(CommandHandler("schemes", instrument(schemes_command)))
+    application.add_handler(CommandHandler("laws", instrument(laws_command)))
     
     # Location handler (must be before general message handler)
-    application.add_handler(MessageHandler(filters.LOCATION, handle_location))
+    application.add_handler(MessageHandler(filters.LOCATION, instrument(handle_location)))
     
     # Add callback query handler for buttons
-    application.add_handler(CallbackQueryHandler(button_handler))
+    application.add_handler(CallbackQueryHandler(instrument(button_handler)))
     
     # Complaint filing conversation
     complaint_handler = ConversationHandler(
-        entry_points=[CommandHandler("complaint", complaint_start)],
+        entry_points=[CommandHandler("complaint", instrument(complaint_start, conversation=complaint_tracker))],
         states={
-            COMPLAINT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_name)],
-            COMPLAINT_FATHER_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_father_name)],
-            COMPLAINT_AGE: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_age)],
-            COMPLAINT_PHONE: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_phone)],
-            COMPLAINT_EMAIL: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_email)],
-            COMPLAINT_ADDRESS: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_address)],
-            COMPLAINT_INITIAL_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_initial_description)],
-            COMPLAINT_TYPE: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_type)],
-            COMPLAINT_DATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_date)],
-            COMPLAINT_LOCATION: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_location)],
-            COMPLAINT_DESCRIPTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, complaint_description)],
+            COMPLAINT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_name, conversation=complaint_tracker))],
+            COMPLAINT_FATHER_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_father_name, conversation=complaint_tracker))],
+            COMPLAINT_AGE: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_age, conversation=complaint_tracker))],
+            COMPLAINT_PHONE: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_phone, conversation=complaint_tracker))],
+            COMPLAINT_EMAIL: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_email, conversation=complaint_tracker))],
+            COMPLAINT_ADDRESS: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_address, conversation=complaint_tracker))],
+            # Type is confirmed after date/location so its detection overlaps with the user's typing
+            COMPLAINT_INITIAL_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_initial_description, conversation=complaint_tracker))],
+            COMPLAINT_DATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_date, conversation=complaint_tracker))],
+            COMPLAINT_LOCATION: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_location, conversation=complaint_tracker))],
+            COMPLAINT_TYPE: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_type, conversation=complaint_tracker))],
+            COMPLAINT_DESCRIPTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(complaint_description, conversation=complaint_tracker))],
         },
-        fallbacks=[CommandHandler("cancel", cancel)],
+        fallbacks=[CommandHandler("cancel", instrument(cancel, conversation=complaint_tracker))],
+        name="complaint",
+        persistent=True,  # Half-filled complaints survive restarts
     )
     application.add_handler(complaint_handler)
     
     # Add message handlers
-    application.add_handler(MessageHandler(filters.PHOTO, handle_photo))
-    application.add_handler(MessageHandler(filters.Document.ALL, handle_document))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    application.add_handler(MessageHandler(filters.PHOTO, instrument(handle_photo)))
+    application.add_handler(MessageHandler(filters.Document.ALL, instrument(handle_document)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(handle_message)))
     
     # Start bot
-    logger.info("🚀 Kakinada Legal Assistant Bot is starting...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    logger.info(f"🚀 Kakinada Legal Assistant Bot is starting ({config.BOT_MODE} mode)...")
+    if config.BOT_MODE == "webhook":
+        asyncio.run(run_webhook(
+            application,
+            webhook_url=config.WEBHOOK_URL,
+            listen=config.WEBHOOK_LISTEN,
+            port=config.WEBHOOK_PORT,
+            url_path=config.WEBHOOK_PATH,
+            secret_token=config.WEBHOOK_SECRET_TOKEN,
+            allowed_updates=Update.ALL_TYPES
+        ))
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == "__main__":
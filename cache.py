@@ -0,0 +1,308 @@
+"""
+Response caching for Kakinada Legal Assistant Bot
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """Normalize a question so trivially different phrasings share a cache entry"""
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(model_name, prompt, generation_config=None):
+    """Build a stable cache key from model, prompt and generation config"""
+    config_repr = ""
+    if generation_config is not None:
+        # GenerateContentConfig is a pydantic model - serialize it deterministically
+        if hasattr(generation_config, 'model_dump_json'):
+            config_repr = generation_config.model_dump_json(exclude_none=True)
+        else:
+            config_repr = repr(generation_config)
+
+    raw = f"{model_name}\x00{prompt}\x00{config_repr}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one upstream call"""
+
+    def __init__(self):
+        self._in_flight = {}  # key -> running task
+        self.stats = {'calls': 0, 'coalesced': 0}
+
+    async def do(self, key, fetch):
+        """Run fetch() for key, or join the call already in flight"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats['calls'] += 1
+            task = asyncio.create_task(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.stats['coalesced'] += 1
+
+        # Shield so one caller giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+
+class ResponseCache:
+    """Stale-while-revalidate cache for fixed Gemini prompts"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # key -> (value, fetched_at)
+        self._refreshing = {}  # key -> running refresh task
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0}
+
+    async def get_or_fetch(self, key, fetch):
+        """Return cached value instantly; refresh in background once it is stale"""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            # Cold cache - all concurrent callers wait on the same fetch
+            self.stats['misses'] += 1
+            return await asyncio.shield(self._start_refresh(key, fetch))
+
+        value, fetched_at = entry
+        if time.monotonic() - fetched_at > self.ttl:
+            # Stale - serve old value now, let one background task refresh it
+            self.stats['stale_hits'] += 1
+            self._start_refresh(key, fetch)
+        else:
+            self.stats['hits'] += 1
+
+        return value
+
+    def prefetch(self, key, fetch):
+        """Warm a key in the background (e.g. at startup)"""
+        if key not in self._entries:
+            self._start_refresh(key, fetch)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _start_refresh(self, key, fetch):
+        """Start a refresh for key unless one is already running"""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, fetch))
+            task.add_done_callback(self._refresh_done)
+            self._refreshing[key] = task
+        return task
+
+    async def _refresh(self, key, fetch):
+        try:
+            value = await fetch()
+            self._entries[key] = (value, time.monotonic())
+            return value
+        finally:
+            self._refreshing.pop(key, None)
+
+    @staticmethod
+    def _refresh_done(task):
+        """Log background refresh failures (stale value stays in place)"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Cache refresh failed: {task.exception()}")
+
+
+class AnswerCache:
+    """Two-tier answer cache: in-memory LRU in front of a local SQLite store"""
+
+    def __init__(self, db_path, max_memory_items=1000, topic_ttls=None, default_ttl=24 * 60 * 60):
+        self.max_memory_items = max_memory_items
+        self.topic_ttls = topic_ttls or {}
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()  # key -> (answer, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("DELETE FROM answers WHERE expires_at <= ?", (time.time(),))
+        self._db.commit()
+
+    def get(self, key):
+        """Look up an answer, promoting SQLite hits into memory"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                answer, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return answer
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT answer, expires_at FROM answers WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            answer, expires_at = row
+            self._remember(key, answer, expires_at)
+            self.stats['disk_hits'] += 1
+            return answer
+
+    def set(self, key, question, answer, topic="general"):
+        """Store an answer in both tiers with the topic's TTL"""
+        now = time.time()
+        expires_at = now + self.topic_ttls.get(topic, self.default_ttl)
+        with self._lock:
+            self._remember(key, answer, expires_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO answers (key, topic, question, answer, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, topic, question, answer, now, expires_at)
+            )
+            self._db.commit()
+
+    def hit_ratio(self):
+        """Fraction of lookups served from either tier"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key, answer, expires_at):
+        """Insert into the LRU tier, evicting the least recently used entry"""
+        self._memory[key] = (answer, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+
+class GeoCache:
+    """Persistent cache of enriched nearby-station lists keyed by geohash cell"""
+
+    def __init__(self, db_path, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS nearby_stations (
+                cell TEXT PRIMARY KEY,
+                stations TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("DELETE FROM nearby_stations WHERE expires_at <= ?", (time.time(),))
+        self._db.commit()
+
+    def get(self, cell):
+        """Station list for a cell, or None on miss/expiry"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT stations FROM nearby_stations WHERE cell = ? AND expires_at > ?",
+                (cell, time.time())
+            ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def set(self, cell, stations, ttl=None):
+        """Store a cell's station list, for ttl seconds instead of the default if given"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO nearby_stations (cell, stations, expires_at) VALUES (?, ?, ?)",
+                (cell, json.dumps(stations), time.time() + (self.ttl if ttl is None else ttl))
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JurisdictionCache:
+    """Persistent cache of police-station answers keyed by normalized jurisdiction"""
+
+    def __init__(self, db_path, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jurisdictions (
+                key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("DELETE FROM jurisdictions WHERE expires_at <= ?", (time.time(),))
+        self._db.commit()
+
+    def get(self, key):
+        """Structured station answer for a key, or None on miss/expiry"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT answer FROM jurisdictions WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def set(self, key, answer):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jurisdictions (key, answer, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(answer), time.time() + self.ttl)
+            )
+
+    def invalidate(self, key_prefix=None):
+        """Drop entries whose key starts with key_prefix (all entries if None); returns count"""
+        with self._lock, self._db:
+            if key_prefix is None:
+                cursor = self._db.execute("DELETE FROM jurisdictions")
+            else:
+                escaped = key_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                cursor = self._db.execute("DELETE FROM jurisdictions WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,109 @@
+"""
+Bounded per-user conversation memory for follow-up questions
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class ChatMemory:
+    """Per-user history with a token budget, LRU eviction, idle TTL and summarization"""
+
+    def __init__(self, max_users=5000, idle_ttl=30 * 60, token_budget=1500,
+                 recent_turns=4, summary_tokens=300, summarize=None):
+        self.max_users = max_users
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns  # Messages always kept verbatim
+        self.summary_tokens = summary_tokens
+        self.summarize = summarize  # async fn(text) -> summary, optional
+        self._sessions = OrderedDict()  # user_id -> {'summary', 'turns', 'last_active'}
+        self._summary_tasks = {}
+
+    def get(self, user_id):
+        """Return (summary, turns) for a user, or ("", []) if none/expired"""
+        session = self._sessions.get(user_id)
+        if session is None:
+            return "", []
+        if time.monotonic() - session['last_active'] > self.idle_ttl:
+            self.clear(user_id)
+            return "", []
+        self._sessions.move_to_end(user_id)
+        return session['summary'], list(session['turns'])
+
+    def has_history(self, user_id):
+        summary, turns = self.get(user_id)
+        return bool(summary or turns)
+
+    def add_exchange(self, user_id, user_text, model_text):
+        """Record one question/answer pair and keep the session within budget"""
+        self.get(user_id)  # Expire idle session first
+        session = self._sessions.setdefault(user_id, {'summary': "", 'turns': [], 'last_active': 0.0})
+        # Cap each turn so the verbatim recent turns alone always fit the budget
+        max_turn_chars = self.token_budget * 4 // max(self.recent_turns, 1)
+        session['turns'].append(("user", user_text[:max_turn_chars]))
+        session['turns'].append(("model", model_text[:max_turn_chars]))
+        session['last_active'] = time.monotonic()
+        self._sessions.move_to_end(user_id)
+
+        self._enforce_budget(user_id, session)
+
+        # LRU eviction across users
+        while len(self._sessions) > self.max_users:
+            evicted_id, _ = self._sessions.popitem(last=False)
+            self._cancel_summary(evicted_id)
+
+    def clear(self, user_id):
+        self._sessions.pop(user_id, None)
+        self._cancel_summary(user_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _session_tokens(self, session):
+        return estimate_tokens(session['summary']) + sum(estimate_tokens(text) for _, text in session['turns'])
+
+    def _enforce_budget(self, user_id, session):
+        """Fold older turns into the summary once the session is over budget"""
+        if self._session_tokens(session) <= self.token_budget or len(session['turns']) <= self.recent_turns:
+            return
+
+        older = session['turns'][:-self.recent_turns]
+        session['turns'] = session['turns'][-self.recent_turns:]
+
+        transcript = "\n".join(f"{role.upper()}: {text}" for role, text in older)
+        if session['summary']:
+            transcript = f"EARLIER SUMMARY: {session['summary']}\n{transcript}"
+
+        # Truncated transcript keeps memory bounded until a proper summary arrives
+        max_chars = self.summary_tokens * 4
+        session['summary'] = transcript[-max_chars:]
+
+        if self.summarize is not None:
+            self._cancel_summary(user_id)
+            task = asyncio.create_task(self._summarize(user_id, session, transcript))
+            self._summary_tasks[user_id] = task
+
+    async def _summarize(self, user_id, session, transcript):
+        try:
+            summary = await self.summarize(transcript)
+            if summary and self._sessions.get(user_id) is session:
+                session['summary'] = summary.strip()[-self.summary_tokens * 4:]
+        except Exception as e:
+            logger.warning(f"Conversation summarization failed for {user_id}: {e}")
+        finally:
+            if self._summary_tasks.get(user_id) is asyncio.current_task():
+                del self._summary_tasks[user_id]
+
+    def _cancel_summary(self, user_id):
+        task = self._summary_tasks.pop(user_id, None)
+        if task is not None and not task.done():
+            task.cancel()
@@ -0,0 +1,46 @@
+"""
+Local complaint-type classifier
+Keyword-weighted scoring over the same labels Gemini chooses from
+"""
+from keyword_matcher import KeywordAutomaton
+
+
+class ComplaintClassifier:
+    """Scores each label by its matched keyword weights; confidence is the smoothed top share"""
+
+    def __init__(self, weighted_keywords, smoothing=1.0, min_weight=3):
+        self.labels = list(weighted_keywords)
+        self.smoothing = smoothing  # Keeps a single weak hit from looking certain
+        self.min_weight = min_weight  # Matched weight needed besides the share: one strong keyword or several weaker ones
+        self.automaton = KeywordAutomaton()
+        for label, keywords in weighted_keywords.items():
+            for keyword, weight in keywords.items():
+                self.automaton.add(keyword, (label, weight))
+        self.automaton.build()
+        self.stats = {'local': 0, 'fallback': 0}
+
+    def _scores(self, text):
+        scores = {}
+        for _, _, (label, weight) in self.automaton.find_all(text):
+            scores[label] = scores.get(label, 0) + weight
+        return scores
+
+    def predict(self, text):
+        """Return (label, confidence) - label is None when nothing matched"""
+        scores = self._scores(text)
+        if not scores:
+            return None, 0.0
+
+        label = max(scores, key=scores.get)
+        return label, scores[label] / (sum(scores.values()) + self.smoothing)
+
+    def classify(self, text, threshold):
+        """Label if confident and backed by enough keyword weight, otherwise None (caller falls back to Gemini)"""
+        scores = self._scores(text)
+        label = max(scores, key=scores.get) if scores else None
+        if label is not None and scores[label] >= self.min_weight and \
+                scores[label] / (sum(scores.values()) + self.smoothing) >= threshold:
+            self.stats['local'] += 1
+            return label
+        self.stats['fallback'] += 1
+        return None
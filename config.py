@@ -35,6 +35,93 @@ if not GOOGLE_MAPS_API_KEY:
 BOT_USERNAME = "@ai_governance_bot"
 LOCATION = "Kakinada, Andhra Pradesh, India"
 
+# Serving Mode - "polling" (default) or "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public HTTPS base URL, e.g. https://your-app.onrender.com
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT", "8443"))  # Render provides PORT
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")  # Checked against Telegram's secret header; random per run if unset
+if BOT_MODE == "webhook" and not WEBHOOK_URL:
+    raise ValueError("❌ WEBHOOK_URL not found! It is required when BOT_MODE=webhook")
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL")  # Optional fake/local Bot API for testing
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))  # Updates processed in parallel
+
+# Outbound Telegram limits (Bot API allows ~30 msg/s overall and ~1 msg/s per chat)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))  # Messages per second across all chats
+TELEGRAM_PER_CHAT_RATE = float(os.getenv("TELEGRAM_PER_CHAT_RATE", "1"))  # Messages per second per chat
+TELEGRAM_PER_CHAT_BURST = int(os.getenv("TELEGRAM_PER_CHAT_BURST", "3"))  # Short bursts allowed per chat
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))  # Retries after a RetryAfter flood wait
+
+# Prometheus metrics endpoint (GET /metrics)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # Local only; scrape via a sidecar or SSH tunnel
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))  # 0 disables the endpoint
+
+# Performance Settings
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "10"))  # Max parallel Gemini calls
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))  # Free tier quota
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "10"))  # Calls allowed back-to-back before pacing kicks in
+GEMINI_MAX_QUEUE_SIZE = int(os.getenv("GEMINI_MAX_QUEUE_SIZE", "100"))  # Per priority class
+GEMINI_RATE_LIMIT_BACKOFF = 10  # Seconds to pause admissions after a 429
+GEMINI_QUEUE_DEADLINES = {  # Max seconds a call may wait for admission
+    "complaint": 45,
+    "chat": 20,
+    "background": 300
+}
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(6 * 60 * 60)))  # Seconds before /schemes, /laws answers refresh
+
+# Streaming replies - post the first tokens immediately, then edit the message as more arrive
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))  # Min seconds between edits (Telegram per-chat limit)
+
+# Conversation persistence (half-filled complaints survive restarts/redeploys)
+PERSISTENCE_DB = os.getenv("PERSISTENCE_DB", "bot_state.sqlite3")
+PERSISTENCE_FLUSH_INTERVAL_MS = int(os.getenv("PERSISTENCE_FLUSH_INTERVAL_MS", "500"))  # Max delay before changes hit disk
+PERSISTENCE_FLUSH_BATCH_SIZE = int(os.getenv("PERSISTENCE_FLUSH_BATCH_SIZE", "100"))  # Write early once this many changes queue up
+
+# Multi-turn chat memory
+CHAT_MEMORY_MAX_USERS = int(os.getenv("CHAT_MEMORY_MAX_USERS", "5000"))  # Least recently active users evicted beyond this
+CHAT_MEMORY_IDLE_TTL = int(os.getenv("CHAT_MEMORY_IDLE_TTL", str(30 * 60)))  # Seconds of inactivity before history is dropped
+CHAT_MEMORY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_TOKEN_BUDGET", "2000"))  # Approx. tokens of history sent per request
+CHAT_MEMORY_RECENT_TURNS = 4  # Messages kept verbatim; older ones are summarized
+CHAT_MEMORY_SUMMARY_TOKENS = 300
+
+# Location lookup
+LOCAL_STATION_COVERAGE_KM = float(os.getenv("LOCAL_STATION_COVERAGE_KM", "10"))  # Beyond this from any known station, ask Google Maps
+
+MAPS_REQUEST_TIMEOUT = float(os.getenv("MAPS_REQUEST_TIMEOUT", "5"))  # Seconds per Places API call
+MAPS_MAX_CONNECTIONS = int(os.getenv("MAPS_MAX_CONNECTIONS", "20"))  # Pooled HTTP connections to Google Maps
+
+MAPS_DETAIL_CANDIDATES = 5  # Nearest Maps results enriched and cached per cell (top 3 shown after re-ranking)
+PLACES_CACHE_DB = os.getenv("PLACES_CACHE_DB", "places_cache.sqlite3")
+PLACES_CACHE_PRECISION = int(os.getenv("PLACES_CACHE_PRECISION", "6"))  # Geohash length; 6 is ~1.2 km x 0.6 km
+PLACES_CACHE_TTL = int(os.getenv("PLACES_CACHE_TTL", str(30 * 24 * 60 * 60)))  # Police stations rarely move
+PLACES_CACHE_DEGRADED_TTL = int(os.getenv("PLACES_CACHE_DEGRADED_TTL", str(10 * 60)))  # Empty lists or missing phones
+
+JURISDICTION_CACHE_DB = os.getenv("JURISDICTION_CACHE_DB", "jurisdiction_cache.sqlite3")
+JURISDICTION_CACHE_TTL = int(os.getenv("JURISDICTION_CACHE_TTL", str(14 * 24 * 60 * 60)))  # Station jurisdiction answers per location/type
+
+# PDF rendering pool
+PDF_POOL_KIND = os.getenv("PDF_POOL_KIND", "process")  # "process" (true parallelism) or "thread" (less memory)
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", "2"))
+PDF_POOL_MAX_PENDING = int(os.getenv("PDF_POOL_MAX_PENDING", "8"))  # Renders queued or running before callers wait
+PDF_POOL_WAIT_TIMEOUT = float(os.getenv("PDF_POOL_WAIT_TIMEOUT", "30"))  # Seconds to wait for a slot before giving up
+
+# Answer cache for repeated free-text questions (memory LRU + SQLite)
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", "answer_cache.sqlite3")
+ANSWER_CACHE_MEMORY_SIZE = int(os.getenv("ANSWER_CACHE_MEMORY_SIZE", "1000"))  # Max answers kept in memory
+ANSWER_CACHE_MAX_QUESTION_LENGTH = 300  # Longer messages are personal and not cached
+ANSWER_CACHE_TOPIC_TTLS = {
+    "law": 7 * 24 * 60 * 60,      # Statutes change rarely
+    "schemes": 24 * 60 * 60,      # Scheme details/deadlines change often
+    "general": 24 * 60 * 60
+}
+
+# Local complaint-type classifier (Gemini is only asked below this confidence)
+COMPLAINT_CLASSIFIER_THRESHOLD = float(os.getenv("COMPLAINT_CLASSIFIER_THRESHOLD", "0.6"))  # 0-1, top label's share of matched weight
+COMPLAINT_CLASSIFIER_MIN_WEIGHT = int(os.getenv("COMPLAINT_CLASSIFIER_MIN_WEIGHT", "3"))  # Top label's matched keyword weight - one weak hit isn't enough
+COMPLAINT_TYPE_WAIT_TIMEOUT = float(os.getenv("COMPLAINT_TYPE_WAIT_TIMEOUT", "4"))  # Max seconds to wait for background type detection before using the keyword guess
+
 # System Prompts
 LEGAL_ASSISTANT_PROMPT = """You are a Legal Assistant AI specifically designed for Kakinada and India.
 Your role is to help users with:
@@ -134,6 +221,54 @@ COMMON_IPC_SECTIONS = {
     "murder": ["IPC 302 - Punishment for murder", "IPC 304 - Culpable homicide not amounting to murder"]
 }
 
+# Synonyms and Telugu transliterations for COMMON_IPC_SECTIONS keys (matched as whole words)
+IPC_KEYWORD_SYNONYMS = {
+    "theft": ["steal", "stole", "thief", "burglary", "house break", "dongatanam", "donga", "dongalu", "chori", "దొంగతనం", "దొంగ"],
+    "mobile": ["cell phone", "cellphone", "smartphone"],
+    "phone": ["iphone"],
+    "stolen": ["missing", "pickpocket", "pick pocket", "ettukellaru", "dochukunnaru"],
+    "robbery": ["robbed", "snatching", "chain snatching", "snatched", "mugging", "mugged", "dopidi", "దోపిడీ"],
+    "assault": ["attack", "attacked", "beat", "beaten", "hit", "slapped", "injured", "kottaru", "kottadu", "daadi", "దాడి"],
+    "harassment": ["harassed", "stalking", "stalked", "eve teasing", "molested", "vedhimpu", "vedhimpulu", "వేధింపు", "వేధింపులు"],
+    "fraud": ["scam", "scammed", "fake", "forgery", "mosam", "మోసం"],
+    "cheating": ["cheated", "duped", "mosam chesaru", "mosagadu"],
+    "domestic_violence": ["dowry", "husband beats", "in-laws", "katnam", "gruha himsa", "gruhahimsa", "కట్నం", "గృహ హింస"],
+    "cybercrime": ["cyber crime", "online fraud", "upi fraud", "otp", "hacked", "hacking", "phishing", "sextortion", "morphed photos"],
+    "property_dispute": ["trespass", "land grab", "encroachment", "boundary dispute", "bhoomi", "bhumi", "sthalam", "భూమి", "స్థలం"],
+    "defamation": ["slander", "libel", "paruvu nashtam", "పరువు నష్టం"],
+    "public_nuisance": ["nuisance", "loud music", "noise pollution", "garbage dumping"],
+    "extortion": ["blackmail", "blackmailed", "threatened for money", "mamool", "bedirimpu", "బెదిరింపు"],
+    "rape": ["sexual assault", "balatkaram", "అత్యాచారం"],
+    "murder": ["killed", "homicide", "hatya", "హత్య"]
+}
+
+# Weighted keywords per complaint type for the local classifier (labels match the Gemini prompt)
+COMPLAINT_TYPE_KEYWORDS = {
+    "Theft": {"theft": 3, "stolen": 3, "stole": 3, "steal": 3, "thief": 3, "burglary": 3, "pickpocket": 3,
+              "dongatanam": 3, "donga": 2, "chori": 3, "దొంగతనం": 3, "missing from": 1, "bike": 1, "mobile": 1, "purse": 1},
+    "Robbery": {"robbery": 3, "robbed": 3, "snatching": 3, "snatched": 3, "mugged": 3, "at knifepoint": 3,
+                "dopidi": 3, "దోపిడీ": 3, "chain": 1},
+    "Fraud": {"fraud": 3, "scam": 3, "scammed": 3, "otp": 2, "upi": 2, "fake": 2, "investment": 1,
+              "mosam": 2, "మోసం": 2, "lottery": 2, "loan app": 2},
+    "Cheating": {"cheating": 3, "cheated": 3, "duped": 2, "promised": 1, "did not return": 2, "not returning": 2},
+    "Harassment": {"harassment": 3, "harassing": 3, "harassed": 3, "stalking": 3, "stalked": 3, "eve teasing": 3,
+                   "vedhimpu": 3, "వేధింపు": 3, "abusive messages": 2, "following me": 2},
+    "Cyber Crime": {"cyber crime": 3, "cybercrime": 3, "hacked": 3, "hacking": 3, "phishing": 3, "morphed": 3,
+                    "fake profile": 3, "instagram": 1, "facebook": 1, "whatsapp": 1, "online": 1},
+    "Domestic Violence": {"domestic violence": 3, "dowry": 3, "katnam": 3, "కట్నం": 3, "in-laws": 2,
+                          "husband": 2, "mother-in-law": 2, "gruha himsa": 3},
+    "Property Dispute": {"property": 2, "land": 2, "encroachment": 3, "trespass": 3, "boundary": 2,
+                         "land grab": 3, "bhoomi": 2, "sthalam": 2, "registration": 1, "tenant": 2},
+    "Assault": {"assault": 3, "attacked": 3, "beat": 2, "beaten": 3, "hit me": 3, "slapped": 3, "injured": 2,
+                "kottaru": 3, "దాడి": 3},
+    "Kidnapping": {"kidnapping": 3, "kidnapped": 3, "abducted": 3, "abduction": 3, "ransom": 3},
+    "Missing Person": {"missing person": 3, "not returned home": 3, "went missing": 3, "cannot find my": 2,
+                       "kanipinchadam ledu": 3},
+    "Traffic Violation": {"accident": 3, "hit and run": 3, "rash driving": 3, "drunk driving": 3,
+                          "drunken driving": 3, "signal jump": 3, "traffic": 2},
+    "Forgery": {"forgery": 3, "forged": 3, "fake signature": 3, "fake documents": 3, "counterfeit": 3}
+}
+
 # Major cities in Andhra Pradesh with police helplines
 AP_CITIES_POLICE = {
     "vijayawada": {
@@ -0,0 +1,173 @@
+"""
+Geographic helpers for police station lookup
+"""
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometers"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_km_vectorized(lat, lon, lats, lons):
+    """Haversine distances (km) with NumPy broadcasting over any array shapes"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    delta_lat = lat2 - lat1
+    delta_lon = np.radians(lons) - np.radians(lon)
+
+    a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def rank_by_distance(latitude, longitude, candidates, k=None, lat_key='lat', lon_key='lng'):
+    """Sort candidate dicts by true distance from a point; returns [(distance_km, candidate)]"""
+    if not candidates:
+        return []
+
+    lats = np.fromiter((c[lat_key] for c in candidates), dtype=float, count=len(candidates))
+    lons = np.fromiter((c[lon_key] for c in candidates), dtype=float, count=len(candidates))
+    distances = haversine_km_vectorized(latitude, longitude, lats, lons)
+
+    order = np.argsort(distances, kind='stable')
+    if k is not None:
+        order = order[:k]
+    return [(float(distances[i]), candidates[i]) for i in order]
+
+
+def nearest_batch(points, candidate_coords, k=3):
+    """k nearest candidates for many points at once
+
+    points: (N, 2) array of (lat, lon); candidate_coords: (M, 2) array.
+    Returns (indices, distances_km), both shaped (N, min(k, M)).
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    candidate_coords = np.asarray(candidate_coords, dtype=float).reshape(-1, 2)
+    k = min(k, len(candidate_coords))
+
+    distances = haversine_km_vectorized(
+        points[:, 0:1], points[:, 1:2],
+        candidate_coords[:, 0][np.newaxis, :], candidate_coords[:, 1][np.newaxis, :]
+    )
+
+    # argpartition picks the k smallest in O(M), then only those k are sorted
+    if k < distances.shape[1]:
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        nearest = np.broadcast_to(np.arange(distances.shape[1]), distances.shape).copy()
+    nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+    order = np.argsort(nearest_distances, axis=1, kind='stable')
+    return np.take_along_axis(nearest, order, axis=1), np.take_along_axis(nearest_distances, order, axis=1)
+
+
+def geohash_encode(lat, lon, precision=6):
+    """Standard base32 geohash (precision 6 is ~1.2 km x 0.6 km)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+class StationIndex:
+    """In-memory grid index over the police station registry for k-nearest lookups"""
+
+    def __init__(self, stations, cell_size_deg=0.05):
+        self.cell_size_deg = cell_size_deg  # ~5.5 km per cell at Kakinada's latitude
+        self.stations = list(stations)
+        self._cells = {}  # (row, col) -> [station, ...]
+        for station in self.stations:
+            self._cells.setdefault(self._cell(station['location']['lat'], station['location']['lon']), []).append(station)
+
+        self._coords = np.array(
+            [(station['location']['lat'], station['location']['lon']) for station in self.stations],
+            dtype=float
+        ).reshape(-1, 2)
+
+        rows = [r for r, _ in self._cells] or [0]
+        cols = [c for _, c in self._cells] or [0]
+        self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_size_deg)), int(math.floor(lon / self.cell_size_deg))
+
+    def _ring(self, row, col, ring):
+        """Cells exactly `ring` steps away from (row, col)"""
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
+
+    def nearest(self, lat, lon, k=3, max_distance_km=None):
+        """k nearest stations as [(distance_km, station)], limited to max_distance_km"""
+        if not self._cells:
+            return []
+
+        row, col = self._cell(lat, lon)
+        min_row, max_row, min_col, max_col = self._bounds
+        max_ring = max(row - min_row, max_row - row, col - min_col, max_col - col, 0)
+        cell_km = self.cell_size_deg * 111.0 * min(1.0, math.cos(math.radians(lat)))
+        found = []
+
+        # Walk outwards ring by ring until the k-th hit is closer than anything further out
+        for ring in range(max_ring + 1):
+            for cell in self._ring(row, col, ring):
+                for station in self._cells.get(cell, ()):
+                    location = station['location']
+                    found.append((haversine_km(lat, lon, location['lat'], location['lon']), station))
+
+            found.sort(key=lambda item: item[0])
+            if max_distance_km is not None and ring * cell_km > max_distance_km:
+                break
+            if len(found) >= k and found[k - 1][0] <= ring * cell_km:
+                break
+
+        if max_distance_km is not None:
+            found = [item for item in found if item[0] <= max_distance_km]
+        return found[:k]
+
+    def nearest_batch(self, points, k=3):
+        """k nearest registry stations for many points - [[(distance_km, station)], ...]"""
+        if not self.stations:
+            return [[] for _ in range(len(points))]
+        indices, distances = nearest_batch(points, self._coords, k)
+        return [
+            [(float(distance), self.stations[index]) for index, distance in zip(row_indices, row_distances)]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
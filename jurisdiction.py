@@ -0,0 +1,121 @@
+"""
+Police jurisdiction resolver
+Normalizes incident locations and caches the grounded police-station answer per jurisdiction
+The complainant's own address is never part of a key - it doesn't decide jurisdiction
+
+Manual invalidation:
+    python jurisdiction.py invalidate "Bhanugudi, Kakinada"
+    python jurisdiction.py clear
+"""
+import argparse
+import logging
+import re
+
+import config
+from cache import JurisdictionCache
+
+logger = logging.getLogger(__name__)
+
+_PINCODE_RE = re.compile(r"(?<!\d)(5\d{2})\s?(\d{3})(?!\d)")  # Andhra Pradesh pincodes start with 5
+_TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Words that don't change which station has jurisdiction
+LOCATION_STOPWORDS = {
+    "near", "opp", "opposite", "beside", "behind", "besides", "backside", "front", "of", "the", "at", "in", "to",
+    "and", "door", "no", "dno", "h", "house", "flat", "plot", "floor", "building", "apartment", "apartments",
+    "road", "rd", "street", "st", "lane", "cross", "main", "junction", "jn", "center", "centre",
+    "mandal", "mandalam", "district", "dist", "dt", "city", "town", "village", "post", "po", "pin", "pincode",
+    "andhra", "pradesh", "ap", "india", "state",
+    "my", "our", "his", "her", "their", "home", "office", "shop", "here", "there", "side", "place", "area"
+}
+
+
+def normalize_location(text):
+    """Pincode plus area/mandal/district names, e.g.
+
+    'D.No 12-3, Near Bhanugudi Jn., Kakinada - 533 003' -> '533003 bhanugudi kakinada'
+    """
+    pincodes = ["".join(match) for match in _PINCODE_RE.findall(text or "")]
+    tokens = sorted({
+        token for token in _TOKEN_RE.findall((text or "").lower())
+        if token not in LOCATION_STOPWORDS and len(token) > 1
+    })
+    return " ".join(pincodes[:1] + tokens)
+
+
+def is_specific_location(text):
+    """True if the location has a pincode or place name - 'near main road' or 'at my house' could be anywhere"""
+    return bool(normalize_location(text))
+
+
+def jurisdiction_key(incident_location, complaint_type):
+    """Cache key - incident location first so it can be invalidated by prefix"""
+    return "|".join((
+        normalize_location(incident_location),
+        " ".join((complaint_type or "general").lower().split())
+    ))
+
+
+def extract_station_name(police_response):
+    """First station name line from a Gemini answer, without Markdown"""
+    police_lines = police_response.strip().split('\n')
+    clean_police_name = police_lines[0].replace('**', '').replace('*', '').strip()
+    if clean_police_name.startswith('#'):
+        clean_police_name = police_lines[1].replace('**', '').replace('*', '').strip() if len(police_lines) > 1 else "Police Station"
+    return clean_police_name
+
+
+class JurisdictionResolver:
+    """Looks up the responsible police station, answering repeat jurisdictions from cache"""
+
+    def __init__(self, cache, lookup):
+        self.cache = cache
+        self.lookup = lookup  # async fn(incident_location, complaint_type, address) -> Gemini answer text
+
+    async def resolve(self, incident_location, complaint_type, address=None):
+        """Return {'police_station', 'police_details'} for a complaint
+
+        Vague locations are never cached; their lookup gets the complainant's address instead.
+        """
+        key = None
+        if is_specific_location(incident_location):
+            key = jurisdiction_key(incident_location, complaint_type)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Jurisdiction cache hit for {key}")
+                return cached
+            address = None  # A shared answer must depend on the incident location alone
+
+        police_response = await self.lookup(incident_location, complaint_type, address)
+        answer = {
+            'police_station': extract_station_name(police_response),
+            'police_details': police_response
+        }
+        # Only cache answers that actually name a station
+        if key is not None and police_response.strip() and answer['police_station']:
+            self.cache.set(key, answer)
+        return answer
+
+    def invalidate(self, incident_location=None):
+        """Forget cached answers for one incident location, or everything"""
+        if incident_location is None:
+            return self.cache.invalidate()
+        return self.cache.invalidate(normalize_location(incident_location) + "|")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the police jurisdiction cache")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    invalidate_parser = subparsers.add_parser('invalidate', help="Forget answers for an incident location")
+    invalidate_parser.add_argument('location')
+    subparsers.add_parser('clear', help="Forget all cached answers")
+    args = parser.parse_args()
+
+    resolver = JurisdictionResolver(JurisdictionCache(config.JURISDICTION_CACHE_DB, config.JURISDICTION_CACHE_TTL), None)
+    removed = resolver.invalidate(args.location if args.command == 'invalidate' else None)
+    resolver.cache.close()
+    print(f"✅ Removed {removed} cached jurisdiction answers")
+
+
+if __name__ == "__main__":
+    main()
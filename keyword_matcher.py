@@ -0,0 +1,113 @@
+"""
+Multi-keyword matching for complaint text
+Aho-Corasick automaton built once, matched in one linear pass with word boundaries
+"""
+import unicodedata
+from collections import deque
+
+
+def normalize_keyword(keyword):
+    """'domestic_violence' / 'Domestic  Violence' -> 'domestic violence'"""
+    return " ".join(keyword.replace("_", " ").lower().split())
+
+
+def _is_word_char(ch):
+    # Telugu vowel signs are combining marks, so they count as part of the word
+    return ch.isalnum() or unicodedata.category(ch).startswith('M')
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton mapping whole-word phrases to payloads"""
+
+    def __init__(self):
+        self._goto = [{}]  # state -> {char: next state}
+        self._fail = [0]
+        self._output = [[]]  # state -> [(phrase length, payload)]
+        self._built = False
+
+    def add(self, phrase, payload):
+        phrase = normalize_keyword(phrase)
+        if not phrase:
+            return
+        state = 0
+        for ch in phrase:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(phrase), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def find_all(self, text):
+        """Yield (start, end, payload) for every whole-word match in text"""
+        if not self._built:
+            self.build()
+
+        # Collapse whitespace so multi-word phrases match across line breaks
+        text = " ".join(text.lower().split())
+        length = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+
+            for phrase_length, payload in self._output[state]:
+                start = i - phrase_length + 1
+                end = i + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                # Allow simple plurals ("thefts", "phones")
+                if end < length and text[end] == 's' and (end + 1 == length or not _is_word_char(text[end + 1])):
+                    end += 1
+                if end < length and _is_word_char(text[end]):
+                    continue
+                yield start, end, payload
+
+
+class LawMatcher:
+    """Ranks applicable sections for a complaint from keywords, synonyms and transliterations"""
+
+    def __init__(self, sections_by_keyword, synonyms=None, type_weight=2):
+        self.type_weight = type_weight  # Hits in the complaint type outrank hits in the description
+        self.automaton = KeywordAutomaton()
+        for key, sections in sections_by_keyword.items():
+            self.automaton.add(key, tuple(sections))
+            for alias in (synonyms or {}).get(key, ()):
+                self.automaton.add(alias, tuple(sections))
+        self.automaton.build()
+
+    def match(self, complaint_type, description=""):
+        """Deduplicated sections, highest score first (ties keep first-seen order)"""
+        complaint_type = " ".join(complaint_type.split())
+        text = f"{complaint_type} {description}"
+        type_end = len(complaint_type)
+
+        scores = {}  # Insertion order doubles as first-seen order
+        for start, _, sections in self.automaton.find_all(text):
+            weight = self.type_weight if start < type_end else 1
+            for section in sections:
+                scores[section] = scores.get(section, 0) + weight
+
+        return sorted(scores, key=scores.get, reverse=True)
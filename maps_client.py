@@ -0,0 +1,101 @@
+"""
+Async Google Maps Places client
+One pooled HTTP session shared by all requests
+"""
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from metrics import MAPS_ERRORS, MAPS_LATENCY
+
+logger = logging.getLogger(__name__)
+
+NEARBY_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+PHONE_FIELDS = ["formatted_phone_number", "international_phone_number"]
+
+
+class MapsError(Exception):
+    """Raised when the Places API returns an error status"""
+
+
+class AsyncMapsClient:
+    """Long-lived, connection-pooled Places API client"""
+
+    def __init__(self, api_key, timeout=5.0, max_connections=20):
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self._session = None
+
+    def _get_session(self):
+        # Created lazily because aiohttp sessions must be built inside the running loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=self.timeout
+            )
+        return self._session
+
+    async def _get_json(self, url, params):
+        params = dict(params, key=self.api_key)
+        endpoint = url.rstrip('/').split('/')[-2]  # 'nearbysearch' or 'details'
+        start = time.perf_counter()
+        try:
+            async with self._get_session().get(url, params=params) as response:
+                response.raise_for_status()
+                data = await response.json()
+
+            status = data.get('status')
+            if status not in ('OK', 'ZERO_RESULTS'):
+                raise MapsError(f"{status}: {data.get('error_message', 'no details')}")
+            return data
+        except Exception:
+            MAPS_ERRORS.inc(endpoint=endpoint)
+            raise
+        finally:
+            MAPS_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+
+    async def places_nearby(self, latitude, longitude, radius=5000, place_type='police', keyword='police station'):
+        """Nearby Search results (raw Places API dicts)"""
+        data = await self._get_json(NEARBY_SEARCH_URL, {
+            'location': f"{latitude},{longitude}",
+            'radius': radius,
+            'type': place_type,
+            'keyword': keyword
+        })
+        return data.get('results', [])
+
+    async def place_details(self, place_id, fields=None):
+        """Place Details limited to the requested fields (billed per field group)"""
+        data = await self._get_json(PLACE_DETAILS_URL, {
+            'place_id': place_id,
+            'fields': ",".join(fields or PHONE_FIELDS)
+        })
+        return data.get('result', {})
+
+    async def place_phones(self, place_ids):
+        """Phone numbers for several places, fetched concurrently"""
+        results = await asyncio.gather(
+            *(self.place_details(place_id, PHONE_FIELDS) for place_id in place_ids),
+            return_exceptions=True
+        )
+
+        phones = []
+        for place_id, result in zip(place_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Place details failed for {place_id}: {result}")
+                phones.append("Not available")
+            else:
+                phones.append(
+                    result.get('formatted_phone_number') or
+                    result.get('international_phone_number') or
+                    "Not available"
+                )
+        return phones
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,247 @@
+"""
+Prometheus-compatible metrics for Kakinada Legal Assistant Bot
+Small in-process registry rendered in the Prometheus text format and served over aiohttp
+"""
+import functools
+import logging
+import math
+import time
+from contextlib import contextmanager
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> value
+        self._function = None
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def set_function(self, function):
+        """Read the value at scrape time: function() -> number, or {label values tuple: number}"""
+        self._function = function
+
+    def samples(self):
+        """[(suffix, label values, extra labels, value)]"""
+        if self._function is None:
+            return [("", key, (), value) for key, value in self._values.items()]
+        try:
+            result = self._function()
+        except Exception as e:
+            logger.warning(f"Metric {self.name} collection failed: {e}")
+            return []
+        if not isinstance(result, dict):
+            return [("", (), (), result)]
+        return [("", tuple(str(v) for v in key), (), value) for key, value in result.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (set_function for counts kept elsewhere)"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may be computed at scrape time with set_function"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Cumulative buckets plus sum and count, as Prometheus expects"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]  # bucket counts, sum, count
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][index] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        samples = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", key, (("le", _format_value(bound)),), cumulative))
+            samples.append(("_sum", key, (), total))
+            samples.append(("_count", key, (), count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Telegram handlers
+HANDLER_LATENCY = REGISTRY.histogram("bot_handler_latency_seconds", "Time spent in each update handler", ["handler"])
+HANDLER_ERRORS = REGISTRY.counter("bot_handler_errors_total", "Exceptions escaping update handlers", ["handler"])
+HANDLER_IN_FLIGHT = REGISTRY.gauge("bot_handler_in_flight", "Updates currently being handled", ["handler"])
+CONVERSATION_STATES = REGISTRY.gauge("bot_conversation_states", "Users currently in each conversation state", ["conversation", "state"])
+
+# Upstream services
+GEMINI_LATENCY = REGISTRY.histogram("bot_gemini_request_seconds", "Gemini call latency (after admission)", ["call"])
+GEMINI_ERRORS = REGISTRY.counter("bot_gemini_errors_total", "Failed Gemini calls", ["call", "code"])
+GEMINI_IN_FLIGHT = REGISTRY.gauge("bot_gemini_in_flight", "Gemini calls currently running")
+MAPS_LATENCY = REGISTRY.histogram("bot_maps_request_seconds", "Google Maps Places API latency", ["endpoint"])
+MAPS_ERRORS = REGISTRY.counter("bot_maps_errors_total", "Failed Google Maps Places API calls", ["endpoint"])
+PDF_RENDER_SECONDS = REGISTRY.histogram("bot_pdf_render_seconds", "PDF render time including pool wait", ["document"])
+
+
+class ConversationTracker:
+    """Current state per conversation key, so state counts can be scraped"""
+
+    def __init__(self, name, state_names):
+        self.name = name
+        self.state_names = state_names  # state int -> label
+        self._states = {}  # (chat_id, user_id) -> state
+
+    def record(self, update, state):
+        """Apply a handler's return value (None keeps the state, -1 ends the conversation)"""
+        chat = getattr(update, 'effective_chat', None)
+        user = getattr(update, 'effective_user', None)
+        key = (chat.id if chat else None, user.id if user else None)
+        if state is None:
+            return
+        if state == -1:
+            self._states.pop(key, None)
+        else:
+            self._states[key] = state
+
+    def counts(self):
+        counts = {(self.name, name): 0 for name in self.state_names.values()}
+        for state in self._states.values():
+            label = (self.name, self.state_names.get(state, str(state)))
+            counts[label] = counts.get(label, 0) + 1
+        return counts
+
+
+def instrument(handler, name=None, conversation=None):
+    """Wrap a PTB handler callback with latency, error and in-flight metrics"""
+    name = name or handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        with HANDLER_IN_FLIGHT.track_inprogress(handler=name), HANDLER_LATENCY.time(handler=name):
+            try:
+                result = await handler(update, context)
+            except Exception:
+                HANDLER_ERRORS.inc(handler=name)
+                raise
+        if conversation is not None:
+            conversation.record(update, result)
+        return result
+
+    return wrapper
+
+
+def build_metrics_app(registry=REGISTRY):
+    async def metrics(request):
+        return web.Response(body=registry.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+async def start_metrics_server(host, port, registry=REGISTRY):
+    """Serve /metrics on a local port; returns the runner (call cleanup() to stop)"""
+    runner = web.AppRunner(build_metrics_app(registry), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return runner
@@ -7,7 +7,48 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from datetime import datetime
+from io import BytesIO
+import copy
 import os
+import threading
+
+
+# Table styles are immutable once built, so every PDF shares the same instances
+DETAILS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+])
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+])
+
+SECTION_HEADINGS = [
+    "COMPLAINANT DETAILS",
+    "COMPLAINT DETAILS",
+    "APPLICABLE LAWS/SECTIONS",
+    "POLICE STATION DETAILS",
+    "INFORMANT/COMPLAINANT DETAILS",
+    "CRIME/INCIDENT DETAILS",
+    "ACCUSED DETAILS",
+    "DETAILED DESCRIPTION OF INCIDENT"
+]
+
+COMPLAINT_FOOTER_TEXT = """<i>Note: This is a computer-generated complaint form. Please review all details carefully before submission. 
+        It is advisable to consult with a legal professional before filing. Attach any supporting documents and evidence.</i>"""
+
+FIR_FOOTER_TEXT = """<i><b>IMPORTANT:</b> This is a draft FIR for your reference. Please visit the police station in person to file the actual FIR. 
+        Carry original documents, evidence, and witness details if available. You have the right to get a copy of the FIR.
+        For serious crimes, immediate police assistance can be obtained by calling 100 (Police Emergency) or 112 (National Emergency Number).</i>"""
 
 
 class ComplaintPDFGenerator:
@@ -16,6 +57,7 @@ class ComplaintPDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.custom_styles()
+        self.static_flowables()
     
     def custom_styles(self):
         """Create custom styles for the PDF"""
@@ -37,14 +79,32 @@ class ComplaintPDFGenerator:
             spaceBefore=12
         )
     
+    def static_flowables(self):
+        """Pre-parse flowables that are identical in every PDF"""
+        self._complaint_title = Paragraph("COMPLAINT FORM", self.title_style)
+        self._fir_title = Paragraph("FIRST INFORMATION REPORT (FIR) - DRAFT", self.title_style)
+        self._complaint_footer = Paragraph(COMPLAINT_FOOTER_TEXT, self.styles['Normal'])
+        self._fir_footer = Paragraph(FIR_FOOTER_TEXT, self.styles['Normal'])
+        self._headings = {
+            title: Paragraph(f"<b>{title}</b>", self.heading_style)
+            for title in SECTION_HEADINGS
+        }
+    
+    def _static(self, flowable):
+        """Shallow copy of a pre-parsed flowable so layout state is never shared between builds"""
+        return copy.copy(flowable)
+    
+    def _heading(self, title):
+        """Section heading flowable"""
+        return self._static(self._headings[title])
+    
     def generate_complaint_pdf(self, complaint_data, filename="complaint.pdf"):
-        """Generate a complaint PDF"""
+        """Generate a complaint PDF (filename may also be a file-like object)"""
         doc = SimpleDocTemplate(filename, pagesize=A4)
         story = []
         
         # Title
-        title = Paragraph("COMPLAINT FORM", self.title_style)
-        story.append(title)
+        story.append(self._static(self._complaint_title))
         story.append(Spacer(1, 0.2*inch))
         
         # Date and time
@@ -68,7 +128,7 @@ class ComplaintPDFGenerator:
             story.append(Spacer(1, 0.3*inch))
         
         # Personal Details Section
-        story.append(Paragraph("<b>COMPLAINANT DETAILS</b>", self.heading_style))
+        story.append(self._heading("COMPLAINANT DETAILS"))
         
         personal_data = [
             ["Name:", complaint_data.get('name', 'N/A')],
@@ -80,21 +140,12 @@ class ComplaintPDFGenerator:
         ]
         
         personal_table = Table(personal_data, colWidths=[2*inch, 4*inch])
-        personal_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
+        personal_table.setStyle(DETAILS_TABLE_STYLE)
         story.append(personal_table)
         story.append(Spacer(1, 0.3*inch))
         
         # Complaint Details Section
-        story.append(Paragraph("<b>COMPLAINT DETAILS</b>", self.heading_style))
+        story.append(self._heading("COMPLAINT DETAILS"))
         
         if complaint_data.get('complaint_type'):
             type_para = Paragraph(f"<b>Type of Complaint:</b> {complaint_data['complaint_type']}", self.styles['Normal'])
@@ -119,14 +170,14 @@ class ComplaintPDFGenerator:
         
         # Applicable Laws Section
         if complaint_data.get('applicable_laws'):
-            story.append(Paragraph("<b>APPLICABLE LAWS/SECTIONS</b>", self.heading_style))
+            story.append(self._heading("APPLICABLE LAWS/SECTIONS"))
             laws_para = Paragraph(complaint_data['applicable_laws'], self.styles['Normal'])
             story.append(laws_para)
             story.append(Spacer(1, 0.3*inch))
         
         # Police Station Full Details Section (if available)
         if complaint_data.get('police_details'):
-            story.append(Paragraph("<b>POLICE STATION DETAILS</b>", self.heading_style))
+            story.append(self._heading("POLICE STATION DETAILS"))
             
             # Clean police details for PDF
             police_details = str(complaint_data['police_details'])
@@ -149,33 +200,24 @@ class ComplaintPDFGenerator:
         ]
         
         sig_table = Table(signature_data, colWidths=[3*inch, 3*inch])
-        sig_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ]))
+        sig_table.setStyle(SIGNATURE_TABLE_STYLE)
         story.append(sig_table)
         
         # Footer note
         story.append(Spacer(1, 0.3*inch))
-        footer_text = """<i>Note: This is a computer-generated complaint form. Please review all details carefully before submission. 
-        It is advisable to consult with a legal professional before filing. Attach any supporting documents and evidence.</i>"""
-        footer_para = Paragraph(footer_text, self.styles['Normal'])
-        story.append(footer_para)
+        story.append(self._static(self._complaint_footer))
         
         # Build PDF
         doc.build(story)
         return filename
     
     def generate_fir_pdf(self, fir_data, filename="fir_draft.pdf"):
-        """Generate an FIR draft PDF"""
+        """Generate an FIR draft PDF (filename may also be a file-like object)"""
         doc = SimpleDocTemplate(filename, pagesize=A4)
         story = []
         
         # Title
-        title = Paragraph("FIRST INFORMATION REPORT (FIR) - DRAFT", self.title_style)
-        story.append(title)
+        story.append(self._static(self._fir_title))
         story.append(Spacer(1, 0.2*inch))
         
         # Date and time
@@ -191,7 +233,7 @@ class ComplaintPDFGenerator:
             story.append(Spacer(1, 0.3*inch))
         
         # Informant Details Section
-        story.append(Paragraph("<b>INFORMANT/COMPLAINANT DETAILS</b>", self.heading_style))
+        story.append(self._heading("INFORMANT/COMPLAINANT DETAILS"))
         
         informant_data = [
             ["Name:", fir_data.get('name', 'N/A')],
@@ -203,21 +245,12 @@ class ComplaintPDFGenerator:
         ]
         
         informant_table = Table(informant_data, colWidths=[2*inch, 4*inch])
-        informant_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
+        informant_table.setStyle(DETAILS_TABLE_STYLE)
         story.append(informant_table)
         story.append(Spacer(1, 0.3*inch))
         
         # Crime Details Section
-        story.append(Paragraph("<b>CRIME/INCIDENT DETAILS</b>", self.heading_style))
+        story.append(self._heading("CRIME/INCIDENT DETAILS"))
         
         crime_data = [
             ["Type of Crime:", fir_data.get('crime_type', 'N/A')],
@@ -226,36 +259,27 @@ class ComplaintPDFGenerator:
         ]
         
         crime_table = Table(crime_data, colWidths=[2*inch, 4*inch])
-        crime_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
+        crime_table.setStyle(DETAILS_TABLE_STYLE)
         story.append(crime_table)
         story.append(Spacer(1, 0.2*inch))
         
         # Accused Details (if any)
         if fir_data.get('accused_details'):
-            story.append(Paragraph("<b>ACCUSED DETAILS</b>", self.heading_style))
+            story.append(self._heading("ACCUSED DETAILS"))
             accused_para = Paragraph(fir_data['accused_details'], self.styles['Normal'])
             story.append(accused_para)
             story.append(Spacer(1, 0.2*inch))
         
         # Detailed Description
         if fir_data.get('description'):
-            story.append(Paragraph("<b>DETAILED DESCRIPTION OF INCIDENT</b>", self.heading_style))
+            story.append(self._heading("DETAILED DESCRIPTION OF INCIDENT"))
             desc_para = Paragraph(fir_data['description'], self.styles['Normal'])
             story.append(desc_para)
             story.append(Spacer(1, 0.2*inch))
         
         # Applicable Laws Section
         if fir_data.get('applicable_laws'):
-            story.append(Paragraph("<b>APPLICABLE LAWS/SECTIONS</b>", self.heading_style))
+            story.append(self._heading("APPLICABLE LAWS/SECTIONS"))
             laws_para = Paragraph(fir_data['applicable_laws'], self.styles['Normal'])
             story.append(laws_para)
             story.append(Spacer(1, 0.3*inch))
@@ -269,36 +293,53 @@ class ComplaintPDFGenerator:
         ]
         
         sig_table = Table(signature_data, colWidths=[3*inch, 3*inch])
-        sig_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ]))
+        sig_table.setStyle(SIGNATURE_TABLE_STYLE)
         story.append(sig_table)
         
         # Footer note
         story.append(Spacer(1, 0.3*inch))
-        footer_text = """<i><b>IMPORTANT:</b> This is a draft FIR for your reference. Please visit the police station in person to file the actual FIR. 
-        Carry original documents, evidence, and witness details if available. You have the right to get a copy of the FIR.
-        For serious crimes, immediate police assistance can be obtained by calling 100 (Police Emergency) or 112 (National Emergency Number).</i>"""
-        footer_para = Paragraph(footer_text, self.styles['Normal'])
-        story.append(footer_para)
+        story.append(self._static(self._fir_footer))
         
         # Build PDF
         doc.build(story)
         return filename
 
 
+# Process-wide generator - styles and static flowables are built once per process
+_shared_generator = None
+_shared_generator_lock = threading.Lock()
+
+
+def get_pdf_generator():
+    """Shared ComplaintPDFGenerator (safe to use from several threads)"""
+    global _shared_generator
+    if _shared_generator is None:
+        with _shared_generator_lock:
+            if _shared_generator is None:
+                _shared_generator = ComplaintPDFGenerator()
+    return _shared_generator
+
+
 # Helper function
 def create_complaint_pdf(complaint_data, filename="complaint.pdf"):
     """Helper function to create complaint PDF"""
-    generator = ComplaintPDFGenerator()
-    return generator.generate_complaint_pdf(complaint_data, filename)
+    return get_pdf_generator().generate_complaint_pdf(complaint_data, filename)
 
 
 def create_fir_pdf(fir_data, filename="fir_draft.pdf"):
     """Helper function to create FIR PDF"""
-    generator = ComplaintPDFGenerator()
-    return generator.generate_fir_pdf(fir_data, filename)
+    return get_pdf_generator().generate_fir_pdf(fir_data, filename)
+
+
+def render_complaint_pdf(complaint_data):
+    """Render a complaint PDF in memory and return its bytes"""
+    buffer = BytesIO()
+    get_pdf_generator().generate_complaint_pdf(complaint_data, buffer)
+    return buffer.getvalue()
+
 
+def render_fir_pdf(fir_data):
+    """Render an FIR draft PDF in memory and return its bytes"""
+    buffer = BytesIO()
+    get_pdf_generator().generate_fir_pdf(fir_data, buffer)
+    return buffer.getvalue()
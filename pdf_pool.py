@@ -0,0 +1,65 @@
+"""
+Off-loop PDF rendering with a bounded worker pool
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from metrics import PDF_RENDER_SECONDS
+from pdf_generator import render_complaint_pdf, render_fir_pdf
+
+logger = logging.getLogger(__name__)
+
+
+class PDFPoolBusy(Exception):
+    """Raised when the render queue stays full for longer than the wait timeout"""
+
+
+class PDFRenderPool:
+    """Render PDFs in worker processes/threads so the event loop never blocks on ReportLab"""
+
+    def __init__(self, workers=2, kind="process", max_pending=None, wait_timeout=30.0):
+        if kind == "process":
+            # spawn avoids forking a process that already runs the bot's threads and event loop
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf")
+        self.max_pending = max_pending or workers * 4
+        self.wait_timeout = wait_timeout
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._pending = 0
+
+    async def _run(self, func, data, document):
+        with PDF_RENDER_SECONDS.time(document=document):
+            return await self._run_in_slot(func, data)
+
+    async def _run_in_slot(self, func, data):
+        # Backpressure: wait for a slot, but give up instead of queueing without bound
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise PDFPoolBusy(f"PDF render queue full ({self.max_pending} pending)")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, data)
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    async def render_complaint(self, complaint_data):
+        """Complaint PDF bytes"""
+        return await self._run(render_complaint_pdf, dict(complaint_data), 'complaint')
+
+    async def render_fir(self, fir_data):
+        """FIR draft PDF bytes"""
+        return await self._run(render_fir_pdf, dict(fir_data), 'fir')
+
+    def pending(self):
+        """Renders queued or in progress"""
+        return self._pending
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
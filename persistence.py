@@ -0,0 +1,182 @@
+"""
+SQLite persistence for complaint conversations
+Keeps half-filled complaints across restarts without a disk write per message
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePersistence(BasePersistence):
+    """Write-batched, lazily loaded persistence for user_data and conversation states"""
+
+    def __init__(self, db_path, flush_interval=0.5, flush_batch_size=100, max_loaded_users=10000):
+        # Only user_data (holds the complaint form) and conversations are stored
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=flush_interval
+        )
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.max_loaded_users = max_loaded_users
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "name TEXT NOT NULL, key TEXT NOT NULL, state TEXT NOT NULL, PRIMARY KEY (name, key))"
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+
+        self._pending_user_data = {}  # user_id -> JSON text, or None to delete
+        self._pending_conversations = {}  # (name, key JSON) -> state JSON, or None to delete
+        self._loaded_users = OrderedDict()  # user_id -> None, least recently seen first
+        self._flush_task = None
+        self._flush_sleeping = False  # True until the delayed flush starts writing
+
+    # ---- user_data (loaded lazily per user) ----
+
+    async def get_user_data(self):
+        # Nothing is loaded up front - refresh_user_data pulls each user in on first update
+        return {}
+
+    async def refresh_user_data(self, user_id, user_data):
+        if user_id in self._loaded_users:
+            self._loaded_users.move_to_end(user_id)
+            return
+        self._mark_loaded(user_id)
+
+        if user_id in self._pending_user_data:
+            stored = self._pending_user_data[user_id]
+        else:
+            row = await asyncio.to_thread(self._read_user_data, user_id)
+            stored = row[0] if row else None
+
+        if stored:
+            for key, value in json.loads(stored).items():
+                user_data.setdefault(key, value)
+
+    async def update_user_data(self, user_id, data):
+        self._mark_loaded(user_id)
+        self._pending_user_data[user_id] = json.dumps(data)
+        await self._schedule_flush()
+
+    async def drop_user_data(self, user_id):
+        self._loaded_users.pop(user_id, None)
+        self._pending_user_data[user_id] = None
+        await self._schedule_flush()
+
+    def _mark_loaded(self, user_id):
+        self._loaded_users[user_id] = None
+        self._loaded_users.move_to_end(user_id)
+        # A forgotten user is just re-read on their next update; setdefault keeps newer in-memory values
+        while len(self._loaded_users) > self.max_loaded_users:
+            self._loaded_users.popitem(last=False)
+
+    # ---- conversations ----
+
+    async def get_conversations(self, name):
+        rows = await asyncio.to_thread(self._read_conversations, name)
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+
+    async def update_conversation(self, name, key, new_state):
+        state = json.dumps(new_state) if new_state is not None else None
+        self._pending_conversations[(name, json.dumps(list(key)))] = state
+        await self._schedule_flush()
+
+    # ---- not stored ----
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    # ---- batching ----
+
+    async def flush(self):
+        """Called by the Application on shutdown - write everything and close"""
+        if self._flush_task is not None and not self._flush_task.done():
+            if self._flush_sleeping:
+                self._flush_task.cancel()  # Its changes are still pending and get written below
+            else:
+                await self._flush_task  # Already writing a batch it took - let it reach the database
+        await self._write_pending()
+        with self._db_lock:
+            self._db.close()
+
+    async def _schedule_flush(self):
+        """Write now if the batch is full, otherwise within flush_interval"""
+        if len(self._pending_user_data) + len(self._pending_conversations) >= self.flush_batch_size:
+            await self._write_pending()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_sleeping = True
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_sleeping = False
+        await self._write_pending()
+
+    async def _write_pending(self):
+        user_batch, self._pending_user_data = self._pending_user_data, {}
+        conversation_batch, self._pending_conversations = self._pending_conversations, {}
+        if user_batch or conversation_batch:
+            await asyncio.to_thread(self._write_batch, user_batch, conversation_batch)
+
+    def _write_batch(self, user_batch, conversation_batch):
+        """Apply one batch of changes in a single transaction"""
+        with self._db_lock, self._db:
+            for user_id, data in user_batch.items():
+                if data is None:
+                    self._db.execute("DELETE FROM user_data WHERE user_id = ?", (user_id,))
+                else:
+                    self._db.execute("INSERT OR REPLACE INTO user_data (user_id, data) VALUES (?, ?)", (user_id, data))
+            for (name, key), state in conversation_batch.items():
+                if state is None:
+                    self._db.execute("DELETE FROM conversations WHERE name = ? AND key = ?", (name, key))
+                else:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO conversations (name, key, state) VALUES (?, ?, ?)",
+                        (name, key, state)
+                    )
+        logger.debug(f"Persisted {len(user_batch)} user_data and {len(conversation_batch)} conversation changes")
+
+    def _read_user_data(self, user_id):
+        with self._db_lock:
+            return self._db.execute("SELECT data FROM user_data WHERE user_id = ?", (user_id,)).fetchone()
+
+    def _read_conversations(self, name):
+        with self._db_lock:
+            return self._db.execute("SELECT key, state FROM conversations WHERE name = ?", (name,)).fetchall()
@@ -0,0 +1,141 @@
+"""
+Outbound Telegram rate limiting
+Every Bot API call (replies, documents, edits, chat actions) passes through here
+"""
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+CHAT_ACTION_ENDPOINT = "sendChatAction"
+
+
+class OutboundRateLimiter(BaseRateLimiter):
+    """Global and per-chat token buckets, RetryAfter backoff and chat-action coalescing"""
+
+    def __init__(self, global_rate=30, per_chat_rate=1.0, per_chat_burst=3, max_retries=3,
+                 action_interval=4.0, max_tracked_chats=10000):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self.action_interval = action_interval  # A chat action shows for ~5 s, so resending sooner is redundant
+        self.max_tracked_chats = max_tracked_chats
+
+        self._global_lock = asyncio.Lock()  # FIFO admission to the global bucket
+        self._chats = OrderedDict()  # chat_id -> [bucket, lock, waiters] (LRU)
+        self._last_action = {}  # (chat_id, action) -> monotonic time it was sent
+        self._global_waiters = 0
+        self.stats = {'sent': 0, 'coalesced': 0, 'flood_waits': 0, 'retried': 0, 'failed': 0}
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def queue_depths(self):
+        """Requests currently waiting for a global or per-chat token"""
+        return {
+            'global': self._global_waiters,
+            'per_chat': sum(entry[2] for entry in self._chats.values()),
+            'chats_waiting': sum(1 for entry in self._chats.values() if entry[2])
+        }
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            # getUpdates, getFile, answerCallbackQuery... are not message sends
+            return await callback(*args, **kwargs)
+
+        if endpoint == CHAT_ACTION_ENDPOINT:
+            action_key = (chat_id, data.get('action'))
+            if time.monotonic() - self._last_action.get(action_key, 0.0) < self.action_interval:
+                self.stats['coalesced'] += 1
+                return True  # What Telegram returns for a successful chat action
+            self._last_action[action_key] = time.monotonic()
+
+        for attempt in range(self.max_retries + 1):
+            if endpoint == CHAT_ACTION_ENDPOINT:
+                await self._acquire_global()
+            else:
+                await self._acquire_chat(chat_id)
+
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.stats['flood_waits'] += 1
+                retry_after = e.retry_after
+                if isinstance(retry_after, datetime.timedelta):
+                    retry_after = retry_after.total_seconds()
+                if attempt == self.max_retries:
+                    self.stats['failed'] += 1
+                    raise
+                logger.warning(f"Telegram flood wait {retry_after}s on {endpoint} for chat {chat_id}, retrying")
+                self.stats['retried'] += 1
+                # Hold back this chat, and everyone briefly, until Telegram lets us send again
+                self._chat_entry(chat_id)[0].pause(retry_after)
+                self.global_bucket.pause(min(retry_after, 1.0))
+                continue
+
+            self.stats['sent'] += 1
+            if endpoint != CHAT_ACTION_ENDPOINT:
+                # A delivered message clears the typing indicator, so the next one must go out
+                for key in [key for key in self._last_action if key[0] == chat_id]:
+                    del self._last_action[key]
+            return result
+
+    def _chat_entry(self, chat_id):
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            entry = [TokenBucket(self.per_chat_rate, self.per_chat_burst), asyncio.Lock(), 0]
+            self._chats[chat_id] = entry
+            self._evict_idle_chats()
+        else:
+            self._chats.move_to_end(chat_id)
+        return entry
+
+    def _evict_idle_chats(self):
+        # Oldest buckets have long since refilled, so dropping them loses nothing
+        while len(self._chats) > self.max_tracked_chats:
+            oldest_id, oldest = next(iter(self._chats.items()))
+            if oldest[2]:
+                break
+            del self._chats[oldest_id]
+            for key in [key for key in self._last_action if key[0] == oldest_id]:
+                del self._last_action[key]
+
+    async def _acquire_chat(self, chat_id):
+        """Per-chat then global admission; the chat token is spent only once the send can go out"""
+        entry = self._chat_entry(chat_id)
+        entry[2] += 1
+        try:
+            # The lock keeps a chat's messages in order while they wait for tokens
+            async with entry[1]:
+                while entry[0].time_until_token() > 0:
+                    await asyncio.sleep(entry[0].time_until_token())
+                await self._acquire_global()
+                entry[0].try_consume()
+        finally:
+            entry[2] -= 1
+
+    async def _acquire_global(self):
+        self._global_waiters += 1
+        try:
+            async with self._global_lock:
+                await self._wait_for_token(self.global_bucket)
+        finally:
+            self._global_waiters -= 1
+
+    @staticmethod
+    async def _wait_for_token(bucket):
+        while not bucket.try_consume():
+            await asyncio.sleep(bucket.time_until_token())
@@ -0,0 +1,134 @@
+"""
+Admission scheduler for Gemini API calls
+Keeps calls under the configured quota and lets complaint-flow calls jump the queue
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Priority classes (lower value is served first)
+PRIORITY_COMPLAINT = 0
+PRIORITY_CHAT = 1
+PRIORITY_BACKGROUND = 2
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when a request is shed (queue full or deadline passed)"""
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return now
+
+    def time_until_token(self):
+        """Seconds until one token is available (0 if available now)"""
+        now = self._refill()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def try_consume(self):
+        """Take one token if available"""
+        if self.time_until_token() > 0:
+            return False
+        self.tokens -= 1
+        return True
+
+    def pause(self, seconds):
+        """Drain the bucket and block refills for a while (upstream said 429)"""
+        self._refill()
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class GeminiScheduler:
+    """Priority-aware admission control in front of Gemini calls"""
+
+    def __init__(self, requests_per_minute, burst, max_queue_size, deadlines):
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=burst)
+        self.max_queue_size = max_queue_size
+        self.deadlines = deadlines  # priority -> max seconds a request may wait
+        self._queues = {}  # priority -> deque of waiter futures
+        self._wakeup = None
+        self._dispatcher = None
+        self.stats = {'admitted': 0, 'shed': 0}
+
+    async def acquire(self, priority=PRIORITY_CHAT):
+        """Wait for an admission slot; raise SchedulerOverloaded if shed"""
+        self._ensure_dispatcher()
+
+        queue = self._queues.setdefault(priority, deque())
+        if len(queue) >= self.max_queue_size:
+            self.stats['shed'] += 1
+            raise SchedulerOverloaded(f"Gemini queue full for priority {priority}")
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.deadlines.get(priority))
+        except asyncio.TimeoutError:
+            # Deadline passed while queued - shed instead of sending a late request
+            self.stats['shed'] += 1
+            raise SchedulerOverloaded(f"Gemini queue deadline exceeded for priority {priority}")
+
+        self.stats['admitted'] += 1
+
+    def pause(self, seconds):
+        """Back off all admissions after an upstream rate-limit error"""
+        logger.warning(f"Gemini rate limited - pausing admissions for {seconds}s")
+        self.bucket.pause(seconds)
+
+    def queue_depths(self):
+        """Number of live waiters per priority"""
+        return {priority: sum(1 for w in queue if not w.done()) for priority, queue in self._queues.items()}
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _next_waiter(self):
+        """Highest-priority waiter that is still waiting (drops timed-out ones)"""
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            while queue and queue[0].done():
+                queue.popleft()
+            if queue:
+                return queue
+        return None
+
+    async def _dispatch(self):
+        while True:
+            queue = self._next_waiter()
+            if queue is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self.bucket.time_until_token()
+            if delay > 0:
+                # Re-pick after sleeping: a higher priority request may have arrived
+                await asyncio.sleep(delay)
+                continue
+
+            self.bucket.try_consume()
+            queue.popleft().set_result(None)
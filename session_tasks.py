@@ -0,0 +1,87 @@
+"""
+Per-user background tasks for in-progress conversations
+Kept in memory, outside the persisted user_data (tasks can't be serialized)
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SessionTasks:
+    """Named speculative tasks per user, tagged with the inputs they were started from"""
+
+    def __init__(self, keep_for=15 * 60):
+        self.keep_for = keep_for  # Unclaimed finished results are dropped after this many seconds
+        self._tasks = {}  # (user_id, name) -> (tag, task)
+
+    def start(self, user_id, name, coro, tag=None):
+        """Run coro in the background, replacing any earlier task with the same name
+
+        An unfinished-or-successful task already started with the same tag is kept instead.
+        """
+        existing = self._tasks.get((user_id, name))
+        if existing is not None and existing[0] == tag and not existing[1].cancelled() and \
+                (not existing[1].done() or existing[1].exception() is None):
+            coro.close()  # Never scheduled, so close it to avoid a "never awaited" warning
+            return existing[1]
+        self.cancel(user_id, name)
+        task = asyncio.create_task(coro)
+        key = (user_id, name)
+        self._tasks[key] = (tag, task)
+        task.add_done_callback(lambda t: self._expire_later(key, t))
+        return task
+
+    def running(self, user_id, name):
+        """True if the named task exists and hasn't finished (take() would have to wait)"""
+        entry = self._tasks.get((user_id, name))
+        return entry is not None and not entry[1].done()
+
+    async def take(self, user_id, name, tag=None, timeout=None):
+        """Result of a task started with the same tag, or None (missing, stale or failed)"""
+        entry = self._tasks.pop((user_id, name), None)
+        if entry is None:
+            return None
+
+        task_tag, task = entry
+        if task_tag != tag:
+            # Inputs changed since the task started - its answer is for the wrong question
+            task.cancel()
+            return None
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout) if timeout else await task
+        except asyncio.TimeoutError:
+            logger.warning(f"Background {name} for {user_id} still running after {timeout}s")
+            task.cancel()
+            return None
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # The caller itself was cancelled
+            return None
+        except Exception as e:
+            logger.warning(f"Background {name} for {user_id} failed: {e}")
+            return None
+
+    def cancel(self, user_id, name=None):
+        """Cancel one named task, or every task for the user"""
+        keys = [(user_id, name)] if name is not None else [key for key in self._tasks if key[0] == user_id]
+        for key in keys:
+            entry = self._tasks.pop(key, None)
+            if entry is not None and not entry[1].done():
+                entry[1].cancel()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def _expire_later(self, key, task):
+        if task.cancelled():
+            return
+        # Retrieve the exception so an unclaimed failure isn't reported as "never retrieved"
+        task.exception()
+        asyncio.get_running_loop().call_later(self.keep_for, self._expire, key, task)
+
+    def _expire(self, key, task):
+        entry = self._tasks.get(key)
+        if entry is not None and entry[1] is task:
+            del self._tasks[key]
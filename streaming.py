@@ -0,0 +1,91 @@
+"""
+Progressive Telegram replies for streamed Gemini output
+"""
+import logging
+import time
+
+from telegram.error import BadRequest
+
+from telegram_format import TELEGRAM_MAX_MESSAGE_LENGTH, utf16_len, utf16_prefix
+
+logger = logging.getLogger(__name__)
+
+
+def find_split_point(text, limit):
+    """Best place to cut text at or before limit (paragraph, line, then word)"""
+    for separator in ('\n\n', '\n', ' '):
+        index = text.rfind(separator, 0, limit)
+        if index > 0:
+            return index
+    return limit
+
+
+class StreamingReply:
+    """Post a reply as soon as text arrives and keep editing it as more streams in"""
+
+    def __init__(self, message, edit_interval=1.0, max_length=TELEGRAM_MAX_MESSAGE_LENGTH):
+        self.message = message  # Incoming message we are replying to
+        self.edit_interval = edit_interval
+        self.max_length = max_length  # UTF-16 units, as Telegram counts them
+        self.segments = []  # [sent Message, text] per outgoing message
+        self.text = ""  # Full streamed text
+        self._pending = ""  # Text of the current segment
+        self._last_edit = 0.0
+        self._last_sent = ""
+
+    async def append(self, chunk):
+        """Add streamed text, rolling over into a new message near the size limit"""
+        if not chunk:
+            return
+        self.text += chunk
+        self._pending += chunk
+
+        while utf16_len(self._pending) > self.max_length:
+            cut = find_split_point(self._pending, utf16_prefix(self._pending, self.max_length))
+            head, self._pending = self._pending[:cut].rstrip(), self._pending[cut:].lstrip()
+            await self._flush(head, force=True)
+            # Next flush posts a fresh message
+            self.segments.append(None)
+
+        await self._flush(self._pending)
+
+    async def finish(self, formatter=None, parse_mode='HTML'):
+        """Final edit of every segment, applying formatting (e.g. render_html)"""
+        await self._flush(self._pending, force=True)
+
+        for sent, raw_text in [s for s in self.segments if s is not None]:
+            formatted = formatter(raw_text) if formatter else raw_text
+            try:
+                await sent.edit_text(formatted, parse_mode=parse_mode if formatter else None)
+            except BadRequest as e:
+                # "message is not modified" - the plain text already shown is final
+                logger.debug(f"Final streaming edit skipped: {e}")
+
+    async def _flush(self, text, force=False):
+        """Send or edit the current segment, rate limited unless forced"""
+        if not text.strip():
+            return
+
+        current = self.segments[-1] if self.segments else None
+        if current is None:
+            sent = await self.message.reply_text(text)
+            if self.segments:
+                self.segments[-1] = [sent, text]
+            else:
+                self.segments.append([sent, text])
+            self._last_edit = time.monotonic()
+            self._last_sent = text
+            return
+
+        if text == self._last_sent:
+            return
+        if not force and time.monotonic() - self._last_edit < self.edit_interval:
+            return
+
+        try:
+            await current[0].edit_text(text)
+        except BadRequest as e:
+            logger.debug(f"Streaming edit skipped: {e}")
+        current[1] = text
+        self._last_edit = time.monotonic()
+        self._last_sent = text
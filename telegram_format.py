@@ -0,0 +1,237 @@
+"""
+Markdown to Telegram HTML
+Single pass over Gemini's Markdown that always produces HTML Telegram accepts,
+so every reply goes out in one API call with no plain-text retry, then packed
+into as few messages as Telegram's length limit allows.
+"""
+import html
+import re
+
+# Inline tokens, tried left to right: `code`, [text](url), then emphasis markers
+_INLINE_RE = re.compile(
+    r"(?P<code>`[^`\n]+`)"
+    r"|(?P<link>\[(?P<link_text>[^\]\n]+)\]\((?P<link_url>https?://[^\s)]+)\))"
+    r"|(?P<marker>\*{1,3}|_{1,2})"
+)
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)[\s#]*$")
+_BULLET_RE = re.compile(r"^(\s*)[*+-]\s+(.*)$")
+_FENCE_RE = re.compile(r"^\s*```")
+
+# Telegram convention: *x* / **x** is bold, _x_ / __x__ is italic
+_MARKER_TAGS = {'*': 'b', '**': 'b', '***': 'b', '_': 'i', '__': 'i'}
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # In UTF-16 code units of the text after entity parsing
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def escape_html(text):
+    return html.escape(text, quote=False)
+
+
+def _render_inline(line):
+    """Convert one line's inline Markdown; markers without a valid partner stay literal"""
+    parts = []
+    stack = []  # (marker, index in parts) of unmatched openers
+    position = 0
+
+    for match in _INLINE_RE.finditer(line):
+        parts.append(escape_html(line[position:match.start()]))
+        position = match.end()
+
+        if match.group('code'):
+            parts.append(f"<code>{escape_html(match.group('code')[1:-1])}</code>")
+            continue
+        if match.group('link'):
+            url = html.escape(match.group('link_url'), quote=True)
+            parts.append(f'<a href="{url}">{escape_html(match.group("link_text"))}</a>')
+            continue
+
+        marker = match.group('marker')
+        before = line[match.start() - 1] if match.start() > 0 else " "
+        after = line[match.end()] if match.end() < len(line) else " "
+        can_open = not after.isspace()
+        can_close = not before.isspace()
+        if marker[0] == '_':
+            # snake_case words and URLs keep their underscores
+            can_open = can_open and not before.isalnum()
+            can_close = can_close and not after.isalnum()
+
+        opener = next((i for i in range(len(stack) - 1, -1, -1) if stack[i][0] == marker), None) if can_close else None
+        if opener is not None:
+            # Openers between the pair never closed - they stay literal, keeping tags properly nested
+            _, open_index = stack[opener]
+            del stack[opener:]
+            tag = _MARKER_TAGS[marker]
+            if any(_MARKER_TAGS[m] == tag for m, _ in stack):
+                # Same tag may still open further out; don't nest it inside itself
+                parts[open_index] = ""
+                parts.append("")
+            else:
+                parts[open_index] = f"<{tag}>"
+                parts.append(f"</{tag}>")
+        elif can_open:
+            stack.append((marker, len(parts)))
+            parts.append(marker)
+        else:
+            parts.append(marker)
+
+    parts.append(escape_html(line[position:]))
+    return "".join(parts)
+
+
+def render_html(text):
+    """Gemini Markdown -> Telegram HTML (headings bold, * bullets as •, fences as <pre>)"""
+    output = []
+    code_lines = None  # Lines inside an open ``` fence
+    blank_run = 0
+
+    for line in text.strip().split("\n"):
+        if _FENCE_RE.match(line):
+            if code_lines is None:
+                code_lines = []
+            else:
+                output.append(f"<pre>{escape_html(chr(10).join(code_lines))}</pre>")
+                code_lines = None
+            continue
+        if code_lines is not None:
+            code_lines.append(line)
+            continue
+
+        if not line.strip():
+            blank_run += 1
+            if blank_run < 2:  # Collapse runs of blank lines to one
+                output.append("")
+            continue
+        blank_run = 0
+
+        heading = _HEADING_RE.match(line)
+        if heading:
+            output.append(f"<b>{_render_inline(heading.group(1).replace('*', ''))}</b>")
+            continue
+
+        bullet = _BULLET_RE.match(line)
+        if bullet:
+            output.append(f"{bullet.group(1)}• {_render_inline(bullet.group(2))}")
+            continue
+
+        output.append(_render_inline(line))
+
+    if code_lines is not None:
+        output.append(f"<pre>{escape_html(chr(10).join(code_lines))}</pre>")
+
+    return "\n".join(output).strip()
+
+
+def utf16_len(text):
+    """Length as Telegram counts it (emoji and other astral characters count as 2)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def utf16_prefix(text, limit):
+    """Number of characters of text that fit in limit UTF-16 units"""
+    used = 0
+    for index, ch in enumerate(text):
+        used += 2 if ord(ch) > 0xFFFF else 1
+        if used > limit:
+            return index
+    return len(text)
+
+
+def visible_len(html_text):
+    """UTF-16 length of rendered HTML once Telegram strips the tags"""
+    return utf16_len(html.unescape(_TAG_RE.sub("", html_text)))
+
+
+def _blocks(html_text):
+    """Lines of render_html output; a multi-line <pre> stays one block so no entity is cut"""
+    blocks = []
+    pre_lines = None
+    for line in html_text.split("\n"):
+        if pre_lines is not None:
+            pre_lines.append(line)
+            if "</pre>" in line:
+                blocks.append("\n".join(pre_lines))
+                pre_lines = None
+        elif line.startswith("<pre>") and "</pre>" not in line:
+            pre_lines = [line]
+        else:
+            blocks.append(line)
+    if pre_lines is not None:
+        blocks.append("\n".join(pre_lines))
+    return blocks
+
+
+def _split_oversized(block, limit):
+    """Break a single block longer than a message into valid pieces"""
+    if block.startswith("<pre>"):
+        wrap = ("<pre>", "</pre>")
+        plain = html.unescape(block[len("<pre>"):-len("</pre>")])
+    else:
+        # Formatting of one giant line is dropped rather than risking a cut entity
+        wrap = ("", "")
+        plain = html.unescape(_TAG_RE.sub("", block))
+
+    pieces = []
+    current = ""
+    for word in re.split(r"(\s+)", plain):
+        if utf16_len(current) + utf16_len(word) > limit:
+            if current.strip():
+                pieces.append(current)
+            current = word.lstrip()
+            while utf16_len(current) > limit:
+                cut = utf16_prefix(current, limit)
+                pieces.append(current[:cut])
+                current = current[cut:]
+        else:
+            current += word
+    if current.strip():
+        pieces.append(current)
+    return [f"{wrap[0]}{escape_html(piece)}{wrap[1]}" for piece in pieces]
+
+
+def split_html(html_text, limit=TELEGRAM_MAX_MESSAGE_LENGTH):
+    """Pack render_html output into as few messages as possible, cutting only between lines"""
+    chunks = []
+    current = []
+    current_len = 0
+
+    def emit(lines):
+        text = "\n".join(lines).strip()
+        if text:
+            chunks.append(text)
+
+    for block in _blocks(html_text):
+        block_len = visible_len(block)
+        if block_len > limit:
+            emit(current)
+            current, current_len = [], 0
+            chunks.extend(_split_oversized(block, limit))
+            continue
+
+        added = block_len + (1 if current else 0)  # +1 for the joining newline
+        if current_len + added > limit:
+            # Prefer ending on a paragraph break if that still leaves the message well filled
+            cut = len(current)
+            for index in range(len(current) - 1, 0, -1):
+                if not current[index]:
+                    if visible_len("\n".join(current[:index])) >= limit // 2:
+                        cut = index
+                    break
+            emit(current[:cut])
+            current = current[cut:]
+            while current and not current[0]:
+                current.pop(0)
+            current_len = visible_len("\n".join(current))
+            added = block_len + (1 if current else 0)
+
+        current.append(block)
+        current_len += added
+
+    emit(current)
+    return chunks
+
+
+def render_messages(text, limit=TELEGRAM_MAX_MESSAGE_LENGTH):
+    """Markdown -> list of Telegram HTML messages, each within the length limit"""
+    return split_html(render_html(text), limit)
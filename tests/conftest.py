@@ -0,0 +1,8 @@
+"""
+Shared test setup
+"""
+import os
+
+# config.py refuses to import without these; tests never reach the real services
+for name in ("TELEGRAM_BOT_TOKEN", "GEMINI_API_KEY", "GOOGLE_MAPS_API_KEY"):
+    os.environ.setdefault(name, "test")
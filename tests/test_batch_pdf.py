@@ -0,0 +1,92 @@
+"""
+Tests for batch_pdf.py
+"""
+import io
+import json
+import sys
+import types
+import zipfile
+
+import pytest
+
+from batch_pdf import main, pdf_filename, read_records, run_batch
+
+RECORDS = [
+    {'name': "Ravi Kumar", 'complaint_type': "Theft", 'description': "Mobile stolen"},
+    {'name': "Lakshmi", 'complaint_type': "Fraud"},
+]
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    path = tmp_path / "complaints.jsonl"
+    lines = [json.dumps(RECORDS[0]), "", "{not json", "[1, 2]", json.dumps({'description': "<b>unclosed"}),
+             json.dumps(RECORDS[1])]
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return path
+
+
+def test_read_records_jsonl_reports_bad_lines(jsonl_file):
+    records = list(read_records(str(jsonl_file)))
+    assert [line_no for line_no, _ in records] == [1, 3, 4, 5, 6]  # Blank line 2 is skipped
+    assert records[0][1] == RECORDS[0]
+    assert isinstance(records[1][1], ValueError)
+    assert records[2][1] == [1, 2]
+
+
+def test_read_records_csv_drops_empty_values(tmp_path):
+    path = tmp_path / "firs.csv"
+    path.write_text("name,age,accused\nRavi Kumar,34,\nLakshmi,,Unknown\n", encoding='utf-8')
+    assert list(read_records(str(path))) == [
+        (2, {'name': "Ravi Kumar", 'age': "34"}),
+        (3, {'name': "Lakshmi", 'accused': "Unknown"}),
+    ]
+
+
+def test_pdf_filename_is_filesystem_safe():
+    assert pdf_filename('complaint', 42, {'name': "Ravi  Kumar/../x"}) == "complaint_000042_ravi_kumar_x.pdf"
+    assert pdf_filename('fir', 1, {}) == "fir_000001.pdf"
+
+
+def test_batch_to_directory_reports_errors_without_stopping(jsonl_file, tmp_path):
+    log = io.StringIO()
+    out = tmp_path / "drafts"
+    rendered, errors, _ = run_batch(str(jsonl_file), str(out), workers=2, log=log)
+
+    assert (rendered, errors) == (2, 3)
+    assert sorted(p.name for p in out.iterdir()) == ["complaint_000001_ravi_kumar.pdf", "complaint_000003_lakshmi.pdf"]
+    assert all(p.read_bytes().startswith(b"%PDF-") for p in out.iterdir())
+    messages = log.getvalue()
+    assert "Line 3: unreadable record" in messages
+    assert "Line 4: expected an object, got list" in messages
+    assert "Line 5:" in messages  # Rendering failure
+
+
+def test_batch_csv_to_zip(tmp_path):
+    path = tmp_path / "firs.csv"
+    path.write_text("name,crime_type\nRavi Kumar,Theft\nLakshmi,Assault\n", encoding='utf-8')
+    out = tmp_path / "drafts.zip"
+
+    rendered, errors, _ = run_batch(str(path), str(out), kind='fir', workers=1, log=io.StringIO())
+
+    assert (rendered, errors) == (2, 0)
+    with zipfile.ZipFile(out) as archive:
+        assert sorted(archive.namelist()) == ["fir_000001_ravi_kumar.pdf", "fir_000002_lakshmi.pdf"]
+        assert archive.read("fir_000001_ravi_kumar.pdf").startswith(b"%PDF-")
+
+
+def test_main_streams_zip_to_stdout(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "complaints.jsonl"
+    path.write_text(json.dumps(RECORDS[0]) + "\n", encoding='utf-8')
+    buffer = io.BytesIO()
+    monkeypatch.setattr(sys, "stdout", types.SimpleNamespace(buffer=buffer))
+
+    assert main([str(path), "--output", "-", "--workers", "1"]) == 0
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+        assert archive.namelist() == ["complaint_000001_ravi_kumar.pdf"]
+    assert "Rendered 1 complaint PDFs" in capsys.readouterr().err
+
+
+def test_main_exit_code_reflects_errors(jsonl_file, tmp_path, capsys):
+    assert main([str(jsonl_file), "--output", str(tmp_path / "out"), "--workers", "1"]) == 1
+    assert "3 errors" in capsys.readouterr().err
@@ -0,0 +1,21 @@
+"""
+Tests for benchmark_pdf.py
+"""
+import tracemalloc
+
+from benchmark_pdf import measure
+
+
+def test_measure_counts_only_what_the_render_allocates():
+    kept = []
+
+    def render(kind):
+        kept.append([object() for _ in range(1000)])
+
+    times, peak_kib, new_blocks = measure(render, 'complaint', 3)
+
+    assert len(times) == 3
+    assert peak_kib > 0
+    # 1000 objects plus the list holding them - unrelated live memory is not counted
+    assert 1000 <= new_blocks < 1100
+    assert not tracemalloc.is_tracing()
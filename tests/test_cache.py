@@ -0,0 +1,191 @@
+"""
+Tests for cache.py
+"""
+import asyncio
+
+import cache
+from cache import AnswerCache, ResponseCache, SingleFlight, make_cache_key, normalize_question
+
+
+def test_normalize_question_ignores_case_punctuation_and_spacing():
+    assert normalize_question("  What is  Section 498A?? ") == "what is section 498a"
+    assert normalize_question("what is section 498a") == normalize_question("What is Section 498A!")
+
+
+def test_make_cache_key_depends_on_model_prompt_and_config():
+    key = make_cache_key("model-a", "prompt")
+    assert key == make_cache_key("model-a", "prompt")
+    assert key != make_cache_key("model-b", "prompt")
+    assert key != make_cache_key("model-a", "other prompt")
+    assert key != make_cache_key("model-a", "prompt", {"temperature": 0.2})
+
+
+def test_response_cache_cold_callers_share_one_fetch():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        response_cache = ResponseCache(ttl=60)
+        results = await asyncio.gather(*(response_cache.get_or_fetch("k", fetch) for _ in range(5)))
+        return results, response_cache.stats
+
+    results, stats = asyncio.run(run())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert stats['misses'] == 5
+
+
+def test_response_cache_serves_stale_value_while_refreshing(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    answers = iter(["old", "new"])
+
+    async def fetch():
+        return next(answers)
+
+    async def run():
+        response_cache = ResponseCache(ttl=60)
+        assert await response_cache.get_or_fetch("k", fetch) == "old"
+        assert await response_cache.get_or_fetch("k", fetch) == "old"  # Fresh hit
+
+        now[0] += 61
+        assert await response_cache.get_or_fetch("k", fetch) == "old"  # Stale, refresh starts
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await response_cache.get_or_fetch("k", fetch) == "new"
+        return response_cache.stats
+
+    stats = asyncio.run(run())
+    assert stats == {'hits': 2, 'stale_hits': 1, 'misses': 1}
+
+
+def test_response_cache_keeps_stale_value_when_refresh_fails(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    async def good():
+        return "old"
+
+    async def bad():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        response_cache = ResponseCache(ttl=60)
+        await response_cache.get_or_fetch("k", good)
+        now[0] += 61
+        assert await response_cache.get_or_fetch("k", bad) == "old"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return await response_cache.get_or_fetch("k", bad)
+
+    assert asyncio.run(run()) == "old"
+
+
+def test_prefetch_warms_and_invalidate_drops():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return "answer"
+
+    async def run():
+        response_cache = ResponseCache(ttl=60)
+        response_cache.prefetch("k", fetch)
+        await asyncio.sleep(0)
+        assert await response_cache.get_or_fetch("k", fetch) == "answer"
+        assert len(calls) == 1
+
+        response_cache.invalidate("k")
+        assert await response_cache.get_or_fetch("k", fetch) == "answer"
+        return len(calls)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_answer_cache_serves_from_disk_after_memory_eviction(tmp_path):
+    answer_cache = AnswerCache(str(tmp_path / "answers.sqlite3"), max_memory_items=2)
+    for n in range(3):
+        answer_cache.set(f"k{n}", f"question {n}", f"answer {n}")
+
+    assert answer_cache.get("k0") == "answer 0"  # Evicted from memory, still on disk
+    assert answer_cache.get("k0") == "answer 0"  # Promoted back into memory
+    assert answer_cache.get("missing") is None
+    assert answer_cache.stats == {'memory_hits': 1, 'disk_hits': 1, 'misses': 1}
+    assert answer_cache.hit_ratio() == 2 / 3
+    answer_cache.close()
+
+
+def test_answer_cache_expires_by_topic_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    answer_cache = AnswerCache(str(tmp_path / "answers.sqlite3"), topic_ttls={'news': 10}, default_ttl=100)
+    answer_cache.set("short", "q", "a", topic="news")
+    answer_cache.set("long", "q", "a")
+
+    now[0] += 11
+    assert answer_cache.get("short") is None
+    assert answer_cache.get("long") == "a"
+    answer_cache.close()
+
+
+def test_answer_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "answers.sqlite3")
+    first = AnswerCache(path)
+    first.set("k", "q", "a")
+    first.close()
+
+    second = AnswerCache(path)
+    assert second.get("k") == "a"
+    second.close()
+
+
+def test_single_flight_coalesces_concurrent_identical_calls():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        single_flight = SingleFlight()
+        results = await asyncio.gather(*(single_flight.do("k", fetch) for _ in range(4)))
+        again = await single_flight.do("k", fetch)  # Previous call finished - a new one starts
+        return results, again, single_flight.stats
+
+    results, again, stats = asyncio.run(run())
+    assert results == ["answer"] * 4 and again == "answer"
+    assert len(calls) == 2
+    assert stats == {'calls': 2, 'coalesced': 3}
+
+
+def test_single_flight_caller_cancelling_does_not_cancel_others():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def run():
+        single_flight = SingleFlight()
+        impatient = asyncio.create_task(single_flight.do("k", fetch))
+        patient = asyncio.create_task(single_flight.do("k", fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "answer"
+
+
+def test_single_flight_shares_errors_with_every_waiter():
+    async def fetch():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def run():
+        single_flight = SingleFlight()
+        return await asyncio.gather(*(single_flight.do("k", fetch) for _ in range(2)), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(run())] == [ValueError, ValueError]
@@ -0,0 +1,134 @@
+"""
+Tests for chat_memory.py
+"""
+import asyncio
+
+import pytest
+
+import chat_memory
+from chat_memory import ChatMemory, estimate_tokens
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(chat_memory.time, "monotonic", lambda: now[0])
+    return now
+
+
+def session_tokens(summary, turns):
+    return estimate_tokens(summary) + sum(estimate_tokens(text) for _, text in turns)
+
+
+def test_exchanges_are_returned_in_order():
+    memory = ChatMemory()
+    assert memory.get(1) == ("", [])
+    assert not memory.has_history(1)
+
+    memory.add_exchange(1, "What is FIR?", "First Information Report.")
+    memory.add_exchange(1, "Who files it?", "The police.")
+
+    assert memory.has_history(1)
+    assert memory.get(1) == ("", [("user", "What is FIR?"), ("model", "First Information Report."),
+                                  ("user", "Who files it?"), ("model", "The police.")])
+
+
+def test_token_budget_folds_older_turns_into_summary():
+    memory = ChatMemory(token_budget=100, recent_turns=4, summary_tokens=20)
+    for i in range(10):
+        memory.add_exchange(1, f"question {i} " + "q" * 60, f"answer {i} " + "a" * 60)
+        summary, turns = memory.get(1)
+        assert session_tokens(summary, turns) <= 100
+
+    summary, turns = memory.get(1)
+    assert len(turns) == 4
+    assert turns[0][1].startswith("question 8")
+    assert summary and len(summary) <= 20 * 4
+
+
+def test_oversized_turns_are_capped_to_fit_the_budget():
+    memory = ChatMemory(token_budget=100, recent_turns=4)
+    memory.add_exchange(1, "x" * 10_000, "y" * 10_000)
+    _, turns = memory.get(1)
+    assert all(len(text) == 100 for _, text in turns)
+
+
+def test_idle_sessions_expire(clock):
+    memory = ChatMemory(idle_ttl=60)
+    memory.add_exchange(1, "hi", "hello")
+
+    clock[0] += 59
+    assert memory.has_history(1)  # Reading refreshes nothing but the LRU order
+
+    clock[0] += 2
+    assert memory.get(1) == ("", [])
+    assert len(memory) == 0
+
+
+def test_least_recently_used_user_is_evicted():
+    memory = ChatMemory(max_users=2)
+    memory.add_exchange(1, "a", "b")
+    memory.add_exchange(2, "a", "b")
+    memory.get(1)  # User 1 is now more recent than user 2
+    memory.add_exchange(3, "a", "b")
+
+    assert len(memory) == 2
+    assert memory.has_history(1)
+    assert not memory.has_history(2)
+    assert memory.has_history(3)
+
+
+def test_summarize_replaces_truncated_summary():
+    calls = []
+
+    async def summarize(text):
+        calls.append(text)
+        return "  User asked about theft FIRs.  "
+
+    async def run():
+        memory = ChatMemory(token_budget=50, recent_turns=2, summarize=summarize)
+        memory.add_exchange(1, "mobile stolen " + "x" * 100, "file an FIR")
+        assert not calls  # Within recent_turns, nothing to fold yet
+        memory.add_exchange(1, "which station? " + "y" * 60, "the nearest one")
+        await asyncio.sleep(0)
+        return memory.get(1)
+
+    summary, turns = asyncio.run(run())
+    assert len(calls) == 1
+    assert calls[0].startswith("USER: mobile stolen")
+    assert "MODEL: file an FIR" in calls[0]
+    assert summary == "User asked about theft FIRs."
+    assert turns == [("user", "which station? " + "y" * 60), ("model", "the nearest one")]
+
+
+def test_failed_summarize_keeps_truncated_transcript():
+    async def summarize(text):
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        memory = ChatMemory(token_budget=50, recent_turns=2, summary_tokens=10, summarize=summarize)
+        memory.add_exchange(1, "q" * 100, "a" * 100)
+        memory.add_exchange(1, "next", "reply")
+        await asyncio.sleep(0)
+        return memory.get(1)[0]
+
+    assert asyncio.run(run()) == "a" * 40
+
+
+def test_clear_cancels_pending_summary():
+    async def summarize(text):
+        await asyncio.sleep(10)
+        return "late"
+
+    async def run():
+        memory = ChatMemory(token_budget=50, recent_turns=2, summarize=summarize)
+        memory.add_exchange(1, "q" * 100, "a" * 100)
+        memory.add_exchange(1, "next", "reply")
+        task = memory._summary_tasks[1]
+        memory.clear(1)
+        await asyncio.sleep(0)
+        return task.cancelled(), memory.get(1)
+
+    cancelled, session = asyncio.run(run())
+    assert cancelled
+    assert session == ("", [])
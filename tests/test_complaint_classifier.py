@@ -0,0 +1,45 @@
+"""
+Tests for complaint_classifier.py
+"""
+import pytest
+
+import config
+from complaint_classifier import ComplaintClassifier
+
+
+@pytest.fixture
+def classifier():
+    return ComplaintClassifier(config.COMPLAINT_TYPE_KEYWORDS, min_weight=3)
+
+
+@pytest.mark.parametrize("text, label", [
+    ("Someone stole my mobile phone from my bag", "Theft"),
+    ("My chain was snatched near the temple", "Robbery"),
+    ("I got a fake call asking for OTP and lost money in a UPI scam", "Fraud"),
+    ("My husband and in-laws are demanding dowry", "Domestic Violence"),
+    ("A man has been stalking me and harassing me daily", "Harassment"),
+    ("నాపై దాడి జరిగింది", "Assault"),
+])
+def test_confident_descriptions_are_labelled_locally(classifier, text, label):
+    assert classifier.classify(text, config.COMPLAINT_CLASSIFIER_THRESHOLD) == label
+
+
+@pytest.mark.parametrize("text", [
+    "My husband",  # One weight-2 keyword: high share, too little evidence
+    "Problem regarding land",
+    "Something happened yesterday evening",
+    "My bike was stolen and then someone hacked my instagram with a fake profile",  # Mixed signals
+])
+def test_weak_or_ambiguous_descriptions_fall_back(classifier, text):
+    assert classifier.classify(text, config.COMPLAINT_CLASSIFIER_THRESHOLD) is None
+
+
+def test_predict_still_offers_a_best_guess(classifier):
+    assert classifier.predict("My husband") == ("Domestic Violence", pytest.approx(2 / 3))
+    assert classifier.predict("nothing matches here") == (None, 0.0)
+
+
+def test_stats_count_local_and_fallback(classifier):
+    classifier.classify("theft of my bike", 0.6)
+    classifier.classify("my husband", 0.6)
+    assert classifier.stats == {'local': 1, 'fallback': 1}
@@ -0,0 +1,106 @@
+"""
+Tests for geo.py
+"""
+import random
+
+import pytest
+
+import cache
+from cache import GeoCache
+from geo import StationIndex, geohash_encode, haversine_km, rank_by_distance
+
+
+def make_stations(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {"name": f"PS {n}", "location": {"lat": 16.9 + rng.uniform(-0.3, 0.3), "lon": 82.2 + rng.uniform(-0.3, 0.3)}}
+        for n in range(count)
+    ]
+
+
+def brute_force(lat, lon, stations, k):
+    distances = sorted(
+        (haversine_km(lat, lon, s["location"]["lat"], s["location"]["lon"]), s["name"]) for s in stations
+    )
+    return [name for _, name in distances[:k]]
+
+
+def test_haversine_known_distance():
+    # One degree of latitude is ~111.2 km everywhere
+    assert haversine_km(16.0, 82.0, 17.0, 82.0) == pytest.approx(111.19, abs=0.01)
+    assert haversine_km(16.9, 82.2, 16.9, 82.2) == 0
+
+
+def test_rank_by_distance_orders_candidates_and_limits_k():
+    candidates = [{"name": name, "lat": 16.9, "lng": 82.2 + offset} for name, offset in (("far", 0.2), ("near", 0.01), ("mid", 0.1))]
+    ranked = rank_by_distance(16.9, 82.2, candidates, k=2)
+    assert [candidate["name"] for _, candidate in ranked] == ["near", "mid"]
+    assert ranked[0][0] < ranked[1][0]
+    assert rank_by_distance(16.9, 82.2, []) == []
+
+
+def test_station_index_matches_brute_force():
+    stations = make_stations(60)
+    index = StationIndex(stations)
+    rng = random.Random(1)
+    for _ in range(200):
+        lat, lon = 16.9 + rng.uniform(-0.5, 0.5), 82.2 + rng.uniform(-0.5, 0.5)
+        assert [s["name"] for _, s in index.nearest(lat, lon, k=3)] == brute_force(lat, lon, stations, 3)
+
+
+def test_station_index_respects_max_distance():
+    index = StationIndex(make_stations(30))
+    assert all(distance <= 5 for distance, _ in index.nearest(16.9, 82.2, k=10, max_distance_km=5))
+    assert index.nearest(10.0, 70.0, k=3, max_distance_km=5) == []
+    assert StationIndex([]).nearest(16.9, 82.2) == []
+
+
+def test_station_index_batch_agrees_with_single_lookups():
+    stations = make_stations(40)
+    index = StationIndex(stations)
+    points = [(16.95, 82.25), (16.7, 82.0), (17.1, 82.4)]
+    for point, batch in zip(points, index.nearest_batch(points, k=3)):
+        assert [s["name"] for _, s in batch] == [s["name"] for _, s in index.nearest(*point, k=3)]
+
+
+def test_geohash_matches_reference_values():
+    assert geohash_encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert geohash_encode(0.0, 0.0, precision=5) == "s0000"
+    assert geohash_encode(-90.0, -180.0, precision=3) == "000"
+
+
+def test_geohash_precision_is_a_prefix_and_nearby_points_share_cells():
+    full = geohash_encode(16.9891, 82.2475, precision=9)
+    assert geohash_encode(16.9891, 82.2475, precision=6) == full[:6]
+    assert geohash_encode(16.9892, 82.2476) == geohash_encode(16.9891, 82.2475)  # ~15 m apart
+    assert geohash_encode(16.9891, 82.3475) != geohash_encode(16.9891, 82.2475)  # ~10 km apart
+
+
+def test_geo_cache_round_trip_and_expiry(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    geo_cache = GeoCache(str(tmp_path / "places.sqlite3"), ttl=60)
+    stations = [{"name": "PS 1", "phone": "0884"}]
+    geo_cache.set("tepg9w", stations)
+
+    assert geo_cache.get("tepg9w") == stations
+    assert geo_cache.get("tepg9x") is None
+    now[0] += 61
+    assert geo_cache.get("tepg9w") is None
+    assert geo_cache.stats == {'hits': 1, 'misses': 2}
+    geo_cache.close()
+
+
+def test_geo_cache_short_ttl_for_degraded_lists(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    geo_cache = GeoCache(str(tmp_path / "places.sqlite3"), ttl=3600)
+    geo_cache.set("tepg9w", [{"name": "PS 1", "phone": "Not available"}], ttl=60)
+    geo_cache.set("tepg9x", [])
+    geo_cache.set("tepg9y", [], ttl=0)
+
+    assert geo_cache.get("tepg9y") is None
+    now[0] += 61
+    assert geo_cache.get("tepg9w") is None
+    assert geo_cache.get("tepg9x") == []
+    geo_cache.close()
@@ -0,0 +1,126 @@
+"""
+Tests for jurisdiction.py
+"""
+import asyncio
+
+import pytest
+
+from cache import JurisdictionCache
+from jurisdiction import (JurisdictionResolver, extract_station_name, is_specific_location, jurisdiction_key,
+                          normalize_location)
+
+
+def test_normalize_location_keeps_pincode_and_place_names():
+    assert normalize_location("D.No 12-3, Near Bhanugudi Jn., Kakinada - 533 003") == "533003 bhanugudi kakinada"
+    assert normalize_location("Kakinada Rural Mandal, East Godavari District, Andhra Pradesh") == \
+        "east godavari kakinada rural"
+    assert normalize_location("") == ""
+    assert normalize_location(None) == ""
+
+
+def test_jurisdiction_key_ignores_formatting_differences():
+    assert jurisdiction_key("Near Sarpavaram Jn, Kakinada 533005", "Theft") == \
+        jurisdiction_key("sarpavaram junction, KAKINADA - 533 005", "  theft ")
+    assert jurisdiction_key("Bhanugudi, Kakinada", None) == "bhanugudi kakinada|general"
+
+
+def test_jurisdiction_key_separates_areas_and_complaint_types():
+    assert jurisdiction_key("Bhanugudi, Kakinada", "Theft") != jurisdiction_key("Sarpavaram, Kakinada", "Theft")
+    assert jurisdiction_key("Bhanugudi, Kakinada", "Theft") != jurisdiction_key("Bhanugudi, Kakinada", "Cyber Crime")
+
+
+def test_jurisdiction_key_starts_with_the_location_for_prefix_invalidation():
+    key = jurisdiction_key("Bhanugudi, Kakinada", "Theft")
+    assert key.startswith(normalize_location("Bhanugudi, Kakinada") + "|")
+
+
+@pytest.mark.parametrize("response, name", [
+    ("**Kakinada Two Town Police Station**\n📍 Address: ...", "Kakinada Two Town Police Station"),
+    ("# Stations\n*Women Police Station*\n...", "Women Police Station"),
+])
+def test_extract_station_name(response, name):
+    assert extract_station_name(response) == name
+
+
+def test_resolver_caches_by_jurisdiction_and_invalidates(tmp_path):
+    calls = []
+
+    async def lookup(incident_location, complaint_type, address):
+        calls.append((incident_location, complaint_type, address))
+        return "**Kakinada Two Town Police Station**\n📞 0884-2371111"
+
+    async def run():
+        resolver = JurisdictionResolver(JurisdictionCache(str(tmp_path / "j.sqlite3"), ttl=60), lookup)
+        first = await resolver.resolve("Near Sarpavaram Jn, Kakinada 533005", "Theft")
+        second = await resolver.resolve("sarpavaram, kakinada - 533 005", "theft")
+        assert resolver.invalidate("Sarpavaram Kakinada 533005") == 1
+        await resolver.resolve("Sarpavaram, Kakinada 533005", "Theft")
+        resolver.cache.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {
+        'police_station': "Kakinada Two Town Police Station",
+        'police_details': "**Kakinada Two Town Police Station**\n📞 0884-2371111"
+    }
+    assert len(calls) == 2
+
+
+def test_resolver_does_not_cache_empty_answers(tmp_path):
+    calls = []
+
+    async def lookup(incident_location, complaint_type, address):
+        calls.append(1)
+        return "  "
+
+    async def run():
+        resolver = JurisdictionResolver(JurisdictionCache(str(tmp_path / "j.sqlite3"), ttl=60), lookup)
+        await resolver.resolve("Bhanugudi", "Theft")
+        await resolver.resolve("Bhanugudi", "Theft")
+        resolver.cache.close()
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("location", ["Near main road", "Door No 5, Main Road", "At my house", "In front of my house", ""])
+def test_vague_locations_are_not_specific(location):
+    assert not is_specific_location(location)
+
+
+@pytest.mark.parametrize("location", ["Near Bhanugudi Jn", "Main Road, 533001", "In front of my house, Sarpavaram"])
+def test_pincode_or_place_name_is_specific(location):
+    assert is_specific_location(location)
+
+
+def test_vague_locations_are_looked_up_with_the_address_and_never_cached(tmp_path):
+    calls = []
+
+    async def lookup(incident_location, complaint_type, address):
+        calls.append((incident_location, address))
+        return f"**Station for {address}**"
+
+    async def run():
+        resolver = JurisdictionResolver(JurisdictionCache(str(tmp_path / "j.sqlite3"), ttl=60), lookup)
+        answers = [
+            await resolver.resolve("Near main road", "Theft", "Bhanugudi, Kakinada"),
+            await resolver.resolve("Door No 5, Main Road", "Theft", "Sarpavaram, Kakinada"),
+            await resolver.resolve("At my house", "Theft", "Gandhi Nagar, Kakinada"),
+            await resolver.resolve("In front of my house", "Theft", "Ramanayyapeta, Kakinada"),
+        ]
+        # Specific locations are cached and their lookup never sees the address
+        await resolver.resolve("Sarpavaram Jn", "Theft", "Gandhi Nagar, Kakinada")
+        await resolver.resolve("Sarpavaram Jn", "Theft", "Ramanayyapeta, Kakinada")
+        resolver.cache.close()
+        return [answer['police_station'] for answer in answers]
+
+    stations = asyncio.run(run())
+    assert stations == ["Station for Bhanugudi, Kakinada", "Station for Sarpavaram, Kakinada",
+                        "Station for Gandhi Nagar, Kakinada", "Station for Ramanayyapeta, Kakinada"]
+    assert calls[:4] == [
+        ("Near main road", "Bhanugudi, Kakinada"),
+        ("Door No 5, Main Road", "Sarpavaram, Kakinada"),
+        ("At my house", "Gandhi Nagar, Kakinada"),
+        ("In front of my house", "Ramanayyapeta, Kakinada"),
+    ]
+    assert calls[4:] == [("Sarpavaram Jn", None)]
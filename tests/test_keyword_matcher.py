@@ -0,0 +1,79 @@
+"""
+Tests for keyword_matcher.py
+"""
+import config
+from keyword_matcher import KeywordAutomaton, LawMatcher, normalize_keyword
+
+
+def automaton(*phrases):
+    keyword_automaton = KeywordAutomaton()
+    for phrase in phrases:
+        keyword_automaton.add(phrase, phrase)
+    return keyword_automaton.build()
+
+
+def found(keyword_automaton, text):
+    return [payload for _, _, payload in keyword_automaton.find_all(text)]
+
+
+def test_normalize_keyword():
+    assert normalize_keyword("Domestic_Violence") == "domestic violence"
+    assert normalize_keyword("  eve   teasing ") == "eve teasing"
+
+
+def test_matches_whole_words_only():
+    keyword_automaton = automaton("rape", "theft", "hit")
+    assert found(keyword_automaton, "grapes were stolen") == []
+    assert found(keyword_automaton, "white shirt") == []
+    assert found(keyword_automaton, "Theft, then he HIT me.") == ["theft", "hit"]
+
+
+def test_allows_simple_plurals():
+    keyword_automaton = automaton("theft", "phone")
+    assert found(keyword_automaton, "two thefts and three phones") == ["theft", "phone"]
+    assert found(keyword_automaton, "phonesx") == []
+
+
+def test_finds_overlapping_and_nested_phrases():
+    # Classic Aho-Corasick case: every output along the failure chain is reported
+    keyword_automaton = automaton("he", "she", "his", "hers")
+    text = "ushers she his he"
+    assert sorted(found(keyword_automaton, text)) == sorted(["she", "his", "he"])
+
+    keyword_automaton = automaton("fake profile", "profile", "fake")
+    assert sorted(found(keyword_automaton, "a fake profile")) == ["fake", "fake profile", "profile"]
+
+
+def test_multi_word_phrases_match_across_line_breaks():
+    keyword_automaton = automaton("hit and run")
+    matches = list(keyword_automaton.find_all("it was a hit\n and   run case"))
+    assert [payload for _, _, payload in matches] == ["hit and run"]
+    start, end, _ = matches[0]
+    assert "it was a hit and run case"[start:end] == "hit and run"
+
+
+def test_telugu_vowel_signs_are_part_of_the_word():
+    keyword_automaton = automaton("దాడి")
+    assert found(keyword_automaton, "నాపై దాడి జరిగింది") == ["దాడి"]
+    assert found(keyword_automaton, "దాడిచేశారు") == []
+
+
+def test_empty_phrases_are_ignored():
+    keyword_automaton = automaton("", "   ", "theft")
+    assert found(keyword_automaton, "theft") == ["theft"]
+
+
+def test_law_matcher_ranks_type_hits_above_description_hits():
+    law_matcher = LawMatcher(
+        {"theft": ["IPC 379"], "assault": ["IPC 351", "IPC 352"], "threat": ["IPC 506"]},
+        synonyms={"theft": ["stole"], "threat": ["threatened"]}
+    )
+    assert law_matcher.match("Assault", "he stole my bag and threatened me") == ["IPC 351", "IPC 352", "IPC 379", "IPC 506"]
+    assert law_matcher.match("Theft", "someone stole my phone") == ["IPC 379"]  # Deduplicated
+    assert law_matcher.match("Other", "nothing relevant") == []
+
+
+def test_law_matcher_with_shipped_keywords():
+    law_matcher = LawMatcher(config.COMMON_IPC_SECTIONS, config.IPC_KEYWORD_SYNONYMS)
+    assert law_matcher.match("Theft", "")
+    assert law_matcher.match("General", "i bought grapes") == []
@@ -0,0 +1,133 @@
+"""
+Tests for maps_client.py against a local stand-in for the Places API
+"""
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import maps_client
+from maps_client import AsyncMapsClient, MapsError
+
+
+def run_against(routes, scenario, timeout=5.0):
+    """Run scenario(client, requests) with the Places URLs pointed at a local server"""
+    requests = []
+
+    async def run():
+        app = web.Application()
+        for path, handler in routes.items():
+            async def route(request, handler=handler):
+                requests.append((request.path, dict(request.query), request.transport.get_extra_info('peername')))
+                return await handler(request)
+            app.router.add_get(path, route)
+
+        server = TestServer(app)
+        await server.start_server()
+        original = maps_client.NEARBY_SEARCH_URL, maps_client.PLACE_DETAILS_URL
+        maps_client.NEARBY_SEARCH_URL = str(server.make_url("/nearbysearch/json"))
+        maps_client.PLACE_DETAILS_URL = str(server.make_url("/details/json"))
+        client = AsyncMapsClient("test-key", timeout=timeout)
+        try:
+            return await scenario(client, requests)
+        finally:
+            maps_client.NEARBY_SEARCH_URL, maps_client.PLACE_DETAILS_URL = original
+            await client.close()
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def json_handler(payload, delay=0):
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return web.json_response(payload)
+    return handler
+
+
+def test_places_nearby_sends_query_and_key():
+    async def scenario(client, requests):
+        results = await client.places_nearby(16.98, 82.24, radius=3000)
+        return results, requests
+
+    results, requests = run_against(
+        {"/nearbysearch/json": json_handler({'status': 'OK', 'results': [{'name': 'Town PS'}]})}, scenario)
+    assert results == [{'name': 'Town PS'}]
+    _, query, _ = requests[0]
+    assert query['key'] == "test-key"
+    assert query['location'] == "16.98,82.24"
+    assert query['radius'] == "3000"
+
+
+def test_zero_results_is_not_an_error():
+    async def scenario(client, requests):
+        return await client.places_nearby(0, 0)
+
+    assert run_against({"/nearbysearch/json": json_handler({'status': 'ZERO_RESULTS'})}, scenario) == []
+
+
+def test_error_status_raises_maps_error():
+    async def scenario(client, requests):
+        with pytest.raises(MapsError, match="REQUEST_DENIED: bad key"):
+            await client.places_nearby(0, 0)
+
+    run_against({"/nearbysearch/json": json_handler({'status': 'REQUEST_DENIED', 'error_message': 'bad key'})},
+                scenario)
+
+
+def test_http_error_raises():
+    async def fail(request):
+        return web.Response(status=500)
+
+    async def scenario(client, requests):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await client.places_nearby(0, 0)
+
+    run_against({"/nearbysearch/json": fail}, scenario)
+
+
+def test_slow_response_times_out():
+    async def scenario(client, requests):
+        with pytest.raises(asyncio.TimeoutError):
+            await client.places_nearby(0, 0)
+
+    run_against({"/nearbysearch/json": json_handler({'status': 'OK'}, delay=1)}, scenario, timeout=0.1)
+
+
+def test_place_phones_falls_back_per_place():
+    async def details(request):
+        place_id = request.query['place_id']
+        if place_id == "broken":
+            return web.json_response({'status': 'INVALID_REQUEST'})
+        if place_id == "intl":
+            return web.json_response({'status': 'OK', 'result': {'international_phone_number': "+91 884 236 5555"}})
+        if place_id == "none":
+            return web.json_response({'status': 'OK', 'result': {}})
+        return web.json_response({'status': 'OK', 'result': {'formatted_phone_number': "0884 236 5555"}})
+
+    async def scenario(client, requests):
+        phones = await client.place_phones(["local", "broken", "intl", "none"])
+        return phones, requests
+
+    phones, requests = run_against({"/details/json": details}, scenario)
+    assert phones == ["0884 236 5555", "Not available", "+91 884 236 5555", "Not available"]
+    assert all(query['fields'] == "formatted_phone_number,international_phone_number" for _, query, _ in requests)
+
+
+def test_session_is_reused_and_recreated_after_close():
+    async def scenario(client, requests):
+        await client.places_nearby(0, 0)
+        session = client._session
+        await client.places_nearby(0, 0)
+        assert client._session is session
+        # Both requests went over the same pooled connection
+        assert requests[0][2] == requests[1][2]
+
+        await client.close()
+        assert session.closed
+        await client.places_nearby(0, 0)
+        assert client._session is not session
+
+    run_against({"/nearbysearch/json": json_handler({'status': 'OK', 'results': []})}, scenario)
@@ -0,0 +1,125 @@
+"""
+Tests for metrics.py
+"""
+import asyncio
+import types
+
+import pytest
+from aiohttp import ClientSession
+
+import metrics
+from metrics import ConversationTracker, MetricsRegistry, instrument, start_metrics_server
+
+
+def sample_lines(registry):
+    return [line for line in registry.render().splitlines() if not line.startswith("#")]
+
+
+def test_counter_and_gauge_render_in_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["endpoint"])
+    requests.inc(endpoint="details")
+    requests.inc(2, endpoint="details")
+    in_flight = registry.gauge("in_flight", "In flight")
+    with in_flight.track_inprogress():
+        assert sample_lines(registry)[-1] == "in_flight 1.0"
+
+    rendered = registry.render()
+    assert "# TYPE requests_total counter" in rendered
+    assert 'requests_total{endpoint="details"} 3.0' in rendered
+    assert "in_flight 0.0" in rendered
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ["code"]).inc(code='a\\b "q"\nz')
+    assert r'errors_total{code="a\\b \"q\"\nz"} 1.0' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        latency.observe(value)
+
+    assert sample_lines(registry) == [
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 3.0',
+        'latency_seconds_bucket{le="+Inf"} 4.0',
+        "latency_seconds_sum 6.05",
+        "latency_seconds_count 4.0",
+    ]
+
+
+def test_function_metrics_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    depth = {"value": 1}
+    registry.gauge("queue_depth", "Depth").set_function(lambda: depth["value"])
+    registry.gauge("per_queue", "Depth", ["queue"]).set_function(lambda: {("global",): 2})
+    registry.counter("shed_total", "Shed").set_function(lambda: 7)
+    registry.gauge("broken", "Broken").set_function(lambda: 1 / 0)
+
+    depth["value"] = 4
+    assert sample_lines(registry) == ["queue_depth 4.0", 'per_queue{queue="global"} 2.0', "shed_total 7.0"]
+
+
+def test_registering_the_same_name_twice_returns_the_existing_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("a_total", "A") is registry.counter("a_total", "A")
+
+
+def update(user_id):
+    return types.SimpleNamespace(effective_chat=types.SimpleNamespace(id=user_id), effective_user=types.SimpleNamespace(id=user_id))
+
+
+def test_conversation_tracker_follows_handler_results():
+    tracker = ConversationTracker("complaint", {0: "name", 1: "age"})
+    tracker.record(update(1), 0)
+    tracker.record(update(2), 0)
+    tracker.record(update(2), 1)
+    tracker.record(update(1), None)  # Handler stayed in the same state
+    assert tracker.counts() == {("complaint", "name"): 1, ("complaint", "age"): 1}
+
+    tracker.record(update(2), -1)  # ConversationHandler.END
+    assert tracker.counts() == {("complaint", "name"): 1, ("complaint", "age"): 0}
+
+
+def test_instrument_records_latency_errors_and_state():
+    tracker = ConversationTracker("test_flow", {5: "step"})
+
+    async def handled(update, context):
+        return 5
+
+    async def broken(update, context):
+        raise RuntimeError("boom")
+
+    async def run():
+        assert await instrument(handled, conversation=tracker)(update(1), None) == 5
+        with pytest.raises(RuntimeError):
+            await instrument(broken, name="test_broken")(update(1), None)
+
+    asyncio.run(run())
+    assert tracker.counts() == {("test_flow", "step"): 1}
+    assert metrics.HANDLER_LATENCY._values[("handled",)][2] == 1
+    assert metrics.HANDLER_ERRORS._values[("test_broken",)] == 1
+    assert metrics.HANDLER_IN_FLIGHT._values[("test_broken",)] == 0
+
+
+def test_metrics_endpoint_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served").inc()
+
+    async def run():
+        runner = await start_metrics_server("127.0.0.1", 0, registry)  # Any free port
+        port = runner.addresses[0][1]
+        try:
+            async with ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    return response.status, response.headers["Content-Type"], await response.text()
+        finally:
+            await runner.cleanup()
+
+    status, content_type, body = asyncio.run(run())
+    assert status == 200
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "served_total 1.0" in body
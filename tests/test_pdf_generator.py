@@ -0,0 +1,46 @@
+"""
+Tests for pdf_generator.py
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pdf_generator
+from pdf_generator import create_complaint_pdf, get_pdf_generator, render_complaint_pdf, render_fir_pdf
+
+COMPLAINT = {
+    'name': "Ravi Kumar",
+    'age': "34",
+    'complaint_type': "Theft",
+    'description': "My mobile phone was stolen near the bus stand. " * 40,
+}
+
+
+def page_count(pdf):
+    return len(re.findall(rb"/Type /Page\b", pdf))
+
+
+def test_generator_is_built_once_per_process(monkeypatch):
+    monkeypatch.setattr(pdf_generator, "_shared_generator", None)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        generators = list(executor.map(lambda _: get_pdf_generator(), range(16)))
+    assert all(generator is generators[0] for generator in generators)
+
+
+def test_repeated_renders_do_not_share_layout_state():
+    first = render_complaint_pdf(COMPLAINT)
+    second = render_complaint_pdf(COMPLAINT)
+    assert first.startswith(b"%PDF-") and second.startswith(b"%PDF-")
+    assert page_count(first) == page_count(second) >= 2
+
+
+def test_concurrent_renders_from_threads():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pdfs = list(executor.map(render_fir_pdf, [dict(COMPLAINT, name=f"User {n}") for n in range(8)]))
+    assert all(pdf.startswith(b"%PDF-") for pdf in pdfs)
+    assert len({page_count(pdf) for pdf in pdfs}) == 1
+
+
+def test_create_complaint_pdf_writes_file(tmp_path):
+    path = tmp_path / "complaint.pdf"
+    assert create_complaint_pdf(COMPLAINT, str(path)) == str(path)
+    assert path.read_bytes().startswith(b"%PDF-")
@@ -0,0 +1,105 @@
+"""
+Tests for pdf_pool.py
+"""
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import pdf_pool
+from pdf_pool import PDFPoolBusy, PDFRenderPool
+
+
+@pytest.mark.parametrize("kind, executor_type", [("thread", ThreadPoolExecutor), ("process", ProcessPoolExecutor)])
+def test_renders_in_the_requested_executor(kind, executor_type):
+    async def run():
+        pool = PDFRenderPool(workers=1, kind=kind)
+        try:
+            assert isinstance(pool._executor, executor_type)
+            complaint = await pool.render_complaint({'name': "Ravi Kumar", 'complaint_type': "Theft"})
+            fir = await pool.render_fir({'name': "Ravi Kumar"})
+            return complaint, fir, pool.pending()
+        finally:
+            pool.shutdown()
+
+    complaint, fir, pending = asyncio.run(run())
+    assert complaint.startswith(b"%PDF-")
+    assert fir.startswith(b"%PDF-")
+    assert pending == 0
+
+
+def test_full_queue_raises_busy_after_wait_timeout(monkeypatch):
+    release = threading.Event()
+
+    def slow_render(data):
+        release.wait(5)
+        return b"%PDF-slow"
+
+    monkeypatch.setattr(pdf_pool, "render_complaint_pdf", slow_render)
+
+    async def run():
+        pool = PDFRenderPool(workers=1, kind="thread", max_pending=2, wait_timeout=0.05)
+        try:
+            running = [asyncio.create_task(pool.render_complaint({})) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            assert pool.pending() == 2
+
+            with pytest.raises(PDFPoolBusy):
+                await pool.render_complaint({})
+
+            release.set()
+            results = await asyncio.gather(*running)
+            # A slot is free again once earlier renders finish
+            results.append(await pool.render_complaint({}))
+            return results, pool.pending()
+        finally:
+            release.set()
+            pool.shutdown()
+
+    results, pending = asyncio.run(run())
+    assert results == [b"%PDF-slow"] * 3
+    assert pending == 0
+
+
+def test_waiting_render_gets_the_next_free_slot(monkeypatch):
+    release = threading.Event()
+
+    def slow_render(data):
+        release.wait(5)
+        return data['n']
+
+    monkeypatch.setattr(pdf_pool, "render_fir_pdf", slow_render)
+
+    async def run():
+        pool = PDFRenderPool(workers=1, kind="thread", max_pending=1, wait_timeout=5)
+        try:
+            first = asyncio.create_task(pool.render_fir({'n': 1}))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(pool.render_fir({'n': 2}))
+            await asyncio.sleep(0.01)
+            assert not second.done()
+            release.set()
+            return await first, await second
+        finally:
+            release.set()
+            pool.shutdown()
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_default_max_pending_scales_with_workers():
+    pool = PDFRenderPool(workers=3, kind="thread")
+    pool.shutdown()
+    assert pool.max_pending == 12
+
+
+def test_no_renders_after_shutdown():
+    async def run():
+        pool = PDFRenderPool(workers=1, kind="thread")
+        pool.shutdown()
+        with pytest.raises(RuntimeError):
+            await pool.render_complaint({'name': "Ravi"})
+        return pool.pending()
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,119 @@
+"""
+Tests for persistence.py
+"""
+import asyncio
+import sqlite3
+import time
+
+from persistence import SQLitePersistence
+
+
+def rows(path, table):
+    with sqlite3.connect(path) as db:
+        return db.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+
+
+def test_user_data_survives_restart_and_loads_lazily(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def run():
+        first = SQLitePersistence(path, flush_interval=60)
+        await first.update_user_data(1, {'complaint': {'name': 'Ravi'}})
+        await first.flush()
+
+        second = SQLitePersistence(path)
+        assert await second.get_user_data() == {}  # Nothing loaded up front
+        user_data = {'complaint': {'name': 'newer'}}
+        await second.refresh_user_data(1, user_data)
+        await second.flush()
+        return user_data
+
+    # In-memory values win over what was stored
+    assert asyncio.run(run()) == {'complaint': {'name': 'newer'}}
+
+
+def test_changes_are_batched_into_one_delayed_write(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    writes = []
+
+    async def run():
+        persistence = SQLitePersistence(path, flush_interval=0.02)
+        original = persistence._write_batch
+        persistence._write_batch = lambda *batch: (writes.append(batch), original(*batch))
+        for user_id in range(5):
+            await persistence.update_user_data(user_id, {'n': user_id})
+        await persistence.update_conversation("complaint", (1, 1), 3)
+        assert writes == []
+        await asyncio.sleep(0.05)
+        await persistence.flush()
+
+    asyncio.run(run())
+    assert len(writes) == 1
+    assert len(rows(path, "user_data")) == 5
+    assert rows(path, "conversations") == [("complaint", "[1, 1]", "3")]
+
+
+def test_full_batch_is_written_immediately(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def run():
+        persistence = SQLitePersistence(path, flush_interval=60, flush_batch_size=3)
+        for user_id in range(3):
+            await persistence.update_user_data(user_id, {})
+        stored = rows(path, "user_data")
+        await persistence.flush()
+        return stored
+
+    assert len(asyncio.run(run())) == 3
+
+
+def test_ended_conversations_and_dropped_users_are_deleted(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def run():
+        persistence = SQLitePersistence(path, flush_interval=60)
+        await persistence.update_user_data(1, {'a': 1})
+        await persistence.update_conversation("complaint", (1, 1), 3)
+        await persistence.flush()
+
+        persistence = SQLitePersistence(path, flush_interval=60)
+        assert await persistence.get_conversations("complaint") == {(1, 1): 3}
+        await persistence.drop_user_data(1)
+        await persistence.update_conversation("complaint", (1, 1), None)
+        await persistence.flush()
+
+    asyncio.run(run())
+    assert rows(path, "user_data") == []
+    assert rows(path, "conversations") == []
+
+
+def test_loaded_users_are_bounded(tmp_path):
+    async def run():
+        persistence = SQLitePersistence(str(tmp_path / "state.sqlite3"), max_loaded_users=3)
+        for user_id in range(10):
+            await persistence.refresh_user_data(user_id, {})
+        loaded = list(persistence._loaded_users)
+        await persistence.flush()
+        return loaded
+
+    assert asyncio.run(run()) == [7, 8, 9]
+
+
+def test_flush_waits_for_a_write_already_in_progress(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def run():
+        persistence = SQLitePersistence(path, flush_interval=0.01)
+        original = persistence._write_batch
+
+        def slow_write(*batch):
+            time.sleep(0.1)
+            original(*batch)
+
+        persistence._write_batch = slow_write
+        await persistence.update_user_data(1, {'a': 1})
+        await asyncio.sleep(0.03)  # Delayed flush has taken the batch and is writing it
+        await persistence.flush()
+
+    asyncio.run(run())
+    assert rows(path, "user_data") == [(1, '{"a": 1}')]
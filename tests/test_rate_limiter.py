@@ -0,0 +1,120 @@
+"""
+Tests for rate_limiter.py
+"""
+import asyncio
+import datetime
+import time
+
+import pytest
+from telegram.error import RetryAfter
+
+from rate_limiter import OutboundRateLimiter
+
+
+def send(rate_limiter, callback, chat_id=1, endpoint="sendMessage", action=None):
+    data = {'chat_id': chat_id} if chat_id is not None else {}
+    if action:
+        data['action'] = action
+    return rate_limiter.process_request(callback, (), {}, endpoint, data, None)
+
+
+def recorder(log, name):
+    async def callback():
+        log.append((name, time.monotonic()))
+        return name
+    return callback
+
+
+def test_requests_without_a_chat_pass_straight_through():
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=1, per_chat_rate=1, per_chat_burst=1)
+        log = []
+        results = await asyncio.gather(*(send(rate_limiter, recorder(log, n), chat_id=None, endpoint="getUpdates") for n in range(5)))
+        return results, rate_limiter.stats['sent']
+
+    assert asyncio.run(run()) == ([0, 1, 2, 3, 4], 0)
+
+
+def test_messages_to_one_chat_are_paced_and_kept_in_order():
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=100, per_chat_rate=20, per_chat_burst=1)
+        log = []
+        await asyncio.gather(*(send(rate_limiter, recorder(log, n)) for n in range(4)))
+        return log
+
+    log = asyncio.run(run())
+    assert [name for name, _ in log] == [0, 1, 2, 3]
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(log, log[1:])]
+    assert all(gap >= 0.04 for gap in gaps)  # 1 / 20 s per chat, with a little timer slack
+
+
+def test_busy_chat_does_not_delay_other_chats():
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=100, per_chat_rate=5, per_chat_burst=1)
+        log = []
+        start = time.monotonic()
+        busy = [asyncio.create_task(send(rate_limiter, recorder(log, "busy"), chat_id=1)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await send(rate_limiter, recorder(log, "other"), chat_id=2)
+        other_done = time.monotonic() - start
+        for task in busy:
+            task.cancel()
+        await asyncio.gather(*busy, return_exceptions=True)
+        return other_done
+
+    assert asyncio.run(run()) < 0.1
+
+
+def test_chat_actions_are_coalesced_until_a_message_is_sent():
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=100, per_chat_rate=100, per_chat_burst=10)
+        log = []
+        for _ in range(3):
+            await send(rate_limiter, recorder(log, "typing"), endpoint="sendChatAction", action="typing")
+        await send(rate_limiter, recorder(log, "message"))
+        await send(rate_limiter, recorder(log, "typing"), endpoint="sendChatAction", action="typing")
+        return [name for name, _ in log], rate_limiter.stats['coalesced']
+
+    assert asyncio.run(run()) == (["typing", "message", "typing"], 2)
+
+
+def test_retry_after_is_retried_then_succeeds():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RetryAfter(datetime.timedelta(milliseconds=20))
+        return "sent"
+
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=100, per_chat_rate=100, per_chat_burst=10, max_retries=3)
+        return await send(rate_limiter, flaky), rate_limiter.stats
+
+    result, stats = asyncio.run(run())
+    assert result == "sent"
+    assert stats['flood_waits'] == 2 and stats['retried'] == 2 and stats['failed'] == 0
+
+
+def test_retry_after_gives_up_after_max_retries():
+    async def always_limited():
+        raise RetryAfter(datetime.timedelta(milliseconds=10))
+
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=100, per_chat_rate=100, per_chat_burst=10, max_retries=1)
+        with pytest.raises(RetryAfter):
+            await send(rate_limiter, always_limited)
+        return rate_limiter.stats
+
+    stats = asyncio.run(run())
+    assert stats['flood_waits'] == 2 and stats['failed'] == 1
+
+
+def test_idle_chats_are_evicted():
+    async def run():
+        rate_limiter = OutboundRateLimiter(global_rate=1000, per_chat_rate=100, per_chat_burst=10, max_tracked_chats=5)
+        for chat_id in range(20):
+            await send(rate_limiter, recorder([], chat_id), chat_id=chat_id)
+        return list(rate_limiter._chats)
+
+    assert asyncio.run(run()) == [15, 16, 17, 18, 19]
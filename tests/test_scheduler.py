@@ -0,0 +1,85 @@
+"""
+Tests for scheduler.py
+"""
+import asyncio
+
+import pytest
+
+import scheduler
+from scheduler import (
+    PRIORITY_BACKGROUND, PRIORITY_CHAT, PRIORITY_COMPLAINT, GeminiScheduler, SchedulerOverloaded, TokenBucket
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_allows_burst_then_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.try_consume() for _ in range(4)] == [True, True, True, False]
+    assert bucket.time_until_token() == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert bucket.try_consume()
+    assert not bucket.try_consume()
+
+
+def test_token_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    clock[0] += 60
+    assert [bucket.try_consume() for _ in range(3)] == [True, True, False]
+
+
+def test_token_bucket_pause_blocks_refills(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.pause(2)
+    assert not bucket.try_consume()
+    assert bucket.time_until_token() == pytest.approx(2)
+
+    clock[0] += 1.9
+    assert not bucket.try_consume()
+    clock[0] += 0.1
+    assert bucket.try_consume()  # Refilled while paused, usable once the pause ends
+
+
+def test_scheduler_admits_higher_priority_first():
+    async def run():
+        gemini_scheduler = GeminiScheduler(requests_per_minute=1200, burst=1, max_queue_size=10, deadlines={})
+        await gemini_scheduler.acquire(PRIORITY_CHAT)  # Empties the bucket
+        order = []
+
+        async def request(priority, name):
+            await gemini_scheduler.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(request(PRIORITY_BACKGROUND, "summary")),
+            asyncio.create_task(request(PRIORITY_CHAT, "chat")),
+            asyncio.create_task(request(PRIORITY_COMPLAINT, "complaint")),
+        ]
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["complaint", "chat", "summary"]
+
+
+def test_scheduler_sheds_when_queue_full_or_deadline_passes():
+    async def run():
+        gemini_scheduler = GeminiScheduler(
+            requests_per_minute=1, burst=1, max_queue_size=1, deadlines={PRIORITY_CHAT: 0.05}
+        )
+        await gemini_scheduler.acquire(PRIORITY_CHAT)
+        waiting = asyncio.create_task(gemini_scheduler.acquire(PRIORITY_CHAT))
+        await asyncio.sleep(0)
+
+        with pytest.raises(SchedulerOverloaded):
+            await gemini_scheduler.acquire(PRIORITY_CHAT)  # Queue full
+        with pytest.raises(SchedulerOverloaded):
+            await waiting  # Deadline passed
+        return gemini_scheduler.stats
+
+    assert asyncio.run(run()) == {'admitted': 1, 'shed': 2}
@@ -0,0 +1,121 @@
+"""
+Tests for session_tasks.py
+"""
+import asyncio
+
+from session_tasks import SessionTasks
+
+
+async def answer(value, delay=0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def fail():
+    raise RuntimeError("lookup failed")
+
+
+def test_take_returns_result_for_matching_tag():
+    async def run():
+        tasks = SessionTasks()
+        tasks.start(1, "police", answer("Town PS"), tag="kakinada")
+        result = await tasks.take(1, "police", tag="kakinada")
+        return result, len(tasks), await tasks.take(1, "police", tag="kakinada")
+
+    assert asyncio.run(run()) == ("Town PS", 0, None)  # Taken results are removed
+
+
+def test_take_with_stale_tag_cancels_task():
+    async def run():
+        tasks = SessionTasks()
+        task = tasks.start(1, "police", answer("Town PS", delay=10), tag="kakinada")
+        result = await tasks.take(1, "police", tag="vizag")
+        await asyncio.sleep(0)
+        return result, task.cancelled()
+
+    assert asyncio.run(run()) == (None, True)
+
+
+def test_start_with_same_tag_keeps_running_task():
+    async def run():
+        tasks = SessionTasks()
+        first = tasks.start(1, "police", answer("first", delay=0.01), tag="kakinada")
+        second = tasks.start(1, "police", answer("second"), tag="kakinada")
+        return first is second, await tasks.take(1, "police", tag="kakinada")
+
+    assert asyncio.run(run()) == (True, "first")
+
+
+def test_start_with_new_tag_replaces_and_cancels_old_task():
+    async def run():
+        tasks = SessionTasks()
+        first = tasks.start(1, "police", answer("first", delay=10), tag="kakinada")
+        tasks.start(1, "police", answer("second"), tag="vizag")
+        await asyncio.sleep(0)
+        return first.cancelled(), await tasks.take(1, "police", tag="vizag")
+
+    assert asyncio.run(run()) == (True, "second")
+
+
+def test_failed_task_is_restarted_and_take_returns_none():
+    async def run():
+        tasks = SessionTasks()
+        failed = tasks.start(1, "police", fail(), tag="kakinada")
+        await asyncio.sleep(0)
+        retried = tasks.start(1, "police", answer("retry"), tag="kakinada")
+        result = await tasks.take(1, "police", tag="kakinada")
+
+        tasks.start(1, "police", fail(), tag="kakinada")
+        return retried is not failed, result, await tasks.take(1, "police", tag="kakinada")
+
+    assert asyncio.run(run()) == (True, "retry", None)
+
+
+def test_take_timeout_cancels_slow_task():
+    async def run():
+        tasks = SessionTasks()
+        task = tasks.start(1, "police", answer("late", delay=10))
+        result = await tasks.take(1, "police", timeout=0.01)
+        await asyncio.sleep(0)
+        return result, task.cancelled()
+
+    assert asyncio.run(run()) == (None, True)
+
+
+def test_running_reports_unfinished_tasks():
+    async def run():
+        tasks = SessionTasks()
+        tasks.start(1, "police", answer("Town PS", delay=0.01))
+        before = tasks.running(1, "police")
+        await asyncio.sleep(0.02)
+        return before, tasks.running(1, "police"), tasks.running(1, "type")
+
+    assert asyncio.run(run()) == (True, False, False)
+
+
+def test_cancel_all_tasks_for_one_user():
+    async def run():
+        tasks = SessionTasks()
+        police = tasks.start(1, "police", answer("a", delay=10))
+        complaint_type = tasks.start(1, "type", answer("b", delay=10))
+        other_user = tasks.start(2, "police", answer("c", delay=10))
+        tasks.cancel(1)
+        await asyncio.sleep(0)
+        cancelled = police.cancelled(), complaint_type.cancelled(), other_user.cancelled()
+        other_user.cancel()
+        return cancelled, len(tasks)
+
+    assert asyncio.run(run()) == ((True, True, False), 1)
+
+
+def test_unclaimed_results_expire():
+    async def run():
+        tasks = SessionTasks(keep_for=0.01)
+        tasks.start(1, "police", answer("Town PS"))
+        tasks.start(1, "type", fail())
+        await asyncio.sleep(0)
+        before = len(tasks)
+        await asyncio.sleep(0.05)
+        return before, len(tasks)
+
+    assert asyncio.run(run()) == (2, 0)
@@ -0,0 +1,74 @@
+"""
+Tests for streaming.py
+"""
+import asyncio
+
+from streaming import StreamingReply, find_split_point
+from telegram_format import utf16_len
+
+
+class FakeMessage:
+    """Stands in for both the incoming message and the replies sent to it"""
+
+    def __init__(self, log, text=""):
+        self.log = log
+        self.text = text
+
+    async def reply_text(self, text):
+        self.log.append(("send", text))
+        return FakeMessage(self.log, text)
+
+    async def edit_text(self, text, parse_mode=None):
+        self.log.append(("edit", text, parse_mode))
+        self.text = text
+
+
+def test_find_split_point_prefers_paragraphs_then_lines_then_words():
+    assert find_split_point("one two\nthree\n\nfour five", 20) == 13
+    assert find_split_point("one two\nthree four", 15) == 7
+    assert find_split_point("one two three", 10) == 7
+    assert find_split_point("abcdefghij", 4) == 4
+
+
+def test_first_chunk_is_sent_and_later_chunks_are_rate_limited_edits():
+    async def run():
+        log = []
+        reply = StreamingReply(FakeMessage(log), edit_interval=60)
+        await reply.append("Hello")
+        await reply.append(" world")  # Within the edit interval - not shown yet
+        await reply.finish()
+        return log
+
+    assert asyncio.run(run()) == [("send", "Hello"), ("edit", "Hello world", None), ("edit", "Hello world", None)]
+
+
+def test_long_stream_rolls_over_into_new_messages():
+    async def run():
+        log = []
+        reply = StreamingReply(FakeMessage(log), edit_interval=0, max_length=20)
+        for word in "alpha beta gamma delta epsilon zeta eta theta".split():
+            await reply.append(word + " ")
+        await reply.finish(formatter=str.upper)
+        return reply, log
+
+    reply, log = asyncio.run(run())
+    texts = [text for _, text in reply.segments]
+    assert len(texts) > 1
+    assert all(len(text) <= 20 for text in texts)
+    assert " ".join(texts).split() == reply.text.split()
+    # Final pass formats every segment
+    assert [entry for entry in log if entry[2:] == ("HTML",)] == [("edit", t.upper(), "HTML") for t in texts]
+
+
+def test_segments_are_measured_in_utf16_units():
+    async def run():
+        log = []
+        reply = StreamingReply(FakeMessage(log), edit_interval=0, max_length=20)
+        await reply.append("🚔 " * 12)  # 36 UTF-16 units, 24 characters
+        await reply.finish()
+        return reply
+
+    reply = asyncio.run(run())
+    texts = [text for _, text in reply.segments]
+    assert len(texts) == 2
+    assert all(utf16_len(text) <= 20 for text in texts)
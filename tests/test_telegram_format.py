@@ -0,0 +1,142 @@
+"""
+Tests for telegram_format.py
+"""
+import random
+from html.parser import HTMLParser
+
+import pytest
+
+from telegram_format import (
+    TELEGRAM_MAX_MESSAGE_LENGTH, render_html, render_messages, split_html, utf16_len, utf16_prefix, visible_len
+)
+
+ALLOWED_TAGS = {"b", "i", "code", "pre", "a"}
+
+
+class _TagChecker(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        assert tag in ALLOWED_TAGS, tag
+        assert tag not in self.stack, f"nested <{tag}>"
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        assert self.stack and self.stack[-1] == tag, f"unbalanced </{tag}>"
+        self.stack.pop()
+
+
+def assert_valid_html(text):
+    checker = _TagChecker()
+    checker.feed(text)
+    checker.close()
+    assert checker.stack == []
+
+
+@pytest.mark.parametrize("markdown, expected", [
+    ("**Bold** and *also bold*", "<b>Bold</b> and <b>also bold</b>"),
+    ("_italic_ and __italic__", "<i>italic</i> and <i>italic</i>"),
+    ("## Section 420", "<b>Section 420</b>"),
+    ("* first\n- second", "• first\n• second"),
+    ("use `a<b>`", "use <code>a&lt;b&gt;</code>"),
+    ("[NALSA](https://nalsa.gov.in)", '<a href="https://nalsa.gov.in">NALSA</a>'),
+    ("```\nx < y & z\n```", "<pre>x &lt; y &amp; z</pre>"),
+    ("a\n\n\n\nb", "a\n\nb"),
+])
+def test_render_html_converts_markdown(markdown, expected):
+    assert render_html(markdown) == expected
+
+
+@pytest.mark.parametrize("markdown", [
+    "snake_case_name and https://x.com/a_b_c",
+    "5 * 3 = 15",
+    "**unclosed bold",
+    "a * b * c",
+    "Tom & Jerry <script>",
+])
+def test_render_html_leaves_stray_markers_literal_and_escapes(markdown):
+    rendered = render_html(markdown)
+    assert_valid_html(rendered)
+    assert "<script>" not in rendered
+
+
+def test_render_html_handles_crossed_markers():
+    rendered = render_html("**bold _both** italic_")
+    assert_valid_html(rendered)
+
+
+def test_render_html_always_produces_valid_html():
+    rng = random.Random(42)
+    alphabet = ["*", "**", "_", "__", "`", "#", "[", "]", "(", ")", "https://a.in", "<", ">", "&", " ", "\n", "x", "ది"]
+    for _ in range(2000):
+        markdown = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40)))
+        assert_valid_html(render_html(markdown))
+
+
+def test_utf16_len_counts_astral_characters_twice():
+    assert utf16_len("abc") == 3
+    assert utf16_len("దాడి") == 4  # Telugu is in the BMP
+    assert utf16_len("🚨") == 2
+    assert utf16_len("a🚨b") == 4
+
+
+def test_utf16_prefix_never_splits_a_surrogate_pair():
+    assert utf16_prefix("a🚨b", 1) == 1
+    assert utf16_prefix("a🚨b", 2) == 1  # The emoji needs two units
+    assert utf16_prefix("a🚨b", 3) == 2
+    assert utf16_prefix("abc", 10) == 3
+
+
+def test_visible_len_ignores_tags_and_entities():
+    assert visible_len("<b>a &amp; b</b>") == 5
+
+
+def test_short_text_is_one_message():
+    assert split_html("<b>hi</b>\nthere") == ["<b>hi</b>\nthere"]
+    assert split_html("") == []
+
+
+def test_split_packs_lines_within_the_limit_and_keeps_them_whole():
+    lines = [f"<b>Line {n}</b> " + "🚨" * (n % 7) + "x" * 30 for n in range(300)]
+    chunks = split_html("\n".join(lines), limit=500)
+    assert len(chunks) > 1
+    assert all(visible_len(chunk) <= 500 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == lines  # Nothing lost, reordered or cut mid-line
+    for chunk in chunks:
+        assert_valid_html(chunk)
+
+
+def test_split_prefers_paragraph_breaks():
+    first = "\n".join(["a" * 40] * 4)
+    second = "\n".join(["b" * 40] * 4)
+    chunks = split_html(first + "\n\n" + second, limit=200)
+    assert chunks == [first, second]
+
+
+def test_oversized_line_is_hard_split_on_utf16_boundaries():
+    chunks = split_html("<b>" + "🚨" * 3000 + "</b>")
+    assert all(utf16_len(chunk) <= TELEGRAM_MAX_MESSAGE_LENGTH for chunk in chunks)
+    assert "".join(chunks) == "🚨" * 3000
+
+
+def test_oversized_pre_block_stays_preformatted():
+    code = "\n".join(f"line {n} <tag>" for n in range(800))
+    chunks = split_html(render_html(f"```\n{code}\n```"), limit=1000)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith("<pre>") and chunk.endswith("</pre>")
+        assert visible_len(chunk) <= 1000
+        assert_valid_html(chunk)
+
+
+def test_render_messages_fits_long_model_answers():
+    rng = random.Random(3)
+    words = ["**IPC 420**", "_cheating_", "🚨", "దాడి", "`code`", "-", "\n", "\n\n", "word", "& <x>"]
+    markdown = " ".join(rng.choice(words) for _ in range(6000))
+    messages = render_messages(markdown)
+    assert len(messages) > 1
+    for message in messages:
+        assert visible_len(message) <= TELEGRAM_MAX_MESSAGE_LENGTH
+        assert_valid_html(message)
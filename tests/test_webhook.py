@@ -0,0 +1,172 @@
+"""
+Tests for webhook.py
+"""
+import asyncio
+import types
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from webhook import SECRET_TOKEN_HEADER, PerChatUpdateProcessor, build_webhook_app, run_webhook
+
+
+def chat_update(chat_id):
+    return types.SimpleNamespace(effective_chat=types.SimpleNamespace(id=chat_id))
+
+
+def test_updates_from_one_chat_run_in_order_and_chats_run_concurrently():
+    async def run():
+        processor = PerChatUpdateProcessor(10)
+        log = []
+
+        async def handle(chat_id, n, delay):
+            log.append(("start", chat_id, n))
+            await asyncio.sleep(delay)
+            log.append(("end", chat_id, n))
+
+        await asyncio.gather(
+            processor.process_update(chat_update(1), handle(1, 0, 0.03)),
+            processor.process_update(chat_update(1), handle(1, 1, 0)),
+            processor.process_update(chat_update(2), handle(2, 0, 0)),
+        )
+        return log, processor._chat_locks
+
+    log, chat_locks = asyncio.run(run())
+    chat_one = [entry for entry in log if entry[1] == 1]
+    assert chat_one == [("start", 1, 0), ("end", 1, 0), ("start", 1, 1), ("end", 1, 1)]
+    # Chat 2 didn't wait for chat 1's slow update
+    assert log.index(("end", 2, 0)) < log.index(("end", 1, 0))
+    assert chat_locks == {}  # Locks are freed once a chat is idle
+
+
+def test_global_concurrency_limit_is_enforced():
+    async def run():
+        processor = PerChatUpdateProcessor(2)
+        running = []
+        peak = 0
+
+        async def handle():
+            nonlocal peak
+            running.append(1)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        await asyncio.gather(*(processor.process_update(chat_update(chat_id), handle()) for chat_id in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+
+def test_queued_updates_of_a_busy_chat_do_not_hold_global_slots():
+    async def run():
+        processor = PerChatUpdateProcessor(2)
+        finished = []
+
+        async def handle(name, delay):
+            await asyncio.sleep(delay)
+            finished.append(name)
+
+        await asyncio.gather(
+            processor.process_update(chat_update(1), handle("busy 1", 0.05)),
+            processor.process_update(chat_update(1), handle("busy 2", 0.05)),
+            processor.process_update(chat_update(1), handle("busy 3", 0.05)),
+            processor.process_update(chat_update(2), handle("other", 0)),
+        )
+        return finished
+
+    # Chat 2 gets the free slot instead of queueing behind chat 1's backlog
+    assert asyncio.run(run())[0] == "other"
+
+def test_updates_without_a_chat_still_count_against_the_limit():
+    async def run():
+        processor = PerChatUpdateProcessor(1)
+        order = []
+
+        async def handle(n):
+            order.append(n)
+            await asyncio.sleep(0.01)
+            order.append(n)
+
+        no_chat = types.SimpleNamespace(effective_chat=None)
+        await asyncio.gather(processor.process_update(no_chat, handle(0)), processor.process_update(no_chat, handle(1)))
+        return order
+
+    assert asyncio.run(run()) == [0, 0, 1, 1]
+
+
+def post_update(secret_token, headers):
+    async def run():
+        application = types.SimpleNamespace(update_queue=asyncio.Queue(), bot=None)
+        client = TestClient(TestServer(build_webhook_app(application, "/telegram/", secret_token)))
+        await client.start_server()
+        try:
+            response = await client.post("/telegram", json={'update_id': 1}, headers=headers)
+            health = await client.get("/")
+            return response.status, health.status, application.update_queue.qsize()
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("headers", [{}, {SECRET_TOKEN_HEADER: "wrong"}, {SECRET_TOKEN_HEADER: ""}])
+def test_webhook_rejects_missing_or_wrong_secret(headers):
+    assert post_update("s3cret", headers) == (403, 200, 0)
+
+
+def test_webhook_queues_updates_with_the_right_secret():
+    assert post_update("s3cret", {SECRET_TOKEN_HEADER: "s3cret"}) == (200, 200, 1)
+
+
+@pytest.mark.parametrize("secret_token", ["", None])
+def test_webhook_app_requires_a_secret(secret_token):
+    application = types.SimpleNamespace(update_queue=None, bot=None)
+    with pytest.raises(ValueError):
+        build_webhook_app(application, "/telegram/", secret_token)
+
+
+class FakeApplication:
+    post_init = None
+    post_shutdown = None
+
+    def __init__(self):
+        self.update_queue = asyncio.Queue()
+        self.registered = asyncio.Event()
+        self.bot = types.SimpleNamespace(set_webhook=self.set_webhook)
+
+    async def set_webhook(self, **kwargs):
+        self.webhook = kwargs
+        self.registered.set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def test_run_webhook_registers_a_random_secret_when_unset():
+    async def run():
+        secrets = []
+        for _ in range(2):
+            application = FakeApplication()
+            task = asyncio.create_task(
+                run_webhook(application, "https://bot.example.com/", "127.0.0.1", 0, "/telegram/", None))
+            await asyncio.wait_for(application.registered.wait(), 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            secrets.append(application.webhook['secret_token'])
+            assert application.webhook['url'] == "https://bot.example.com/telegram"
+        return secrets
+
+    first, second = asyncio.run(run())
+    assert first and second and first != second
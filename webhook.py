@@ -0,0 +1,119 @@
+"""
+Webhook serving and concurrent update processing for Kakinada Legal Assistant Bot
+"""
+import asyncio
+import hmac
+import logging
+import secrets
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Process updates concurrently across chats, but strictly in order within a chat"""
+
+    def __init__(self, max_concurrent_updates):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks = {}  # chat_id -> [lock, number of updates using it]
+
+    async def process_update(self, update, coroutine):
+        """Wait for the chat's turn first, then for a global slot
+
+        Overrides the base class (marked final only for typing), which takes the
+        global slot first - there, one chat's queued updates could hold every slot.
+        """
+        chat = getattr(update, 'effective_chat', None)
+        if chat is None:
+            async with self._semaphore:
+                await self.do_process_update(update, coroutine)
+            return
+
+        entry = self._chat_locks.setdefault(chat.id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0], self._semaphore:
+                await self.do_process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                # Nobody else queued for this chat - free the lock
+                self._chat_locks.pop(chat.id, None)
+
+    async def do_process_update(self, update, coroutine):
+        await coroutine
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+
+def build_webhook_app(application, url_path, secret_token):
+    """aiohttp app that validates Telegram's secret token and queues updates"""
+    if not secret_token:
+        raise ValueError("A webhook secret token is required - unverified updates are never accepted")
+
+    async def telegram_webhook(request):
+        received_token = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(received_token, secret_token):
+            logger.warning("Rejected webhook call with invalid secret token")
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        update = Update.de_json(data, application.bot)
+        await application.update_queue.put(update)
+        return web.Response()
+
+    async def health(request):
+        # Render and other hosts probe this to check the service is up
+        return web.Response(text="OK")
+
+    app = web.Application()
+    app.router.add_post(f"/{url_path.strip('/')}", telegram_webhook)
+    app.router.add_get("/", health)
+    return app
+
+
+async def run_webhook(application, webhook_url, listen, port, url_path, secret_token, allowed_updates=None):
+    """Register the webhook with Telegram and serve updates until cancelled"""
+    if not secret_token:
+        # Registered with set_webhook below, so Telegram sends it on every call
+        secret_token = secrets.token_urlsafe(32)
+        logger.warning("WEBHOOK_SECRET_TOKEN not set - using a random secret for this run")
+    runner = web.AppRunner(build_webhook_app(application, url_path, secret_token))
+    await runner.setup()
+
+    async with application:
+        if application.post_init:
+            await application.post_init(application)
+
+        await application.bot.set_webhook(
+            url=f"{webhook_url.rstrip('/')}/{url_path.strip('/')}",
+            secret_token=secret_token,
+            allowed_updates=allowed_updates,
+            drop_pending_updates=False
+        )
+        await application.start()
+
+        site = web.TCPSite(runner, listen, port)
+        await site.start()
+        logger.info(f"🌐 Webhook server listening on {listen}:{port}")
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+            await application.stop()
+            if application.post_shutdown:
+                await application.post_shutdown(application)